@@ -0,0 +1,58 @@
+"""
+Cancellation latency: how quickly the LLM and TTS stop after a barge-in.
+
+Starts an LLM completion and, separately, a streamed multi-sentence
+reply, cancels each after a random delay, and reports the time from
+cancel() until the stage had released its worker (avg / p95).
+
+    python benchmarks/barge_in.py --trials 10
+"""
+import argparse
+import asyncio
+import random
+
+from common import load_references
+
+from src.core.cancellation import CancellationToken
+from src.core.config import config
+from src.core.metrics import CancellationMetrics
+
+async def cancel_after(token: CancellationToken, delay: float):
+    await asyncio.sleep(delay)
+    token.cancel("benchmark")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--skip-llm", action="store_true")
+    parser.add_argument("--skip-tts", action="store_true")
+    args = parser.parse_args()
+
+    metrics = CancellationMetrics()
+    reply = " ".join(load_references().values())
+
+    if not args.skip_llm:
+        from src.core.llm import LLMHandler
+        llm = LLMHandler()
+        for _ in range(args.trials):
+            token = CancellationToken(metrics)
+            asyncio.create_task(cancel_after(token, random.uniform(0.2, 1.0)))
+            await llm.create_completion("Tell me a long story about the sea.", token)
+
+    if not args.skip_tts:
+        from src.voice.tts import TTSHandler
+        config.tts.audio_cache = False
+        tts = TTSHandler(config)
+        for _ in range(args.trials):
+            token = CancellationToken(metrics)
+            asyncio.create_task(cancel_after(token, random.uniform(0.2, 1.0)))
+            async for _ in tts.stream_speech(reply, token):
+                pass
+            # The running batch acknowledges from a done callback
+            await asyncio.get_running_loop().run_in_executor(tts.executor, lambda: None)
+
+    for stage, latency in metrics.get_summary()["latency_ms"].items():
+        print(f"{stage:<6} avg {latency['avg']:7.1f}ms  p95 {latency['p95']:7.1f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+SAMPLES_DIR = Path(__file__).parent / "samples"
+
+def load_samples(samples_dir: Path = SAMPLES_DIR, sample_rate: int = 16000) -> List[Tuple[str, np.ndarray]]:
+    """
+    Load every WAV in the sample directory as float32 mono at the given rate.
+
+    Only the reference transcripts are checked in; the WAVs are rendered by
+    make_samples.py with FRIDAY's own TTS voice, so STT numbers on them are
+    for clean synthetic speech, not real microphone recordings.
+    """
+    paths = sorted(Path(samples_dir).glob("*.wav"))
+    if not paths:
+        raise SystemExit(
+            f"No WAV samples in {samples_dir}. Render them from references.txt first "
+            f"(needs the StyleTTS2 model): python benchmarks/make_samples.py"
+        )
+
+    from faster_whisper import decode_audio
+    return [(path.stem, decode_audio(str(path), sampling_rate=sample_rate)) for path in paths]
+
+def percentile(values: List[float], pct: float) -> float:
+    return float(np.percentile(values, pct)) if values else 0.0
+
+def load_references(samples_dir: Path = SAMPLES_DIR) -> Dict[str, str]:
+    """Reference transcripts keyed by sample id"""
+    references = {}
+    for line in (Path(samples_dir) / "references.txt").read_text(encoding="utf-8").splitlines():
+        if line.strip() and not line.startswith("#"):
+            sample_id, text = line.split("|", 1)
+            references[sample_id.strip()] = text.strip()
+    return references
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by reference length"""
+    normalize = lambda text: "".join(c for c in text.lower() if c.isalnum() or c.isspace()).split()
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    distances = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, distances[0] = distances[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, distances[j] = distances[j], min(
+                distances[j] + 1,
+                distances[j - 1] + 1,
+                previous + (ref_word != hyp_word)
+            )
+    return distances[-1] / max(len(ref), 1)
@@ -0,0 +1,105 @@
+"""
+Turn latency with and without CPU core partitioning.
+
+Each preset runs in a fresh process (thread counts and affinity are fixed
+when the engines load). A turn transcribes a bundled sample, generates a
+reply and synthesizes it. Within a session the next turn starts once the
+previous reply has been synthesized, which is when the pipeline resumes
+capture with listen_during_playback (playback itself is not simulated).
+Several sessions run at once, offset by half a turn, so one session's STT
+and LLM overlap another's TTS the way concurrent API clients do; without
+that overlap there is no oversubscription for partitioning to remove.
+Reports avg / p50 / p95 turn latency per preset.
+
+    python benchmarks/core_partition.py --presets off balanced interactive --turns 20 --sessions 2
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from common import load_samples, percentile
+
+from src.core.config import config
+from src.core.cpu_plan import describe, partition_cores
+
+async def run_turns(turns: int, sessions: int):
+    from src.core.llm import LLMHandler
+    from src.speech.engine import get_whisper_engine
+    from src.voice.tts import TTSHandler
+
+    config.tts.audio_cache = False
+    config.tts.prewarm = False
+    engine = get_whisper_engine(config)
+    llm = LLMHandler()
+    tts = TTSHandler(config)
+    loop = asyncio.get_running_loop()
+    samples = load_samples()
+
+    # Warm every engine once outside the measurement
+    await engine.transcribe(samples[0][1])
+    await loop.run_in_executor(llm.executor, llm.generate, llm.build_prompt("Hello")[0])
+    await loop.run_in_executor(tts.executor, tts._synthesize, ["Hello there."])
+
+    latencies = []
+    generated = asyncio.Event()
+
+    async def turn(index: int):
+        start = time.perf_counter()
+        text = await engine.transcribe(samples[index % len(samples)][1])
+        # generate() directly, so the benchmark leaves conversation memory alone
+        reply = await loop.run_in_executor(llm.executor, llm.generate, llm.build_prompt(text)[0])
+        generated.set()
+        await loop.run_in_executor(tts.executor, tts._synthesize, tts.split_sentences(reply or text))
+        latencies.append(time.perf_counter() - start)
+
+    async def session(offset: int):
+        if offset:
+            # Start once the first session reaches TTS, so the sessions stay out of phase
+            await generated.wait()
+        for i in range(offset, turns, sessions):
+            await turn(i)
+
+    await asyncio.gather(*(session(s) for s in range(sessions)))
+    await tts.close()
+    return latencies
+
+def worker(preset: str, turns: int, sessions: int):
+    config.scheduler.partition = preset
+    plan = partition_cores(config)
+    latencies = asyncio.run(run_turns(turns, sessions))
+    print(json.dumps({"plan": describe(plan), "latencies": latencies}))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--presets", nargs="+", choices=["off", "balanced", "interactive"],
+                        default=["off", "balanced", "interactive"])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=2, help="Concurrent conversations")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.turns, max(1, args.sessions))
+        return
+
+    results = {}
+    for preset in args.presets:
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", preset, "--turns", str(args.turns),
+             "--sessions", str(args.sessions)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        results[preset] = json.loads(output.strip().splitlines()[-1])
+        print(f"{preset}: {results[preset]['plan']}")
+
+    print(f"\n{'preset':<13}{'avg (s)':>9}{'p50 (s)':>9}{'p95 (s)':>9}")
+    for preset, result in results.items():
+        latencies = result["latencies"]
+        print(f"{preset:<13}{sum(latencies) / len(latencies):>9.3f}"
+              f"{percentile(latencies, 50):>9.3f}{percentile(latencies, 95):>9.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+CPU usage of the always-listening VAD gate while nobody is talking.
+
+Replays room noise through a real-time file source for a while and reports
+process CPU time as a percentage of one core.
+
+    python benchmarks/idle_cpu.py --seconds 30
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+import common  # noqa: F401  (puts the repo on sys.path)
+
+from src.core.config import config
+from src.voice.sources import FileSource
+from src.voice.vad import VADGate
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--noise-level", type=float, default=0.003, help="Noise RMS relative to full scale")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0.0, args.noise_level, int(args.seconds * 16000)).astype(np.float32)
+    source = FileSource(noise, realtime=True)
+    gate = VADGate(config.vad)
+
+    segments = 0
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    while (chunk := await source.read(960)) is not None:
+        if gate.process(chunk) is not None:
+            segments += 1
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    print(f"{args.seconds:.0f}s of noise: {100 * cpu / wall:.2f}% CPU, "
+          f"{segments} false segments, noise floor {gate.noise_floor_db:.1f} dBFS")
+
+if __name__ == "__main__":
+    asyncio.run(main())
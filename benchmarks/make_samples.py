@@ -0,0 +1,24 @@
+"""
+Render the bundled reference commands to WAV with FRIDAY's own voice.
+
+    python benchmarks/make_samples.py
+"""
+import asyncio
+
+from common import SAMPLES_DIR, load_references
+
+from src.core.config import config
+from src.voice.tts import TTSHandler
+
+async def main():
+    tts = TTSHandler(config)
+    for sample_id, text in load_references().items():
+        target = SAMPLES_DIR / f"{sample_id}.wav"
+        if target.exists():
+            continue
+        await tts.generate_speech(text, output_path=target)
+        print(f"{sample_id}: {text}")
+    await tts.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
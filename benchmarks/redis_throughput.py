@@ -0,0 +1,94 @@
+"""
+RedisHandler throughput: per-key round trips against batched mget/mset,
+per codec, plus per-command latency while Redis is down (circuit breaker).
+
+Runs against a local redis-server, or fakeredis with --fake (which has no
+network round trip, so only codec and client overhead show).
+
+    python benchmarks/redis_throughput.py --fake --keys 1000
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from common import percentile
+
+from src.core.config import RedisConfig, config
+from src.core.redis_handler import RedisHandler, msgpack
+
+def payload(codec: str, index: int):
+    if codec == "raw":
+        # About one cached sentence of int16 audio at 24 kHz
+        return np.random.randint(-32768, 32767, 24000, dtype=np.int16).tobytes()
+    return {"turn": index, "text": "What's the weather like tomorrow?", "tags": ["weather", "plans"]}
+
+async def timed(label: str, count: int, operation):
+    start = time.perf_counter()
+    await operation()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{count / elapsed:>12,.0f} ops/s")
+
+async def throughput(handler: RedisHandler, keys: int, batch_size: int):
+    codecs = ["json", "raw"] + (["msgpack"] if msgpack is not None else [])
+    for codec in codecs:
+        items = {f"bench:{codec}:{i}": payload(codec, i) for i in range(keys)}
+        names = list(items)
+        print(f"\n{codec}")
+
+        async def single_set():
+            for key, value in items.items():
+                await handler.set(key, value, ttl=60, codec=codec)
+
+        async def single_get():
+            for key in names:
+                await handler.get(key, codec=codec)
+
+        async def batch_set():
+            for i in range(0, keys, batch_size):
+                await handler.mset({key: items[key] for key in names[i:i + batch_size]}, ttl=60, codec=codec)
+
+        async def batch_get():
+            for i in range(0, keys, batch_size):
+                await handler.mget(names[i:i + batch_size], codec=codec)
+
+        await timed("set (one per round trip)", keys, single_set)
+        await timed("get (one per round trip)", keys, single_get)
+        await timed(f"mset (batches of {batch_size})", keys, batch_set)
+        await timed(f"mget (batches of {batch_size})", keys, batch_get)
+        await handler.delete(*names)
+
+async def outage(commands: int):
+    """Latency of commands against a port nothing listens on"""
+    down = RedisHandler(RedisConfig(port=1, failure_threshold=config.redis.failure_threshold))
+    latencies = []
+    for i in range(commands):
+        start = time.perf_counter()
+        await down.set(f"bench:down:{i}", i)
+        latencies.append(time.perf_counter() - start)
+    await down.close()
+    print(f"\nRedis down, {commands} sets: avg {np.mean(latencies) * 1000:.2f}ms, "
+          f"p95 {percentile(latencies, 95) * 1000:.2f}ms, {down.get_summary()}")
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fake", action="store_true", help="Use fakeredis instead of a server")
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.fake:
+        import fakeredis
+        handler = RedisHandler(client=fakeredis.FakeAsyncRedis())
+    else:
+        handler = RedisHandler()
+        if not await handler.ping():
+            raise SystemExit(f"No Redis at {config.redis.host}:{config.redis.port}; try --fake")
+
+    await throughput(handler, args.keys, args.batch_size)
+    await outage(100)
+    await handler.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""
+Accuracy and latency of greedy-first decoding with beam fallback.
+
+Compares always-beam, always-greedy and adaptive decoding on the bundled
+reference set and reports WER, mean/p95 latency and the fallback rate.
+The samples are TTS-generated (benchmarks/make_samples.py), so WER here is
+a lower bound for real microphone speech and mainly useful for comparing
+the decoding modes against each other.
+
+    python benchmarks/stt_adaptive.py
+"""
+import time
+from dataclasses import replace
+
+from common import load_references, load_samples, percentile, word_error_rate
+
+from src.core.config import config
+from src.core.metrics import DecodingMetrics
+from src.speech.engine import WhisperEngine
+
+def main():
+    samples = load_samples()
+    references = load_references()
+    samples = [(sample_id, audio) for sample_id, audio in samples if sample_id in references]
+
+    modes = {
+        "beam": replace(config.whisper, decode_mode="beam"),
+        "greedy": replace(config.whisper, decode_mode="beam", beam_size=1),
+        "adaptive": replace(config.whisper, decode_mode="adaptive")
+    }
+
+    print(f"{'mode':<10}{'WER':>8}{'avg (s)':>10}{'p95 (s)':>10}{'fallback':>10}")
+    for mode, whisper_config in modes.items():
+        engine = WhisperEngine(config.models.WHISPER_PATH, whisper_config, device=config.system.device)
+        engine.transcribe_sync(samples[0][1])  # Warm up
+        engine.metrics = DecodingMetrics()  # Don't count the warm-up
+
+        latencies, errors = [], []
+        for sample_id, audio in samples:
+            start = time.perf_counter()
+            text = engine.transcribe_sync(audio)
+            latencies.append(time.perf_counter() - start)
+            errors.append(word_error_rate(references[sample_id], text))
+
+        fallback = f"{engine.metrics.fallback_rate:.0%}" if mode == "adaptive" else "-"
+        print(
+            f"{mode:<10}{sum(errors) / len(errors):>8.3f}{sum(latencies) / len(latencies):>10.3f}"
+            f"{percentile(latencies, 95):>10.3f}{fallback:>10}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Throughput vs p95 latency of cross-client Whisper batching.
+
+Simulates N concurrent sessions that each submit utterances back to back and
+compares batch sizes / wait windows against the sequential baseline. The
+batcher only batches with a fixed language, so one is always passed
+(--language, English by default).
+
+    python benchmarks/stt_batching.py --clients 8 --rounds 4 --language en
+"""
+import argparse
+import asyncio
+import time
+
+from common import load_samples, percentile
+
+from faster_whisper import WhisperModel
+from src.core.config import config
+from src.speech.batcher import TranscriptionBatcher
+
+async def run_clients(transcribe, samples, clients: int, rounds: int):
+    latencies = []
+
+    async def client(offset: int):
+        for i in range(rounds):
+            _, audio = samples[(offset + i) % len(samples)]
+            start = time.perf_counter()
+            await transcribe(audio)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+    return clients * rounds / elapsed, percentile(latencies, 95)
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[2.0, 5.0, 10.0])
+    parser.add_argument("--language", default="en", help="Language of the samples")
+    args = parser.parse_args()
+
+    samples = load_samples()
+    model = WhisperModel(str(config.models.WHISPER_PATH), device="cpu", compute_type="int8")
+
+    # Sequential baseline: every session waits for the model in turn
+    lock = asyncio.Lock()
+
+    async def sequential(audio):
+        async with lock:
+            segments = await asyncio.to_thread(
+                lambda: list(model.transcribe(
+                    audio, beam_size=config.whisper.beam_size, language=args.language
+                )[0])
+            )
+            return " ".join(segment.text for segment in segments)
+
+    throughput, p95 = await run_clients(sequential, samples, args.clients, args.rounds)
+    print(f"{'mode':<24}{'utt/s':>10}{'p95 (s)':>10}{'avg batch':>12}")
+    print(f"{'sequential':<24}{throughput:>10.2f}{p95:>10.3f}{1.0:>12.2f}")
+
+    for batch_size in args.batch_sizes:
+        for wait_ms in args.wait_ms:
+            batcher = TranscriptionBatcher(
+                model,
+                batch_size=batch_size,
+                batch_wait_ms=wait_ms,
+                beam_size=config.whisper.beam_size,
+                language=args.language
+            )
+            throughput, p95 = await run_clients(batcher.transcribe, samples, args.clients, args.rounds)
+            # Utterances over one Whisper window skip the batcher; the row would be meaningless
+            assert batcher.batches_run > 0, "No batches formed; are the samples longer than 30s?"
+            label = f"batch={batch_size} wait={wait_ms:g}ms"
+            print(f"{label:<24}{throughput:>10.2f}{p95:>10.3f}{batcher.average_batch_size:>12.2f}")
+            await batcher.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
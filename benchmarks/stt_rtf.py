@@ -0,0 +1,50 @@
+"""
+Real-time factor of the Whisper engine per decoding configuration.
+
+Runs every bundled sample through a WhisperEngine built from each config
+and reports processing time divided by audio duration (lower is faster).
+
+    python benchmarks/stt_rtf.py --beam-sizes 1 5 --compute-types int8 float32
+"""
+import argparse
+import itertools
+import time
+from dataclasses import replace
+
+from common import load_samples
+
+from src.core.config import config
+from src.speech.engine import WhisperEngine
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--beam-sizes", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--compute-types", nargs="+", default=[config.whisper.compute_type])
+    parser.add_argument("--cpu-threads", type=int, nargs="+", default=[config.whisper.cpu_threads])
+    parser.add_argument("--vad-filter", action="store_true", help="Also measure with vad_filter on")
+    args = parser.parse_args()
+
+    samples = load_samples()
+    audio_seconds = sum(len(audio) for _, audio in samples) / 16000
+    vad_options = [False, True] if args.vad_filter else [False]
+
+    print(f"{len(samples)} samples, {audio_seconds:.1f}s of audio")
+    print(f"{'compute':<10}{'threads':>8}{'beam':>6}{'vad':>6}{'RTF':>8}{'avg (s)':>10}")
+
+    for compute_type, threads in itertools.product(args.compute_types, args.cpu_threads):
+        whisper_config = replace(config.whisper, compute_type=compute_type, cpu_threads=threads)
+        engine = WhisperEngine(config.models.WHISPER_PATH, whisper_config, device=config.system.device)
+        engine.transcribe_sync(samples[0][1])  # Warm up
+
+        for beam_size, vad_filter in itertools.product(args.beam_sizes, vad_options):
+            start = time.perf_counter()
+            for _, audio in samples:
+                engine.transcribe_sync(audio, beam_size=beam_size, vad_filter=vad_filter)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{compute_type:<10}{threads:>8}{beam_size:>6}{str(vad_filter):>6}"
+                f"{elapsed / audio_seconds:>8.3f}{elapsed / len(samples):>10.3f}"
+            )
+
+if __name__ == "__main__":
+    main()
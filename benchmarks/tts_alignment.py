@@ -0,0 +1,62 @@
+"""
+Microbenchmark of duration-to-alignment expansion in TTS inference.
+
+Compares the original per-phoneme loop that fills a dense alignment
+matrix (with two host syncs per phoneme) against gather-based expansion,
+at long sentence lengths. Needs only torch, no model files.
+
+    python benchmarks/tts_alignment.py --phonemes 100 400 1000
+"""
+import argparse
+import time
+
+import torch
+
+import common  # noqa: F401  (puts the repo on sys.path)
+
+from src.voice.alignment import expand_by_duration
+
+def loop_alignment(x: torch.Tensor, pred_dur: torch.Tensor, device: str) -> torch.Tensor:
+    """The previous single-sentence implementation"""
+    pred_aln_trg = torch.zeros(pred_dur.shape[0], int(pred_dur.sum().data))
+    c_frame = 0
+    for i in range(pred_aln_trg.size(0)):
+        pred_aln_trg[i, c_frame:c_frame + int(pred_dur[i].data)] = 1
+        c_frame += int(pred_dur[i].data)
+    return x @ pred_aln_trg.unsqueeze(0).to(device)
+
+def timed(fn, repeats: int, device: str) -> float:
+    fn()  # Warm up
+    if device == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / repeats * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phonemes", type=int, nargs="+", default=[50, 200, 500, 1000])
+    parser.add_argument("--channels", type=int, default=512)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    print(f"{'phonemes':>9}{'frames':>8}{'loop (ms)':>11}{'gather (ms)':>13}{'speedup':>9}")
+    for n in args.phonemes:
+        x = torch.randn(1, args.channels, n, device=args.device)
+        pred_dur = torch.randint(1, 12, (n,), device=args.device).float()
+        n_frames = int(pred_dur.sum())
+
+        expected = loop_alignment(x, pred_dur, args.device)
+        actual = expand_by_duration(x, pred_dur.unsqueeze(0), n_frames)
+        assert torch.allclose(expected, actual, atol=1e-5), "expansion mismatch"
+
+        loop_ms = timed(lambda: loop_alignment(x, pred_dur, args.device), args.repeats, args.device)
+        gather_ms = timed(lambda: expand_by_duration(x, pred_dur.unsqueeze(0), n_frames), args.repeats, args.device)
+        print(f"{n:>9}{n_frames:>8}{loop_ms:>11.2f}{gather_ms:>13.2f}{loop_ms / gather_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+StyleTTS2 real-time factor against batch size.
+
+Synthesizes the same multi-sentence reply with different batch sizes and
+reports synthesis time divided by audio duration (lower is faster). First
+checks that batching leaves each sentence's audio unchanged: with the same
+styles, durations and aligned features of a padded batch must match each
+sentence synthesized alone, and so must the decoded audio (same seed, since
+the vocoder's source adds noise).
+
+    python benchmarks/tts_batching.py --batch-sizes 1 2 4 8
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from common import load_references
+
+from src.core.config import config
+from src.voice.tts import SAMPLE_RATE, TTSHandler
+
+def check_batched_matches_single(tts: TTSHandler, sentences, atol: float = 1e-3):
+    """Run in float32 without autocast so only padding could explain differences"""
+    tokens = tts._tokenize(sentences)
+    with torch.inference_mode():
+        _, styles = tts._sample_styles(sentences)
+        t_en, d_en, _, input_lengths, text_mask = tts._encode(tokens)
+        asr, x, frame_counts = tts._align(t_en, d_en, input_lengths, text_mask, styles[:, 128:])
+
+        for i, sentence in enumerate(sentences):
+            style = styles[i:i + 1]
+            t_en, d_en, _, input_lengths, text_mask = tts._encode(tokens[i:i + 1])
+            single_asr, single_x, (n,) = tts._align(t_en, d_en, input_lengths, text_mask, style[:, 128:])
+            assert frame_counts[i] == n, f"duration mismatch for {sentence!r}"
+            assert torch.allclose(asr[i, :, :n], single_asr[0], atol=atol), f"alignment mismatch for {sentence!r}"
+            assert torch.allclose(x[i, :n], single_x[0], atol=atol), f"prosody mismatch for {sentence!r}"
+
+            torch.manual_seed(0)
+            (batched,) = tts._render(asr[i:i + 1], x[i:i + 1], [n], style)
+            torch.manual_seed(0)
+            (single,) = tts._render(single_asr, single_x, [n], style)
+            assert np.allclose(batched, single, atol=atol), f"audio mismatch for {sentence!r}"
+    print(f"Batched output matches single-sentence synthesis ({len(sentences)} sentences)")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=torch.get_num_threads())
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    sentences = list(load_references().values())
+    tts = TTSHandler(config)
+    check_batched_matches_single(tts, sentences)
+    tts._synthesize(sentences[:1])  # Warm up
+
+    print(f"{len(sentences)} sentences, {args.threads} threads on {tts.device}")
+    print(f"{'batch':>6}{'RTF':>8}{'time (s)':>10}")
+    for batch_size in args.batch_sizes:
+        config.tts.batch_size = batch_size
+        elapsed, audio_seconds = 0.0, 0.0
+        for _ in range(args.repeats):
+            tts.s_prev = None
+            start = time.perf_counter()
+            wavs = tts._synthesize(sentences)
+            elapsed += time.perf_counter() - start
+            audio_seconds += sum(len(wav) for wav in wavs) / SAMPLE_RATE
+        print(f"{batch_size:>6}{elapsed / audio_seconds:>8.3f}{elapsed / args.repeats:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+StyleTTS2 real-time factor on CPU: current path against the CPU profile.
+
+"current" is the float16-autocast path used before the profile existed;
+the other variants load a fresh TTSHandler with the matching profile
+settings. Each is warmed up before timing.
+
+    python benchmarks/tts_cpu_profile.py --variants current fp32 bf16 int8 int8-compile
+"""
+import argparse
+import gc
+import time
+
+import torch
+
+from common import load_references
+
+from src.core.config import config
+from src.voice.cpu_profile import bf16_supported
+from src.voice.tts import SAMPLE_RATE, TTSHandler
+
+VARIANTS = {
+    "current": dict(cpu_profile=False),
+    "fp32": dict(cpu_dtype="float32"),
+    "bf16": dict(cpu_dtype="bfloat16"),
+    "int8": dict(cpu_quantize=True),
+    "int8-compile": dict(cpu_quantize=True, cpu_compile=True),
+}
+DEFAULTS = dict(cpu_profile=True, cpu_dtype="auto", cpu_quantize=False, cpu_compile=False)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0: profile default)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if torch.cuda.is_available():
+        print("CUDA is available; this benchmark is meant for CPU-only runs")
+
+    sentences = list(load_references().values())
+    config.tts.cpu_threads = args.threads
+    config.tts.audio_cache = False
+    print(f"{len(sentences)} sentences, native bf16: {bf16_supported()}")
+    print(f"{'variant':<14}{'RTF':>8}{'time (s)':>10}{'threads':>9}")
+
+    for name in args.variants:
+        for key, value in {**DEFAULTS, **VARIANTS[name]}.items():
+            setattr(config.tts, key, value)
+        if name == "current" and args.threads:
+            torch.set_num_threads(args.threads)
+
+        tts = TTSHandler(config)
+        tts._synthesize(sentences[:2])  # Warm up (again, for the current path)
+
+        elapsed, audio_seconds = 0.0, 0.0
+        for _ in range(args.repeats):
+            tts.s_prev = None
+            start = time.perf_counter()
+            wavs = tts._synthesize(sentences)
+            elapsed += time.perf_counter() - start
+            audio_seconds += sum(len(wav) for wav in wavs) / SAMPLE_RATE
+        print(f"{name:<14}{elapsed / audio_seconds:>8.3f}{elapsed / args.repeats:>10.2f}"
+              f"{torch.get_num_threads():>9}")
+
+        del tts
+        gc.collect()
+
+if __name__ == "__main__":
+    main()
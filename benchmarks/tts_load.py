@@ -0,0 +1,73 @@
+"""
+StyleTTS2 weight loading: training checkpoint vs converted safetensors.
+
+Each measurement runs in a fresh process so page cache is the only shared
+state; reports wall time and peak RSS. With --full, times a whole
+TTSHandler start (which also loads the ASR, F0 and PL-BERT models) instead
+of the weights alone. Converts the checkpoint first if needed.
+
+    python benchmarks/tts_load.py --runs 3
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from common import load_references  # noqa: F401  (puts the repo root on sys.path)
+
+from src.core.config import config
+from src.voice.checkpoint import convert_checkpoint, converted_path
+
+WEIGHTS = os.path.join(config.models.STYLETTS2_PATH, "epoch_2nd_00100.pth")
+
+def child(fmt: str, full: bool):
+    import torch
+
+    start = time.perf_counter()
+    if full:
+        from src.voice.tts import TTSHandler
+        config.tts.converted_weights = fmt == "safetensors"
+        config.tts.cpu_warmup = False
+        TTSHandler(config)
+    elif fmt == "pth":
+        params = torch.load(WEIGHTS, map_location='cpu')['net']
+        for state_dict in params.values():
+            {k[len("module."):] if k.startswith("module.") else k: v for k, v in state_dict.items()}
+    else:
+        from src.voice.checkpoint import load_converted
+        load_converted(converted_path(WEIGHTS))
+    elapsed = time.perf_counter() - start
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb}))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--full", action="store_true", help="Time a whole TTSHandler start")
+    parser.add_argument("--child", choices=["pth", "safetensors"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.full)
+        return
+
+    if not converted_path(WEIGHTS).exists():
+        convert_checkpoint(WEIGHTS)
+
+    print(f"{'format':<14}{'time (s)':>10}{'peak RSS (MB)':>15}")
+    for fmt in ("pth", "safetensors"):
+        results = []
+        for _ in range(args.runs):
+            cmd = [sys.executable, __file__, "--child", fmt] + (["--full"] if args.full else [])
+            output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+        seconds = min(r["seconds"] for r in results)
+        peak_mb = min(r["peak_mb"] for r in results)
+        print(f"{fmt:<14}{seconds:>10.2f}{peak_mb:>15.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Style bank against full diffusion sampling.
+
+Build the bank first (config.tts.style_bank_path by default):
+
+    python -m src.voice.style_bank benchmarks/samples/style_corpus.txt --voice friday
+
+Then, for the reference sentences, compares:
+
+  - style latency: diffusion sampler vs bank lookup
+  - synthesis RTF with config.tts.style_mode "diffusion" vs "bank"
+  - style distance: bank style vs sampled styles (cosine distance), next to
+    the distance between two independent samples as a noise floor
+
+    python benchmarks/tts_style_bank.py --repeats 3
+"""
+import argparse
+import time
+
+import torch.nn.functional as F
+
+from common import load_references
+
+from src.core.config import config
+from src.voice.style_bank import StyleBank
+from src.voice.tts import SAMPLE_RATE, TTSHandler
+
+def rtf(tts, sentences, repeats):
+    elapsed, audio_seconds = 0.0, 0.0
+    for _ in range(repeats):
+        tts.s_prev = None
+        start = time.perf_counter()
+        wavs = tts._synthesize(sentences)
+        elapsed += time.perf_counter() - start
+        audio_seconds += sum(len(wav) for wav in wavs) / SAMPLE_RATE
+    return elapsed / audio_seconds
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bank", default=config.tts.style_bank_path)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    tts = TTSHandler(config)
+    bank = StyleBank.load(args.bank).to(tts.device)
+
+    sentences = list(load_references().values())
+    tts._synthesize(sentences[:1])  # Warm up
+
+    # Style computation alone
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        embeddings, sampled = tts._sample_styles(sentences)
+    sample_time = (time.perf_counter() - start) / args.repeats
+    _, resampled = tts._sample_styles(sentences)
+
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        banked = bank.lookup(
+            embeddings, emotion=config.tts.style_emotion,
+            k=config.tts.style_bank_k, temperature=config.tts.style_bank_temperature
+        )
+    lookup_time = (time.perf_counter() - start) / args.repeats
+
+    bank_distance = 1 - F.cosine_similarity(banked.float(), sampled.float()).mean().item()
+    noise_floor = 1 - F.cosine_similarity(resampled.float(), sampled.float()).mean().item()
+
+    # End to end
+    diffusion_rtf = rtf(tts, sentences, args.repeats)
+    tts.style_bank = bank
+    bank_rtf = rtf(tts, sentences, args.repeats)
+
+    print(f"{len(sentences)} sentences on {tts.device}, bank of {len(bank)} ({bank.voice})")
+    print(f"{'':<12}{'style (ms)':>12}{'RTF':>8}")
+    print(f"{'diffusion':<12}{sample_time * 1000:>12.1f}{diffusion_rtf:>8.3f}")
+    print(f"{'bank':<12}{lookup_time * 1000:>12.1f}{bank_rtf:>8.3f}")
+    print(f"Cosine distance to sampled style: bank {bank_distance:.4f}, "
+          f"another sample {noise_floor:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Headless replay of the voice loop through a file audio source.
+
+Each bundled sample is played back through the recorder (VAD + Whisper)
+and optionally the LLM, reporting how long each turn takes after the
+audio has been delivered.
+
+    python benchmarks/voice_loop.py --realtime --llm
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from common import load_samples, percentile
+
+from src.voice.recorder import InterruptibleRecorder
+from src.voice.sources import FileSource
+from src.voice.stt import VoiceProcessor
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--realtime", action="store_true", help="Pace audio like a live microphone")
+    parser.add_argument("--llm", action="store_true", help="Also time the LLM completion")
+    args = parser.parse_args()
+
+    voice_processor = VoiceProcessor()
+    llm = None
+    if args.llm:
+        from src.core.llm import LLMHandler
+        llm = LLMHandler()
+
+    stt_times, llm_times = [], []
+    for sample_id, audio in load_samples():
+        # Trailing silence lets the VAD endpoint the utterance like a live user would
+        padded = np.concatenate([audio, np.zeros(16000, dtype=np.float32)])
+        source = FileSource(padded, realtime=args.realtime)
+        recorder = InterruptibleRecorder(voice_processor, source=source)
+
+        start = time.perf_counter()
+        text = await recorder.record()
+        elapsed = time.perf_counter() - start
+        stt_times.append(elapsed - len(audio) / 16000 if args.realtime else elapsed)
+
+        if llm:
+            start = time.perf_counter()
+            await llm.create_completion(text)
+            llm_times.append(time.perf_counter() - start)
+        print(f"{sample_id}: {text}")
+
+    label = "after end of speech" if args.realtime else "total"
+    print(f"\nSTT ({label}): avg {sum(stt_times) / len(stt_times):.3f}s, p95 {percentile(stt_times, 95):.3f}s")
+    if llm_times:
+        print(f"LLM: avg {sum(llm_times) / len(llm_times):.3f}s, p95 {percentile(llm_times, 95):.3f}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,37 +3,72 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import asyncio
+import argparse
 from src.core.llm import LLMHandler
 from src.voice.recorder import InterruptibleRecorder
+from src.voice.sources import FileSource
 from src.voice.stt import VoiceProcessor
+from src.voice.tts import TTSHandler
+from src.voice.player import AudioPlayer
+from src.voice.prewarm import PhraseBank
 from src.core.conversation import ConversationHandler
-from src.core.config import FridayConfig
+from src.core.config import config
+from src.core.cpu_plan import partition_cores
 from src.core.memory import ConversationMemory
 
-async def main():
+async def main(replay: str = None):
     try:
-        # Initialize config
-        config = FridayConfig()
+        config.verify_models()
+        
+        # Core budgets are fixed when the engines load, so plan them first
+        partition_cores(config)
         
         # Initialize components
         voice_processor = VoiceProcessor()
         llm = LLMHandler()
-        recorder = InterruptibleRecorder(voice_processor)
+        # Replay a recording instead of the microphone when requested
+        source = FileSource(replay, realtime=True) if replay else None
+        recorder = InterruptibleRecorder(voice_processor, source=source)
         memory = ConversationMemory()
         
-        # Create conversation handler (no need to pass TTS separately)
+        # Create conversation handler with streaming TTS playback
+        tts = TTSHandler(config)
+        # Barge-in shares the recorder's microphone stream
+        player = AudioPlayer(source=recorder.source)
         conversation = ConversationHandler(
             llm=llm,
             recorder=recorder,
-            memory=memory
+            memory=memory,
+            tts=tts,
+            player=player
         )
         
+        # Fill the audio cache with stock phrases while nobody is talking
+        phrase_bank = None
+        if config.tts.prewarm:
+            phrase_bank = PhraseBank(
+                tts,
+                config.tts.prewarm_phrases,
+                idle_seconds=config.tts.prewarm_idle_seconds,
+                is_busy=lambda: conversation.busy
+            )
+            phrase_bank.start()
+        
         # Start conversation
-        await conversation.start_conversation()
+        try:
+            await conversation.start_conversation()
+        finally:
+            if phrase_bank:
+                await phrase_bank.close()
+            await tts.close()
+            player.close()
         
     except Exception as e:
         print(f"Error in main: {e}")
         raise
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="FRIDAY voice assistant")
+    parser.add_argument("--replay", help="WAV file to use as microphone input")
+    args = parser.parse_args()
+    asyncio.run(main(args.replay))
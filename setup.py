@@ -9,7 +9,9 @@ setup(
         "torchaudio>=2.0.0",
         "numpy>=1.20.0",
         "loguru>=0.7.0",
+        "colorama>=0.4.0",
         "transformers>=4.30.0",
+        "safetensors>=0.4.0",
         "phonemizer>=3.2.1",
         "nltk>=3.8.1",
         "g2p-en>=2.1.0",
@@ -25,6 +27,7 @@ setup(
     extras_require={
         "dev": [
             "pytest>=7.0.0",
+            "fakeredis>=2.0.0",
             "black>=22.0.0",
             "isort>=5.0.0",
         ]
@@ -117,11 +117,11 @@ async def chat_endpoint(request: ChatRequest):
         
         audio = None
         if not request.stream:
-            audio = await voice_processor.tts.generate_speech(response)
+            audio = await conversation_handler.tts.generate_speech(response)
             
         return ChatResponse(
             text=response,
-            audio=audio.cpu().numpy().tobytes() if audio is not None else None,
+            audio=audio.to_wav_bytes() if audio is not None else None,
             session_id=session.id
         )
         
@@ -0,0 +1,84 @@
+import time
+from threading import Event, Lock
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+from .metrics import CancellationMetrics
+
+class OperationCancelled(Exception):
+    """Raised by work that noticed its cancellation token"""
+
+class CancellationToken:
+    """
+    Cooperative cancellation for one conversation turn.
+
+    Cancelled from any thread (typically the player's barge-in thread) and
+    checked by every stage: llama.cpp polls it after each token, StyleTTS2
+    between model stages, and the player stops as soon as it is set. Each
+    stage calls `acknowledge` once it has actually stopped, which records
+    how long that took.
+    """
+
+    def __init__(self, metrics: Optional[CancellationMetrics] = None):
+        self.metrics = metrics
+        self.reason: Optional[str] = None
+        self.cancelled_at: Optional[float] = None
+        self._event = Event()
+        self._lock = Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self._acknowledged = set()
+
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+    def cancel(self, reason: str = "cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self.cancelled_at = time.perf_counter()
+            self._event.set()
+            callbacks = list(self._callbacks)
+
+        if self.metrics is not None:
+            self.metrics.add_cancel(reason)
+        logger.debug(f"Turn cancelled: {reason}")
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Cancellation callback failed: {e}")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run `callback` on cancellation (immediately if already cancelled)
+
+        Returns:
+            A function that unregisters the callback
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove(callback)
+        callback()
+        return lambda: None
+
+    def _remove(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def acknowledge(self, stage: str):
+        """Record that `stage` has stopped working on the cancelled turn"""
+        if not self._event.is_set() or stage in self._acknowledged:
+            return
+        self._acknowledged.add(stage)
+        latency = time.perf_counter() - self.cancelled_at
+        if self.metrics is not None:
+            self.metrics.add_latency(stage, latency)
+        logger.debug(f"{stage} stopped {latency * 1000:.1f}ms after {self.reason}")
@@ -5,7 +5,6 @@ from dataclasses import dataclass, field
 import torch
 import yaml
 import json
-import nltk
 from loguru import logger
 from colorama import init, Fore, Style
 import sys
@@ -30,15 +29,25 @@ class SystemConfig:
     device: str = "cuda:0" if torch.cuda.is_available() else "cpu"
     gpu_layers: int = 35  # Adjust based on VRAM availability for LLaMA
     num_threads: int = 6  # Adjust based on your Ryzen 5 core count
+    llm_threads: int = 4  # llama.cpp generation threads
+    llm_batch_threads: int = 0  # Prompt processing threads; 0 uses every core
     
     # Audio settings
     sample_rate: int = 16000
     chunk_size: int = 1024
+    save_debug_audio: bool = False  # Dump each recording to temp/audio as WAV
     
     # Inference settings
     max_tokens: int = 2048
     temperature: float = 0.7
     top_p: float = 0.95
+    speculative_llm: bool = False  # Start the LLM on the partial transcript at a likely endpoint
+    
+    # Conversation pipeline (capture -> STT -> LLM -> TTS -> playback)
+    pipeline: bool = True  # Run the stages concurrently instead of one turn at a time
+    pipeline_queue_size: int = 1  # Turns waiting in front of each stage
+    pipeline_audio_queue: int = 4  # Synthesized sentences buffered ahead of playback
+    listen_during_playback: bool = False  # Capture during the reply's tail; needs echo cancellation or headphones
 
 @dataclass
 class APIConfig:
@@ -56,14 +65,114 @@ class RedisConfig:
     db: int = 0
     password: Optional[str] = None
     ttl: int = 3600  # Default cache TTL (1 hour)
+    codec: str = "json"  # Default value encoding: "json", "msgpack" or "raw"
+    max_connections: int = 16  # One pool shared by every client in the process
+    socket_timeout: float = 0.25  # Seconds; Redis is a cache, never worth waiting on
+    connect_timeout: float = 0.25
+    failure_threshold: int = 3  # Consecutive failures that open the circuit breaker
+    reset_timeout: float = 30.0  # Seconds before a tripped breaker tries Redis again
+    fallback_entries: int = 10000  # In-process store used while Redis is down
+    fallback_bytes: int = 64 * 1024 * 1024  # Cap on its values; cached audio runs 50-150 KB each
 
 @dataclass
 class WhisperConfig:
     beam_size: int = 5
-    word_timestamps: bool = True
-    compute_type: str = "float16"  # or "int8" for CPU
+    word_timestamps: bool = False  # Streaming turns these on for its own passes
+    compute_type: str = "float16" if torch.cuda.is_available() else "int8"
     language: Optional[str] = None  # Auto-detect language
     task: str = "transcribe"
+    vad_filter: bool = False  # Silero VAD inside faster-whisper
+    cpu_threads: int = 4  # CTranslate2 intra-op threads
+    num_workers: int = 1  # Concurrent transcriptions (also executor size)
+
+    # "beam" always uses beam_size; "adaptive" decodes greedily first and
+    # re-runs with beam search only for low-confidence segments
+    decode_mode: str = "beam"
+    fallback_logprob_threshold: float = -0.7  # Re-decode if avg_logprob is below
+    fallback_no_speech_threshold: float = 0.6  # Re-decode if no_speech_prob is above
+    fallback_compression_ratio_threshold: float = 2.4  # Re-decode if repetitive
+
+    # Cross-client micro-batching. Only used with a fixed `language` (one
+    # prompt per batch), task "transcribe", no VAD and no word timestamps;
+    # otherwise every utterance is transcribed on its own
+    batch_size: int = 8  # Max utterances decoded together
+    batch_wait_ms: float = 5.0  # How long to wait for more utterances
+
+    # Streaming transcription while the user is speaking
+    streaming: bool = False
+    stream_step_seconds: float = 1.0  # Re-decode the tail this often
+
+@dataclass
+class TTSConfig:
+    converted_weights: bool = True  # Load epoch_2nd_00100.safetensors when it exists
+    batch_size: int = 4  # Sentences run through StyleTTS2 together
+    alpha: float = 0.7  # Style carry-over between sentences
+    diffusion_steps: int = 5
+    embedding_scale: float = 1.2
+
+    # "fixed" always uses diffusion_steps; "adaptive" picks a tier per call
+    # from the measured real-time factor so synthesis fits its latency budget
+    step_policy: str = "fixed"
+    diffusion_tiers: List[int] = field(default_factory=lambda: [3, 5, 10, 15])
+    first_sentence_budget: float = 0.5  # Seconds to synthesize a reply's first sentence
+    playback_budget_ratio: float = 0.8  # Share of queued playback time later sentences may use
+    rtf_smoothing: float = 0.3  # EMA weight of the newest RTF measurement
+
+    # "diffusion" samples a style per sentence; "bank" blends precomputed
+    # styles of a fixed voice (built with python -m src.voice.style_bank)
+    style_mode: str = "diffusion"
+    style_bank_path: Optional[str] = "models/style_bank/friday.pt"
+    style_emotion: Optional[str] = "neutral"  # None matches any emotion in the bank
+    style_bank_k: int = 4  # Nearest entries blended per sentence
+    style_bank_temperature: float = 0.05  # Softmax temperature over cosine similarity
+
+    # CPU execution profile (ignored on GPU)
+    cpu_profile: bool = True
+    cpu_dtype: str = "auto"  # "auto" (bfloat16 where the CPU has native support), "bfloat16" or "float32"
+    cpu_threads: int = 0  # Intra-op threads; 0 uses half the logical cores
+    cpu_interop_threads: int = 1
+    cpu_quantize: bool = False  # Dynamic int8 LSTM/Linear in the predictor and text encoder
+    cpu_channels_last: bool = False  # Only affects Conv2d layers
+    cpu_compile: bool = False  # torch.compile the decoder
+    cpu_warmup: bool = True
+
+    phoneme_cache_size: int = 2048  # Sentences kept as token IDs
+    phoneme_cache_path: Optional[str] = "cache/phonemes.json"  # None keeps it in memory only
+    audio_cache: bool = True  # Replay previously synthesized sentences
+    audio_cache_bytes: int = 64 * 1024 * 1024  # In-process tier budget
+    audio_cache_dir: Optional[str] = "cache/tts"  # Used when Redis is not running
+    audio_cache_ttl: int = 7 * 24 * 3600  # Expiry for cached sentences (Redis and disk)
+    audio_cache_disk_bytes: int = 512 * 1024 * 1024  # Cap on audio_cache_dir
+
+    # Stock phrases synthesized into the audio cache in the background
+    prewarm: bool = True
+    prewarm_idle_seconds: float = 3.0  # Only after this long without a speech request
+    goodbye_phrase: str = "Goodbye!"
+    error_phrase: str = "Sorry, something went wrong. Could you say that again?"
+    prewarm_phrases: List[str] = field(default_factory=lambda: [
+        "Goodbye!",
+        "Sorry, something went wrong. Could you say that again?",
+        "Hello! How can I help you?",
+        "Sure.",
+        "Okay.",
+        "Done.",
+        "Let me check.",
+        "I didn't catch that. Could you repeat it?"
+    ])
+
+@dataclass
+class VADConfig:
+    always_listening: bool = False  # Gate the mic with VAD instead of push-to-talk turns
+    frame_ms: int = 30  # WebRTC VAD accepts 10, 20 or 30ms frames
+    webrtc_mode: int = 2  # 0 (lenient) to 3 (aggressive)
+    energy_margin_db: float = 6.0  # Frames this far above the noise floor reach WebRTC VAD
+    noise_floor_db: float = -60.0  # Starting estimate, adapted on non-speech frames
+    noise_adapt_rate: float = 0.05  # EMA rate for the noise floor
+    min_speech_ms: int = 250  # Shorter bursts are discarded as noise
+    hangover_ms: int = 500  # Trailing silence that ends a segment
+    padding_ms: int = 150  # Silence kept around trimmed speech
+    endpoint_ms: int = 200  # Silence treated as a likely endpoint for speculation
+    max_segment_seconds: float = 30.0
 
 class ServerConfig:
     def __init__(self):
@@ -86,6 +195,30 @@ class MemoryConfig:
         "important"
     ])
 
+@dataclass
+class PoolConfig:
+    workers: int = 0  # 0 lets the engine using the pool choose
+    cores: Optional[List[int]] = None  # Pin the pool's workers to these CPUs (Linux)
+    processes: bool = False  # Process pool for picklable CPU-bound work
+
+@dataclass
+class SchedulerConfig:
+    # Named executor pools used by ParallelProcessor, one per engine
+    pools: Dict[str, PoolConfig] = field(default_factory=lambda: {
+        "llm": PoolConfig(workers=1),  # llama.cpp contexts are not thread-safe
+        "stt": PoolConfig(),  # Sized by whisper.num_workers
+        "tts": PoolConfig(workers=1),
+        "io": PoolConfig(workers=4),
+        "cpu": PoolConfig(workers=2, processes=True),
+        "gpu": PoolConfig(workers=2),
+    })
+    gpu_concurrency: int = 2  # GPU operations allowed at once in run_gpu_bound
+
+    # CPU core budgets per engine (see cpu_plan): "off", "balanced" or "interactive"
+    partition: str = "off"
+    core_weights: Dict[str, float] = field(default_factory=lambda: {"stt": 1.0, "llm": 2.0, "tts": 1.5})
+    background_cores: int = 1  # Physical cores kept for the io, cpu and gpu pools
+
 @dataclass
 class FridayConfig:
     models: ModelPaths = field(default_factory=ModelPaths)
@@ -93,14 +226,21 @@ class FridayConfig:
     api: APIConfig = field(default_factory=APIConfig)
     server: ServerConfig = field(default_factory=ServerConfig)
     memory: MemoryConfig = field(default_factory=MemoryConfig)
+    whisper: WhisperConfig = field(default_factory=WhisperConfig)
+    vad: VADConfig = field(default_factory=VADConfig)
+    tts: TTSConfig = field(default_factory=TTSConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
+    redis: RedisConfig = field(default_factory=RedisConfig)
 
     def __post_init__(self):
-        """Verify models exist and paths are valid"""
-        self._verify_models()
         setup_logging()
     
-    def _verify_models(self):
-        """Verify all model files exist"""
+    def verify_models(self):
+        """
+        Verify all model files exist. Called by the entry points before
+        loading anything, not at import, so tools and tests that never load
+        a model work without them
+        """
         required_files = [
             self.models.WHISPER_PATH,
             self.models.LLAMA_PATH,
@@ -120,6 +260,8 @@ class NLTKConfig:
         
     def ensure_data(self):
         """Ensure required NLTK data is available"""
+        import nltk
+
         for package in self.required_packages:
             try:
                 nltk.data.find(f'tokenizers/{package}')
@@ -3,37 +3,105 @@ from pathlib import Path
 from threading import Event
 import asyncio
 from colorama import init, Fore, Style
+from typing import Optional
+from .cancellation import CancellationToken
+from .config import config
+from .metrics import CancellationMetrics
+from .pipeline import ConversationPipeline
+from .speculative import SpeculativeCompletion
 
 class ConversationHandler:
-    def __init__(self, llm, recorder, memory):
+    def __init__(self, llm, recorder, memory, tts=None, player=None):
         self.llm = llm
         self.recorder = recorder
         self.memory = memory
         self.stop_event = Event()
         
-        # Import the TTS handler directly from testen.py
-        from models.StyleTTS2.testen import tts_handler
-        self.tts = tts_handler
+        # Overlap LLM prompt processing with the VAD silence window
+        self.speculation = None
+        if config.system.speculative_llm and getattr(recorder, 'streamer', None):
+            self.speculation = SpeculativeCompletion(llm)
+        
+        if tts is None:
+            # Import the TTS handler directly from testen.py
+            from models.StyleTTS2.testen import tts_handler
+            tts = tts_handler
+        self.tts = tts
+        self.player = player
+        self.busy = False  # Between a transcript and the end of its reply
+        self.cancellation_metrics = CancellationMetrics()
+        self.pipeline = None
+
+    async def speak(self, text: str, cancel: Optional[CancellationToken] = None):
+        """Say a reply, streaming it when a player is available"""
+        if self.player and hasattr(self.tts, 'stream_speech'):
+            # Play sentence N while sentence N+1 is synthesized
+            await self.player.play_stream(self.tts.stream_speech(text, cancel), cancel=cancel)
+        elif self.player:
+            audio = await self.tts.generate_speech(text, cancel=cancel)
+            if audio is not None:
+                await self.player.play_audio(audio, cancel=cancel)
+        else:
+            audio_file = await self.tts.generate_speech(text)
+            if audio_file:
+                await self.tts.play(audio_file)
 
     async def start_conversation(self):
         logger.info("Starting FRIDAY...\n", essential=True)
         
+        if config.system.pipeline and self.player and hasattr(self.tts, 'stream_speech'):
+            # Overlap listening, generation, synthesis and playback across turns
+            self.pipeline = ConversationPipeline(self)
+            reason = await self.pipeline.run()
+            logger.info("\nGoodbye!", essential=True)
+            if reason == "exit":
+                await self.speak(config.tts.goodbye_phrase)
+            return
+        
+        await self._serial_conversation()
+
+    async def _serial_conversation(self):
+        """One turn at a time: record, transcribe, reply, speak"""
         while not self.stop_event.is_set():
             try:
                 # Show listening status
                 logger.info("🎤 Listening... (Press ESC to stop)", essential=True, status=True)
                 
-                user_input = await self.recorder.record()
+                if self.speculation:
+                    user_input = await self.recorder.record(
+                        on_endpoint=self.speculation.start,
+                        on_resume=self.speculation.cancel
+                    )
+                else:
+                    user_input = await self.recorder.record()
                 
                 if user_input and user_input.lower() == "exit" or user_input == "interrupted":
+                    if self.speculation:
+                        self.speculation.cancel()
                     logger.info("\nGoodbye!", essential=True)
+                    if user_input != "interrupted":
+                        await self.speak(config.tts.goodbye_phrase)
                     break
                     
                 if user_input:
+                    self.busy = True
                     # Log user input in green
                     logger.info(f"{user_input}", essential=True, speaker="user")
+                    
+                    # Barge-in from here on cancels generation, synthesis and playback
+                    cancel = CancellationToken(self.cancellation_metrics)
+                    if self.player:
+                        self.player.listen(cancel)
                 
-                    response = await self.llm.create_completion(user_input)
+                    if self.speculation:
+                        response = await self.speculation.resolve(user_input, cancel)
+                        logger.debug(f"Speculation stats: {self.speculation.metrics.get_summary()}")
+                    else:
+                        response = await self.llm.create_completion(user_input, cancel)
+                    
+                    if cancel.is_cancelled():
+                        logger.info("Reply abandoned, listening again", essential=True)
+                        continue
                     
                     if response:
                         # Log FRIDAY's response in pink/magenta
@@ -44,11 +112,19 @@ class ConversationHandler:
                                       essential=True, generation_time=True)
                         
                         await self.memory.save(user_input, response)
-                        audio_file = await self.tts.generate_speech(response)
-                        if audio_file:
-                            await self.tts.play(audio_file)
+                        await self.speak(response, cancel)
+                        if cancel.is_cancelled():
+                            logger.debug(f"Cancellation stats: {self.cancellation_metrics.get_summary()}")
                 
             except Exception as e:
                 logger.error(f"Error in conversation loop: {e}")
+                try:
+                    await self.speak(config.tts.error_phrase)
+                except Exception as speak_error:
+                    logger.error(f"Error speaking apology: {speak_error}")
                 await asyncio.sleep(0.1)
-                continue 
\ No newline at end of file
+                continue
+            finally:
+                self.busy = False
+                if self.player:
+                    self.player.stop_listening() 
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+CPU core budgets for the inference engines.
+
+Whisper (CTranslate2), llama.cpp and StyleTTS2 (torch) each size their own
+thread pool for the whole machine, so when stages overlap they oversubscribe
+the same cores. The planner reads the host topology once at startup and gives
+every engine a core set and a matching thread count; the sets are applied as
+the CPU affinity of the engine's executor pool (see ParallelProcessor), which
+the engine's native threads inherit.
+
+Presets:
+    off          Leave thread counts and affinity alone
+    balanced     Disjoint cores for STT, LLM and TTS, split by weight
+    interactive  STT keeps its own cores (streaming decoding and speculative
+                 generation overlap with capture); LLM and TTS share the rest.
+                 Within one conversation they mostly take turns, so whichever
+                 is active has those cores to itself. They do overlap when a
+                 reply is synthesized while the next turn generates, when
+                 phrase prewarming runs, or with concurrent API sessions; use
+                 "balanced" for multi-session servers
+
+Both partitioning presets keep the io, cpu and gpu pools on reserved
+background cores, and run one compute thread per physical core. The main
+thread is deliberately left unpinned: it runs the event loop that every stage
+hands off through, and PortAudio's callback threads inherit its affinity.
+Squeezing both onto a single background core would let a busy I/O pool delay
+playback and barge-in; leaving them free costs at most a little cache
+sharing with the engines, which only run on their own pools.
+"""
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from .config import FridayConfig, config as global_config
+
+ENGINES = ("stt", "llm", "tts")
+BACKGROUND_POOLS = ("io", "cpu", "gpu")
+
+@dataclass
+class CoreSet:
+    cpus: List[int]  # Logical CPUs the engine may run on
+    threads: int  # Compute threads, one per physical core
+
+@dataclass
+class Topology:
+    cores: List[List[int]]  # Physical cores as lists of sibling logical CPUs
+
+    @property
+    def logical_cpus(self) -> List[int]:
+        return sorted(cpu for core in self.cores for cpu in core)
+
+def read_topology(cpus: Optional[Iterable[int]] = None) -> Topology:
+    """
+    Physical cores available to this process, grouped from sysfs
+
+    Args:
+        cpus: Logical CPUs to consider; defaults to the process's affinity
+
+    Returns:
+        Cores ordered by package and core id. Without sysfs (non-Linux)
+        every logical CPU is treated as its own core.
+    """
+    if cpus is None:
+        cpus = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else range(os.cpu_count() or 1)
+    cpus = sorted(cpus)
+
+    groups: Dict[tuple, List[int]] = {}
+    for cpu in cpus:
+        topology = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology")
+        try:
+            key = (
+                int((topology / "physical_package_id").read_text()),
+                int((topology / "core_id").read_text())
+            )
+        except (OSError, ValueError):
+            key = (0, cpu)
+        groups.setdefault(key, []).append(cpu)
+    return Topology([groups[key] for key in sorted(groups)])
+
+def _split(count: int, weights: Dict[str, float]) -> Dict[str, int]:
+    """Largest-remainder split of `count` cores, at least one per engine"""
+    total = sum(weights.values())
+    shares = {name: count * weight / total for name, weight in weights.items()}
+    sizes = {name: max(1, int(share)) for name, share in shares.items()}
+    by_remainder = sorted(weights, key=lambda name: shares[name] - int(shares[name]), reverse=True)
+    while sum(sizes.values()) < count:
+        for name in by_remainder:
+            if sum(sizes.values()) == count:
+                break
+            sizes[name] += 1
+    while sum(sizes.values()) > count:
+        largest = max(sizes, key=sizes.get)
+        sizes[largest] -= 1
+    return sizes
+
+def _core_set(cores: List[List[int]]) -> CoreSet:
+    return CoreSet(sorted(cpu for core in cores for cpu in core), max(1, len(cores)))
+
+def plan_cores(
+    topology: Topology,
+    preset: str = "balanced",
+    weights: Optional[Dict[str, float]] = None,
+    background_cores: int = 1
+) -> Optional[Dict[str, CoreSet]]:
+    """
+    Core set and thread count per engine
+
+    Args:
+        topology: From read_topology
+        preset: "off", "balanced" or "interactive"
+        weights: Relative share of the cores per engine ("stt", "llm", "tts")
+        background_cores: Physical cores kept for the io, cpu and gpu pools
+
+    Returns:
+        CoreSets keyed by engine plus "background", or None when the preset
+        is "off" or the host is too small to partition
+    """
+    if preset == "off":
+        return None
+    if preset not in ("balanced", "interactive"):
+        raise ValueError(f"Unknown core partitioning preset: {preset}")
+
+    weights = {name: (weights or {}).get(name, 1.0) for name in ENGINES}
+    cores = topology.cores
+    needed = background_cores + (len(ENGINES) if preset == "balanced" else 2)
+    if len(cores) < needed:
+        logger.warning(f"{len(cores)} physical cores are too few for the '{preset}' preset; not partitioning")
+        return None
+
+    # Core 0 usually services interrupts, so it goes to background work
+    background, foreground = cores[:background_cores], cores[background_cores:]
+    plan = {"background": _core_set(background)}
+
+    if preset == "balanced":
+        sizes = _split(len(foreground), weights)
+        start = 0
+        for name in ENGINES:
+            plan[name] = _core_set(foreground[start:start + sizes[name]])
+            start += sizes[name]
+    else:
+        # The LLM and TTS take turns, so STT is sized against either, not both
+        sizes = _split(len(foreground), {"stt": weights["stt"], "shared": max(weights["llm"], weights["tts"])})
+        plan["stt"] = _core_set(foreground[:sizes["stt"]])
+        shared = _core_set(foreground[sizes["stt"]:])
+        plan["llm"] = shared
+        plan["tts"] = CoreSet(list(shared.cpus), shared.threads)
+    return plan
+
+def describe(plan: Optional[Dict[str, CoreSet]]) -> str:
+    if plan is None:
+        return "not partitioned"
+    return ", ".join(
+        f"{name}: {len(core_set.cpus)} cpus {core_set.cpus} / {core_set.threads} threads"
+        for name, core_set in plan.items()
+    )
+
+def apply_core_plan(plan: Dict[str, CoreSet], config: FridayConfig = global_config):
+    """
+    Write a plan into the configuration. Must run before the engines are
+    loaded, since thread counts are fixed at model load and pools take their
+    affinity when created. The calling thread keeps its affinity.
+    """
+    pools = config.scheduler.pools
+    for name in ENGINES:
+        pools[name].cores = plan[name].cpus
+    for name in BACKGROUND_POOLS:
+        if name in pools:
+            pools[name].cores = plan["background"].cpus
+
+    config.whisper.cpu_threads = plan["stt"].threads
+    config.system.llm_threads = plan["llm"].threads
+    config.system.llm_batch_threads = plan["llm"].threads
+    config.tts.cpu_threads = plan["tts"].threads
+
+def partition_cores(config: FridayConfig = global_config) -> Optional[Dict[str, CoreSet]]:
+    """Plan and apply core budgets from config.scheduler at startup"""
+    scheduler = config.scheduler
+    plan = plan_cores(
+        read_topology(),
+        scheduler.partition,
+        scheduler.core_weights,
+        scheduler.background_cores
+    )
+    if plan is not None:
+        apply_core_plan(plan, config)
+    logger.info(f"CPU cores ({scheduler.partition}): {describe(plan)}")
+    return plan
@@ -1,4 +1,4 @@
-from llama_cpp import Llama
+from llama_cpp import Llama, StoppingCriteriaList
 from .config import config
 from ..utils.logger import get_logger
 import os
@@ -8,8 +8,12 @@ from loguru import logger
 from pathlib import Path
 import sys
 import contextlib
+import asyncio
+from typing import Callable, Optional, Tuple
+from .cancellation import CancellationToken
 from .context_memory import ContextMemory
 from .memory import ConversationMemory
+from .parallel_processor import processor
 
 logger = get_logger()
 
@@ -35,7 +39,8 @@ class LLMHandler:
                     model_path=model_path,
                     n_ctx=2048,
                     n_batch=8,
-                    n_threads=4,
+                    n_threads=config.system.llm_threads,
+                    n_threads_batch=config.system.llm_batch_threads or None,
                     n_gpu_layers=1,
                     f16_kv=True,
                     vocab_only=False,
@@ -64,6 +69,9 @@ class LLMHandler:
             self.context_memory = ContextMemory(max_context=10)
             self.conversation_memory = ConversationMemory()
             
+            # llama.cpp contexts are not thread-safe; one worker serialises generation
+            self.executor = processor.executor("llm", workers=1)
+            
         except Exception as e:
             import traceback
             detailed_error = f"Failed to initialize LLaMA: {str(e)}\n"
@@ -92,65 +100,105 @@ class LLMHandler:
             sys.stderr = old_stderr
             null.close()
     
-    async def create_completion(self, prompt: str) -> str:
+    async def create_completion(self, prompt: str, cancel: Optional[CancellationToken] = None) -> str:
         """
         Create a completion for the given prompt using LLaMA
+        
+        Args:
+            prompt: The user's message
+            cancel: Stops llama.cpp at the next token; a cancelled
+                completion returns "" and is not committed to memory
         """
         try:
-            # Get context history
-            context = self.context_memory.get_context()
-            
-            # Check if prompt contains important markers
-            is_important = False
-            for category, triggers in self.conversation_memory.memory_triggers.items():
-                if any(trigger in prompt.lower() for trigger in triggers):
-                    is_important = True
-                    break
-            
-            # Format prompt with context
-            context_str = "\n".join([
-                f"{msg['role']}: {msg['content']}"
-                for msg in context
-            ])
+            formatted_prompt, is_important = self.build_prompt(prompt)
             
-            formatted_prompt = (
-                f"{self.personality}\n\n"
-                f"Previous context:\n{context_str}\n\n"
-                f"Human: {prompt}\n"
-                "Assistant:"
+            # Generate response off the event loop
+            loop = asyncio.get_running_loop()
+            response_text = await loop.run_in_executor(
+                self.executor, self.generate, formatted_prompt,
+                cancel.is_cancelled if cancel else None
             )
+            if cancel and cancel.is_cancelled():
+                cancel.acknowledge("llm")
+                return ""
             
-            # Generate response
-            response = self.model.create_completion(
-                formatted_prompt,
-                max_tokens=50,  # Reduced for faster responses
-                temperature=0.7,
-                top_p=0.9,
-                stop=["Human:", "Assistant:", "\n\n"],
-                stream=False,
-                repeat_penalty=1.2  # Reduced for more natural responses
-            )
-            
-            # Extract and clean response text
-            if isinstance(response, dict):
-                response_text = response['choices'][0]['text'].strip()
-            else:
-                response_text = str(response).strip()
-            
-            # Clean response - remove any metadata or extra content
-            response_text = response_text.split('\n')[0]  # Take only first line
-            response_text = response_text.replace('assistant:', '').replace('human:', '').strip()
-            
-            # Always add to context memory for conversation flow
-            self.context_memory.add_message("human", prompt, important=is_important)
-            self.context_memory.add_message("assistant", response_text, important=is_important)
-            
-            # Only save to conversation memory if it's important
-            if is_important:
-                await self.conversation_memory.save(prompt, response_text)
-            
+            await self.commit(prompt, response_text, is_important)
             return response_text
             
         except Exception as e:
             logger.error(f"Error generating response: {e}")
-            return ""
\ No newline at end of file
+            return ""
+
+    def build_prompt(self, prompt: str) -> Tuple[str, bool]:
+        """
+        Format the prompt with personality and context
+        
+        Returns:
+            Formatted prompt and whether the exchange should be remembered
+        """
+        # Get context history
+        context = self.context_memory.get_context()
+        
+        # Check if prompt contains important markers
+        is_important = False
+        for category, triggers in self.conversation_memory.memory_triggers.items():
+            if any(trigger in prompt.lower() for trigger in triggers):
+                is_important = True
+                break
+        
+        # Format prompt with context
+        context_str = "\n".join([
+            f"{msg['role']}: {msg['content']}"
+            for msg in context
+        ])
+        
+        formatted_prompt = (
+            f"{self.personality}\n\n"
+            f"Previous context:\n{context_str}\n\n"
+            f"Human: {prompt}\n"
+            "Assistant:"
+        )
+        return formatted_prompt, is_important
+
+    def generate(self, formatted_prompt: str, should_stop: Optional[Callable[[], bool]] = None) -> str:
+        """
+        Blocking generation for an already formatted prompt
+        
+        Args:
+            formatted_prompt: Output of build_prompt
+            should_stop: Polled after every token; generation ends when it returns True
+        """
+        stopping_criteria = None
+        if should_stop is not None:
+            stopping_criteria = StoppingCriteriaList([lambda input_ids, logits: should_stop()])
+        
+        response = self.model.create_completion(
+            formatted_prompt,
+            max_tokens=50,  # Reduced for faster responses
+            temperature=0.7,
+            top_p=0.9,
+            stop=["Human:", "Assistant:", "\n\n"],
+            stream=False,
+            repeat_penalty=1.2,  # Reduced for more natural responses
+            stopping_criteria=stopping_criteria
+        )
+        
+        # Extract and clean response text
+        if isinstance(response, dict):
+            response_text = response['choices'][0]['text'].strip()
+        else:
+            response_text = str(response).strip()
+        
+        # Clean response - remove any metadata or extra content
+        response_text = response_text.split('\n')[0]  # Take only first line
+        return response_text.replace('assistant:', '').replace('human:', '').strip()
+
+    async def commit(self, prompt: str, response_text: str, is_important: bool) -> None:
+        """Record a finished exchange in context and long-term memory"""
+        # Always add to context memory for conversation flow
+        self.context_memory.add_message("human", prompt, important=is_important)
+        self.context_memory.add_message("assistant", response_text, important=is_important)
+        
+        # Only save to conversation memory if it's important
+        if is_important:
+            await self.conversation_memory.save(prompt, response_text)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from threading import Lock
 from time import perf_counter
 from typing import Dict, List
 import numpy as np
@@ -68,5 +69,208 @@ class TokenizationMetrics:
             "avg_process_time": avg_time
         }
 
+@dataclass
+class DecodingMetrics:
+    greedy_decodes: int = 0
+    beam_fallbacks: int = 0
+    fallback_reasons: Dict[str, int] = field(default_factory=dict)
+    greedy_times: List[float] = field(default_factory=list)
+    fallback_times: List[float] = field(default_factory=list)
+
+    def add_greedy(self, process_time: float):
+        self.greedy_decodes += 1
+        self.greedy_times.append(process_time)
+
+    def add_fallback(self, reason: str, process_time: float):
+        """Record a beam-search re-decode
+        Args:
+            reason: Which threshold triggered the fallback
+            process_time: Time spent on the beam pass in seconds
+        """
+        self.beam_fallbacks += 1
+        self.fallback_reasons[reason] = self.fallback_reasons.get(reason, 0) + 1
+        self.fallback_times.append(process_time)
+
+    @property
+    def fallback_rate(self) -> float:
+        return self.beam_fallbacks / max(self.greedy_decodes, 1)
+
+    def get_summary(self) -> Dict:
+        return {
+            "greedy_decodes": self.greedy_decodes,
+            "beam_fallbacks": self.beam_fallbacks,
+            "fallback_rate": self.fallback_rate,
+            "fallback_reasons": dict(self.fallback_reasons),
+            "avg_greedy_time": np.mean(self.greedy_times) if self.greedy_times else 0.0,
+            "avg_fallback_time": np.mean(self.fallback_times) if self.fallback_times else 0.0
+        }
+
+@dataclass
+class SpeculationMetrics:
+    started: int = 0
+    hits: int = 0
+    misses: int = 0
+    cancelled: int = 0
+    saved_times: List[float] = field(default_factory=list)
+
+    def add_hit(self, saved_time: float):
+        """Record a committed speculation
+        Args:
+            saved_time: Generation time that overlapped the end of recording
+        """
+        self.hits += 1
+        self.saved_times.append(saved_time)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def get_summary(self) -> Dict:
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "cancelled": self.cancelled,
+            "hit_rate": self.hit_rate,
+            "avg_saved_time": np.mean(self.saved_times) if self.saved_times else 0.0
+        }
+
+@dataclass
+class CancellationMetrics:
+    cancellations: int = 0
+    reasons: Dict[str, int] = field(default_factory=dict)
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+
+    def add_cancel(self, reason: str):
+        self.cancellations += 1
+        self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def add_latency(self, stage: str, latency: float):
+        """Record how long a stage took to stop
+        Args:
+            stage: "llm", "tts" or "playback"
+            latency: Seconds from cancel() to the stage releasing its work
+        """
+        self.latencies.setdefault(stage, []).append(latency)
+
+    def get_summary(self) -> Dict:
+        return {
+            "cancellations": self.cancellations,
+            "reasons": dict(self.reasons),
+            "latency_ms": {
+                stage: {
+                    "avg": float(np.mean(values)) * 1000,
+                    "p95": float(np.percentile(values, 95)) * 1000
+                }
+                for stage, values in self.latencies.items()
+            }
+        }
+
+@dataclass
+class PipelineMetrics:
+    turns: int = 0
+    stage_times: Dict[str, List[float]] = field(default_factory=dict)
+    queue_waits: Dict[str, List[float]] = field(default_factory=dict)
+    max_depths: Dict[str, int] = field(default_factory=dict)
+    first_audio_times: List[float] = field(default_factory=list)
+    overlap_times: List[float] = field(default_factory=list)
+
+    def add_stage(self, stage: str, process_time: float):
+        """Record the time one turn spent in a stage
+        Args:
+            stage: "stt", "llm", "tts" or "playback"
+            process_time: Time taken in seconds
+        """
+        self.stage_times.setdefault(stage, []).append(process_time)
+
+    def add_queue(self, queue: str, wait: float, depth: int):
+        """Record a turn leaving a queue
+        Args:
+            queue: Name of the stage the queue feeds
+            wait: Seconds the turn waited for that stage
+            depth: Items still queued behind it
+        """
+        self.queue_waits.setdefault(queue, []).append(wait)
+        self.max_depths[queue] = max(self.max_depths.get(queue, 0), depth)
+
+    def add_first_audio(self, latency: float):
+        """Seconds from the end of the utterance to the first synthesized audio"""
+        self.first_audio_times.append(latency)
+
+    def add_overlap(self, overlap: float):
+        """Seconds the next capture ran while a reply was still playing"""
+        self.overlap_times.append(overlap)
+
+    def get_summary(self) -> Dict:
+        def ms(values: List[float]) -> Dict:
+            return {
+                "avg": float(np.mean(values)) * 1000,
+                "p95": float(np.percentile(values, 95)) * 1000
+            }
+
+        return {
+            "turns": self.turns,
+            "stage_ms": {stage: ms(values) for stage, values in self.stage_times.items()},
+            "queue_wait_ms": {queue: ms(values) for queue, values in self.queue_waits.items()},
+            "max_queue_depth": dict(self.max_depths),
+            "first_audio_ms": ms(self.first_audio_times) if self.first_audio_times else {},
+            "avg_overlap": np.mean(self.overlap_times) if self.overlap_times else 0.0
+        }
+
+@dataclass
+class PoolMetrics:
+    workers: int = 1
+    created_at: float = field(default_factory=time.time)
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    busy_time: float = 0.0
+    queue_waits: List[float] = field(default_factory=list)
+    run_times: List[float] = field(default_factory=list)
+    # Updated from worker threads and future callbacks
+    _lock: Lock = field(default_factory=Lock, repr=False, compare=False)
+
+    def add_submit(self):
+        with self._lock:
+            self.submitted += 1
+
+    def add_done(self, wait: float, run_time: float, failed: bool = False):
+        """Record a finished call
+        Args:
+            wait: Seconds between submission and a worker picking it up
+            run_time: Seconds the worker spent on it
+            failed: The call raised or was cancelled
+        """
+        with self._lock:
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self.queue_waits.append(wait)
+                self.run_times.append(run_time)
+            self.busy_time += run_time
+
+    @property
+    def pending(self) -> int:
+        return self.submitted - self.completed - self.failed
+
+    @property
+    def utilization(self) -> float:
+        """Share of the pool's worker time spent running calls"""
+        elapsed = time.time() - self.created_at
+        return min(1.0, self.busy_time / (self.workers * elapsed)) if elapsed > 0 else 0.0
+
+    def get_summary(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": self.pending,
+            "utilization": self.utilization,
+            "avg_queue_wait_ms": float(np.mean(self.queue_waits)) * 1000 if self.queue_waits else 0.0,
+            "p95_queue_wait_ms": float(np.percentile(self.queue_waits, 95)) * 1000 if self.queue_waits else 0.0,
+            "avg_run_time": np.mean(self.run_times) if self.run_times else 0.0
+        }
+
 # Global metrics instance
 metrics = PerformanceMetrics() 
\ No newline at end of file
@@ -1,46 +1,204 @@
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
 import asyncio
+import functools
+import os
+import time
 import torch
-from typing import Any, Callable, Coroutine, TypeVar, List
+from threading import Lock
+from typing import Any, Callable, Coroutine, Dict, Iterable, List, Optional, TypeVar
 from loguru import logger
 
+from .config import PoolConfig, config
+from .metrics import PoolMetrics
+
 T = TypeVar('T')
 
+def _pin(cores: Optional[List[int]]):
+    """
+    Pool initializer: restrict the calling worker to `cores`. On Linux this
+    applies per thread, and native threads started from the worker (llama.cpp,
+    CTranslate2 and OpenMP pools) inherit it.
+    """
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError as e:
+        logger.warning(f"Could not pin worker to cores {cores}: {e}")
+
+def _timed_call(func: Callable[..., T], args: tuple, kwargs: dict):
+    """Runs in the worker; wall-clock times are comparable across processes"""
+    started = time.time()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        # Returned rather than raised so the run time is still recorded
+        return started, time.time(), None, e
+    return started, time.time(), result, None
+
+class _MeteredPool:
+    """Records queue wait and run time of everything submitted to the pool"""
+
+    def __init__(self, name: str, metrics: PoolMetrics, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.name = name
+        self.metrics = metrics
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        submitted = time.time()
+        inner = super().submit(_timed_call, fn, args, kwargs)
+        outer = Future()
+        self.metrics.add_submit()
+
+        def done(future: Future):
+            if future.cancelled():
+                self.metrics.add_done(0.0, 0.0, failed=True)
+                outer.cancel()
+                return
+            try:
+                started, ended, result, error = future.result()
+            except BaseException as e:
+                # The pool itself failed (e.g. a worker process died); no run time to count
+                self.metrics.add_done(0.0, 0.0, failed=True)
+                if not outer.cancelled():
+                    outer.set_exception(e)
+                return
+            if error is not None:
+                self.metrics.add_done(started - submitted, ended - started, failed=True)
+                if not outer.cancelled():
+                    outer.set_exception(error)
+                return
+            self.metrics.add_done(started - submitted, ended - started)
+            if not outer.cancelled():
+                outer.set_result(result)
+
+        # Cancelling the caller's future drops the call if it has not started
+        outer.add_done_callback(lambda f: f.cancelled() and inner.cancel())
+        inner.add_done_callback(done)
+        return outer
+
+class _MeteredThreadPool(_MeteredPool, ThreadPoolExecutor):
+    pass
+
+class _MeteredProcessPool(_MeteredPool, ProcessPoolExecutor):
+    pass
+
 class ParallelProcessor:
-    def __init__(self, max_workers: int = None):
-        self.thread_executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.process_executor = ProcessPoolExecutor(max_workers=max_workers)
-        self.gpu_semaphore = asyncio.Semaphore(2)  # Limit concurrent GPU operations
-        
-    async def run_cpu_bound(self, func: Callable[..., T], *args, **kwargs) -> T:
-        return await asyncio.get_event_loop().run_in_executor(
-            self.process_executor, 
-            func, 
-            *args
+    """
+    Named executor pools, one per engine, created on first use.
+
+    Each pool has its own concurrency and optional CPU affinity (SchedulerConfig),
+    so llama.cpp, Whisper and StyleTTS2 each keep to their own cores instead of
+    evicting each other's caches. Every pool records queue wait, run time and
+    utilization, available through `get_summary`.
+    """
+
+    def __init__(
+        self,
+        pools: Optional[Dict[str, PoolConfig]] = None,
+        gpu_concurrency: int = config.scheduler.gpu_concurrency,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            pools: Pool settings by name; defaults to config.scheduler.pools
+            gpu_concurrency: GPU operations allowed to run at once
+            max_workers: Size of pools that do not set `workers` themselves
+        """
+        self.pool_configs = dict(pools if pools is not None else config.scheduler.pools)
+        self.gpu_concurrency = gpu_concurrency
+        self.max_workers = max_workers
+        self.metrics: Dict[str, PoolMetrics] = {}
+        self._pools: Dict[str, Executor] = {}
+        self._lock = Lock()
+        # Semaphores belong to the loop they are used on, so create them there
+        self._gpu_semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    def executor(self, name: str, workers: Optional[int] = None) -> Executor:
+        """
+        The pool called `name`, created on first use
+
+        Args:
+            name: "llm", "stt", "tts", "io", "cpu", "gpu" or any configured pool
+            workers: Size to use if the pool's config leaves `workers` at 0
+        """
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = self._create(name, workers)
+                self._pools[name] = pool
+            return pool
+
+    def _create(self, name: str, workers: Optional[int]) -> Executor:
+        pool_config = self.pool_configs.get(name, PoolConfig())
+        size = pool_config.workers or workers or self.max_workers or min(4, os.cpu_count() or 1)
+        metrics = self.metrics.setdefault(name, PoolMetrics(workers=size))
+        metrics.workers = size
+
+        if pool_config.processes:
+            pool = _MeteredProcessPool(
+                name, metrics, max_workers=size, initializer=_pin, initargs=(pool_config.cores,)
+            )
+        else:
+            pool = _MeteredThreadPool(
+                name, metrics, max_workers=size, thread_name_prefix=name,
+                initializer=_pin, initargs=(pool_config.cores,)
+            )
+        logger.debug(
+            f"Created {'process' if pool_config.processes else 'thread'} pool '{name}' "
+            f"({size} workers{f', cores {pool_config.cores}' if pool_config.cores else ''})"
         )
-    
-    async def run_io_bound(self, func: Callable[..., T], *args, **kwargs) -> T:
-        return await asyncio.get_event_loop().run_in_executor(
-            self.thread_executor, 
-            func, 
-            *args
+        return pool
+
+    async def run(self, pool: str, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run `func(*args, **kwargs)` on the named pool"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor(pool),
+            functools.partial(func, *args, **kwargs)
         )
-    
+
+    async def run_cpu_bound(self, func: Callable[..., T], *args, **kwargs) -> T:
+        return await self.run("cpu", func, *args, **kwargs)
+
+    async def run_io_bound(self, func: Callable[..., T], *args, **kwargs) -> T:
+        return await self.run("io", func, *args, **kwargs)
+
     async def run_gpu_bound(self, func: Callable[..., T], *args, **kwargs) -> T:
-        async with self.gpu_semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._gpu_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._gpu_semaphores[loop] = asyncio.Semaphore(self.gpu_concurrency)
+
+        on_gpu = torch.cuda.is_available() and config.system.device.startswith("cuda")
+        async with semaphore:
             try:
-                torch.cuda.empty_cache()
-                return await asyncio.get_event_loop().run_in_executor(
-                    self.thread_executor,
-                    func,
-                    *args
-                )
+                if on_gpu:
+                    torch.cuda.empty_cache()
+                return await self.run("gpu", func, *args, **kwargs)
             finally:
-                torch.cuda.empty_cache()
+                if on_gpu:
+                    torch.cuda.empty_cache()
 
     async def run_parallel(self, tasks: List[Coroutine]) -> List[Any]:
         return await asyncio.gather(*tasks)
-    
+
+    def get_summary(self) -> Dict[str, Dict]:
+        """Utilization, queue wait and run time per pool that has been used"""
+        return {name: metrics.get_summary() for name, metrics in self.metrics.items()}
+
+    def shutdown(self, names: Optional[Iterable[str]] = None, wait: bool = True):
+        """
+        Shut down the named pools (all by default); they are recreated if
+        used again
+        """
+        with self._lock:
+            names = list(self._pools) if names is None else [n for n in names if n in self._pools]
+            pools = [self._pools.pop(name) for name in names]
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
     def cleanup(self):
-        self.thread_executor.shutdown(wait=True)
-        self.process_executor.shutdown(wait=True) 
\ No newline at end of file
+        self.shutdown()
+
+# Shared by every engine so pools and their metrics live in one place
+processor = ParallelProcessor()
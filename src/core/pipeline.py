@@ -0,0 +1,346 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+from .cancellation import CancellationToken
+from .config import config
+from .metrics import PipelineMetrics
+from .parallel_processor import processor
+
+STOP = None  # Sentinel passed down the queues on shutdown
+
+@dataclass
+class Turn:
+    """One user utterance on its way through the pipeline"""
+    utterance: object
+    captured_at: float = field(default_factory=time.perf_counter)
+    text: Optional[str] = None
+    response: Optional[str] = None
+    cancel: Optional[CancellationToken] = None
+    audio: Optional[asyncio.Queue] = None  # TTS -> playback, one sentence per item
+    audio_done: bool = False
+    queued_at: float = 0.0
+    released: asyncio.Event = field(default_factory=asyncio.Event)  # Capture may resume
+    finished: asyncio.Event = field(default_factory=asyncio.Event)  # Out of the pipeline
+
+class ConversationPipeline:
+    """
+    The conversation loop as concurrent stages joined by bounded queues:
+
+        capture -> STT -> LLM -> TTS -> playback
+
+    Every stage is an asyncio task and the blocking work inside it already
+    runs off the loop: transcription on Whisper's executor, generation on
+    llama.cpp's, synthesis on StyleTTS2's, and playback on PortAudio's
+    callback thread. Each queue holds at most `queue_size` turns, so a slow
+    stage holds back the ones before it instead of letting work pile up.
+
+    Capture of the next utterance starts once the current reply has played.
+    With `listen_during_playback` it starts as soon as the reply is fully
+    synthesized, while its tail is still playing; nothing filters the
+    speaker out of the microphone, so only enable it with echo cancellation
+    or headphones. A new utterance that reaches the LLM while the previous
+    reply is still audible supersedes it.
+    """
+
+    STAGES = ("stt", "llm", "tts", "playback")
+
+    def __init__(
+        self,
+        handler,
+        queue_size: int = config.system.pipeline_queue_size,
+        audio_queue_size: int = config.system.pipeline_audio_queue,
+        listen_during_playback: bool = config.system.listen_during_playback
+    ):
+        """
+        Args:
+            handler: The ConversationHandler whose recorder, engines, player
+                and memory the stages use
+            queue_size: Turns allowed to wait in front of each stage
+            audio_queue_size: Sentences synthesized ahead of playback
+            listen_during_playback: Resume capture once synthesis is done
+                rather than after playback (needs echo cancellation)
+        """
+        self.handler = handler
+        self.queue_size = max(1, queue_size)
+        self.audio_queue_size = max(1, audio_queue_size)
+        self.listen_during_playback = listen_during_playback
+        self.metrics = PipelineMetrics()
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.in_flight = 0
+        self.stop_reason: Optional[str] = None
+        self._stopping = False
+        self._speaking: Optional[Turn] = None  # Latest turn given a cancellation token
+        self._listening_since: Optional[float] = None
+
+    def depths(self) -> Dict[str, int]:
+        """Turns currently waiting in front of each stage"""
+        return {name: queue.qsize() for name, queue in self.queues.items()}
+
+    async def run(self) -> Optional[str]:
+        """
+        Run until the user says "exit" or recording is interrupted
+
+        Returns:
+            "exit" or "interrupted"
+        """
+        self.queues = {name: asyncio.Queue(maxsize=self.queue_size) for name in self.STAGES}
+        tasks = [
+            asyncio.create_task(self._capture(), name="capture"),
+            asyncio.create_task(self._transcribe(), name="stt"),
+            asyncio.create_task(self._respond(), name="llm"),
+            asyncio.create_task(self._synthesize(), name="tts"),
+            asyncio.create_task(self._play(), name="playback"),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.debug(f"Pipeline stats: {self.metrics.get_summary()}")
+            logger.debug(f"Pool stats: {processor.get_summary()}")
+        return self.stop_reason
+
+    async def _put(self, stage: str, turn: Optional[Turn]):
+        if turn is not STOP:
+            turn.queued_at = time.perf_counter()
+        await self.queues[stage].put(turn)
+
+    async def _get(self, stage: str) -> Optional[Turn]:
+        queue = self.queues[stage]
+        turn = await queue.get()
+        if turn is not STOP:
+            self.metrics.add_queue(stage, time.perf_counter() - turn.queued_at, queue.qsize())
+        return turn
+
+    def _release(self, turn: Turn):
+        """Let capture start on the next utterance"""
+        turn.released.set()
+
+    def _finish(self, turn: Turn):
+        """Take a turn out of the pipeline, whichever stage it ended in"""
+        if turn.finished.is_set():
+            return
+        self._release(turn)
+        turn.finished.set()
+        self.in_flight -= 1
+        self.handler.busy = self.in_flight > 0
+        self.metrics.turns += 1
+
+    def _apologize(self, turn: Turn):
+        """Replace a failed turn's reply with the error phrase"""
+        turn.response = config.tts.error_phrase
+
+    async def _claim(self, turn: Turn):
+        """Make `turn` the one being answered, superseding any reply still audible"""
+        previous = self._speaking
+        if previous is not None and not previous.finished.is_set():
+            # The user has moved on; stop the old reply before listening for barge-in
+            previous.cancel.cancel("superseded")
+            await previous.finished.wait()
+
+        # Barge-in from here on cancels generation, synthesis and playback
+        turn.cancel = CancellationToken(self.handler.cancellation_metrics)
+        self._speaking = turn
+        self.handler.player.listen(turn.cancel)
+
+    async def _capture(self):
+        recorder = self.handler.recorder
+        speculation = self.handler.speculation
+        while not self._stopping and not self.handler.stop_event.is_set():
+            logger.info("🎤 Listening... (Press ESC to stop)", essential=True, status=True)
+            self._listening_since = time.perf_counter()
+            try:
+                if speculation:
+                    utterance = await recorder.capture(
+                        on_endpoint=speculation.start,
+                        on_resume=speculation.cancel
+                    )
+                else:
+                    utterance = await recorder.capture()
+            except Exception as e:
+                logger.error(f"Error capturing audio: {e}")
+                await asyncio.sleep(0.1)
+                continue
+            finally:
+                self._listening_since = None
+
+            if utterance is None:
+                self.stop_reason = "interrupted"
+                if speculation:
+                    speculation.cancel()
+                break
+
+            turn = Turn(utterance)
+            self.in_flight += 1
+            self.handler.busy = True
+            await self._put("stt", turn)
+            # The microphone is free again once this reply has been synthesized
+            await turn.released.wait()
+
+        await self._put("stt", STOP)
+
+    async def _transcribe(self):
+        recorder = self.handler.recorder
+        while True:
+            turn = await self._get("stt")
+            if turn is STOP:
+                break
+            started = time.perf_counter()
+            try:
+                turn.text = await recorder.transcribe(turn.utterance)
+            except Exception as e:
+                logger.error(f"Error transcribing: {e}")
+                # Answered by the LLM stage, which owns cancellation and barge-in
+                self._apologize(turn)
+                await self._put("llm", turn)
+                continue
+            self.metrics.add_stage("stt", time.perf_counter() - started)
+
+            if not turn.text:
+                self._finish(turn)
+                continue
+
+            if turn.text.lower() == "exit":
+                self.stop_reason = "exit"
+                self._stopping = True
+                if self.handler.speculation:
+                    self.handler.speculation.cancel()
+                self._finish(turn)
+                continue
+
+            # Log user input in green
+            logger.info(f"{turn.text}", essential=True, speaker="user")
+            await self._put("llm", turn)
+
+        await self._put("llm", STOP)
+
+    async def _respond(self):
+        player = self.handler.player
+        while True:
+            turn = await self._get("llm")
+            if turn is STOP:
+                break
+            await self._claim(turn)
+            # Turns that failed in STT already carry the error phrase
+            if turn.response is None and not await self._generate(turn):
+                player.stop_listening()
+                self._finish(turn)
+                continue
+            await self._put("tts", turn)
+
+        await self._put("tts", STOP)
+
+    async def _generate(self, turn: Turn) -> bool:
+        """
+        Set the turn's response from the LLM, or the error phrase if it fails
+
+        Returns:
+            False when there is nothing to say (cancelled or empty reply)
+        """
+        llm = self.handler.llm
+        speculation = self.handler.speculation
+        started = time.perf_counter()
+        try:
+            if speculation:
+                response = await speculation.resolve(turn.text, turn.cancel)
+                logger.debug(f"Speculation stats: {speculation.metrics.get_summary()}")
+            else:
+                response = await llm.create_completion(turn.text, turn.cancel)
+        except Exception as e:
+            logger.error(f"Error generating reply: {e}")
+            self._apologize(turn)
+            return True
+        self.metrics.add_stage("llm", time.perf_counter() - started)
+
+        if turn.cancel.is_cancelled() or not response:
+            if turn.cancel.is_cancelled():
+                logger.info("Reply abandoned, listening again", essential=True)
+            return False
+
+        # Log FRIDAY's response in pink/magenta
+        logger.info(f"{response}", essential=True, speaker="friday")
+        if hasattr(llm, 'generation_time'):
+            logger.info(f"Generation time: {llm.generation_time:.2f}s",
+                      essential=True, generation_time=True)
+
+        turn.response = response
+        try:
+            await self.handler.memory.save(turn.text, response)
+        except Exception as e:
+            logger.error(f"Error saving to memory: {e}")
+        return True
+
+    async def _synthesize(self):
+        tts = self.handler.tts
+        while True:
+            turn = await self._get("tts")
+            if turn is STOP:
+                break
+            turn.audio = asyncio.Queue(maxsize=self.audio_queue_size)
+            # Playback starts with the first sentence, not the whole reply
+            await self._put("playback", turn)
+
+            started = time.perf_counter()
+            first = True
+            try:
+                async for chunk in tts.stream_speech(turn.response, turn.cancel):
+                    if first:
+                        self.metrics.add_first_audio(time.perf_counter() - turn.captured_at)
+                        first = False
+                    await turn.audio.put(chunk)
+            except Exception as e:
+                logger.error(f"Error synthesizing speech: {e}")
+                turn.cancel.cancel("error")
+            finally:
+                await turn.audio.put(STOP)
+            self.metrics.add_stage("tts", time.perf_counter() - started)
+
+            if self.listen_during_playback:
+                self._release(turn)
+
+        await self._put("playback", STOP)
+
+    async def _chunks(self, turn: Turn) -> AsyncIterator[np.ndarray]:
+        while True:
+            chunk = await turn.audio.get()
+            if chunk is STOP:
+                turn.audio_done = True
+                return
+            yield chunk
+
+    async def _play(self):
+        player = self.handler.player
+        while True:
+            turn = await self._get("playback")
+            if turn is STOP:
+                break
+            started = time.perf_counter()
+            try:
+                completed = await player.play_stream(self._chunks(turn), cancel=turn.cancel)
+            except Exception as e:
+                logger.error(f"Error playing reply: {e}")
+                completed = False
+            finally:
+                player.stop_listening()
+            if not completed and not turn.cancel.is_cancelled():
+                # Playback failed; stop synthesizing a reply nobody hears
+                turn.cancel.cancel("playback")
+            # Unblock the TTS stage if playback stopped early
+            while not turn.audio_done:
+                if await turn.audio.get() is STOP:
+                    turn.audio_done = True
+
+            ended = time.perf_counter()
+            self.metrics.add_stage("playback", ended - started)
+            if self._listening_since is not None:
+                self.metrics.add_overlap(ended - max(self._listening_since, started))
+            if turn.cancel.is_cancelled():
+                logger.debug(f"Cancellation stats: {self.handler.cancellation_metrics.get_summary()}")
+            self._finish(turn)
+            logger.debug(f"Pipeline depths: {self.depths()}")
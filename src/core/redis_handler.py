@@ -1,50 +1,397 @@
 import json
-import pickle
-from typing import Any, Optional
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import redis.asyncio as redis
+from redis.exceptions import RedisError
 from loguru import logger
 
+from .config import RedisConfig, config
+
+try:
+    import msgpack
+except ImportError:  # Only needed for the "msgpack" codec
+    msgpack = None
+
+CODECS = ("json", "msgpack", "raw")
+
+def encode(value: Any, codec: str) -> bytes:
+    if codec == "json":
+        return json.dumps(value).encode()
+    if codec == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("The msgpack codec needs the msgpack package")
+        return msgpack.packb(value, use_bin_type=True)
+    if codec == "raw":
+        if isinstance(value, str):
+            return value.encode()
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)
+        # bytes(3) would silently store three zero bytes
+        raise TypeError(f"The raw codec stores str or bytes, not {type(value).__name__}")
+    raise ValueError(f"Unknown Redis codec: {codec}")
+
+def decode(data: bytes, codec: str) -> Any:
+    if codec == "json":
+        return json.loads(data)
+    if codec == "msgpack":
+        if msgpack is None:
+            raise RuntimeError("The msgpack codec needs the msgpack package")
+        return msgpack.unpackb(data, raw=False)
+    if codec == "raw":
+        return data
+    raise ValueError(f"Unknown Redis codec: {codec}")
+
+class CircuitBreaker:
+    """
+    Stops calling Redis after `failure_threshold` consecutive failures, then
+    lets one trial call through every `reset_timeout` seconds until one
+    succeeds. While open, callers use the in-process store without waiting
+    on a socket timeout each time.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "half-open":
+            # Restart the clock so only this call tries Redis
+            self.opened_at = time.monotonic()
+        return state != "open"
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("Redis is reachable again")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                self.trips += 1
+                logger.warning(f"Redis failed {self.failures} times; using the in-process store")
+            self.opened_at = time.monotonic()
+
+class LocalStore:
+    """
+    In-process stand-in for Redis, bounded to `max_entries` and `max_bytes`
+    of values (LRU).
+
+    Every key set or deleted here is marked dirty until it has been written
+    back to Redis. A dirty key with no entry (deleted, expired or evicted) is
+    deleted from Redis on write-back rather than left at its old value. At
+    most `max_entries` keys stay dirty; beyond that the oldest are dropped
+    and keep whatever Redis holds.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self.size = 0  # Bytes of values held
+        self.dirty: "OrderedDict[str, None]" = OrderedDict()
+
+    def _pop(self, key: str) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+        return entry
+
+    def _mark(self, key: str):
+        self.dirty[key] = None
+        self.dirty.move_to_end(key)
+        while len(self.dirty) > self.max_entries:
+            self.dirty.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        data, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            self._pop(key)
+            return None
+        self.entries.move_to_end(key)
+        return data
+
+    def set(self, key: str, data: bytes, ttl: int = 0) -> bool:
+        self._pop(key)
+        self._mark(key)
+        if len(data) > self.max_bytes:
+            # Too big to keep at all; write-back deletes the stale Redis copy
+            return False
+        self.entries[key] = (data, time.monotonic() + ttl if ttl else None)
+        self.size += len(data)
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self._pop(next(iter(self.entries)))
+        return True
+
+    def delete(self, *keys: str) -> int:
+        for key in keys:
+            self._mark(key)
+        return sum(self._pop(key) is not None for key in keys)
+
+    def unsynced(self) -> Dict[str, Optional[Tuple[bytes, Optional[float]]]]:
+        """Entries (or None if gone) of the dirty keys, as they are now"""
+        return {key: self.entries.get(key) for key in self.dirty}
+
+    def synced(self, written: Dict[str, Optional[Tuple[bytes, Optional[float]]]]):
+        """Forget keys written back to Redis, unless they changed in the meantime"""
+        for key, entry in written.items():
+            if self.entries.get(key) is entry:
+                self._pop(key)
+                self.dirty.pop(key, None)
+
+class Batch:
+    """
+    Commands sent to Redis in one round trip (a non-transactional pipeline)
+
+        results = await handler.batch().get("a").set("b", 1).execute()
+    """
+
+    def __init__(self, handler: "RedisHandler"):
+        self.handler = handler
+        self.ops: List[Tuple[str, tuple, str]] = []
+
+    def get(self, key: str, codec: Optional[str] = None) -> "Batch":
+        self.ops.append(("get", (key,), codec or self.handler.codec))
+        return self
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, codec: Optional[str] = None) -> "Batch":
+        codec = codec or self.handler.codec
+        self.ops.append(("set", (key, encode(value, codec), self.handler._ttl(ttl)), codec))
+        return self
+
+    def delete(self, *keys: str) -> "Batch":
+        self.ops.append(("delete", keys, "raw"))
+        return self
+
+    async def _remote(self) -> List[Any]:
+        async with self.handler.client.pipeline(transaction=False) as pipe:
+            for op, args, _ in self.ops:
+                if op == "set":
+                    key, data, ttl = args
+                    pipe.set(key, data, ex=ttl or None)
+                else:
+                    getattr(pipe, op)(*args)
+            return await pipe.execute()
+
+    def _local(self) -> List[Any]:
+        local = self.handler.local
+        return [getattr(local, op)(*args) for op, args, _ in self.ops]
+
+    async def execute(self) -> List[Any]:
+        """Results in command order: decoded values for gets, bools for sets, counts for deletes"""
+        if not self.ops:
+            return []
+        raw = await self.handler._run("pipeline", self._remote, self._local)
+        results = []
+        for (op, _, codec), value in zip(self.ops, raw):
+            if op == "get":
+                results.append(self.handler._decode(value, codec))
+            elif op == "set":
+                results.append(bool(value))
+            else:
+                results.append(value)
+        self.ops = []
+        return results
+
 class RedisHandler:
-    def __init__(self, host='localhost', port=6379, db=0):
-        self.redis = redis.Redis(
-            host=host,
-            port=port,
-            db=db,
-            decode_responses=True
-        )
-        self.binary_redis = redis.Redis(
-            host=host,
-            port=port,
-            db=db,
-            decode_responses=False
-        )
-    
-    async def get(self, key: str) -> Optional[Any]:
+    """
+    Redis access for the whole process over one connection pool.
+
+    Values are stored as bytes and encoded with a codec per call: "json"
+    (the default), "msgpack" or "raw" for bytes such as cached audio. Every
+    command goes through a circuit breaker; when Redis is unreachable or too
+    slow, reads and writes go to an in-process store instead of failing, and
+    Redis is retried every `reset_timeout` seconds. Writes made during an
+    outage are written back to Redis before the first command that reaches
+    it again, so recovery does not revert them.
+    """
+
+    def __init__(self, redis_config: RedisConfig = config.redis, client: Optional[redis.Redis] = None):
+        """
+        Args:
+            redis_config: Connection, timeout and breaker settings
+            client: Use this client (e.g. fakeredis) instead of creating a pool
+        """
+        self.config = redis_config
+        self.codec = redis_config.codec
+        self.pool = None
+        if client is None:
+            self.pool = redis.ConnectionPool(
+                host=redis_config.host,
+                port=redis_config.port,
+                db=redis_config.db,
+                password=redis_config.password,
+                max_connections=redis_config.max_connections,
+                socket_timeout=redis_config.socket_timeout,
+                socket_connect_timeout=redis_config.connect_timeout
+            )
+            client = redis.Redis(connection_pool=self.pool)
+        self.client = client
+        self.breaker = CircuitBreaker(redis_config.failure_threshold, redis_config.reset_timeout)
+        self.local = LocalStore(redis_config.fallback_entries, redis_config.fallback_bytes)
+        self.commands = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.replayed = 0
+
+    def _ttl(self, ttl: Optional[int]) -> int:
+        return self.config.ttl if ttl is None else ttl
+
+    def _decode(self, data: Optional[bytes], codec: str) -> Any:
+        if data is None:
+            return None
         try:
-            data = await self.redis.get(key)
-            return json.loads(data) if data else None
+            return decode(data, codec)
         except Exception as e:
-            logger.error(f"Redis get error: {e}")
+            logger.error(f"Undecodable Redis value ({codec}): {e}")
             return None
 
-    async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
+    async def _run(self, name: str, remote: Callable, local: Callable[[], Any]) -> Any:
+        """Run `remote()` against Redis if the breaker allows, else `local()`"""
+        self.commands += 1
+        if self.breaker.allow():
+            try:
+                if self.local.dirty:
+                    await self._write_back()
+                result = await remote()
+                self.breaker.record_success()
+                return result
+            except (RedisError, OSError) as e:
+                self.errors += 1
+                self.breaker.record_failure()
+                logger.warning(f"Redis {name} error: {e}")
+        self.fallbacks += 1
+        return local()
+
+    async def _write_back(self):
+        """Replay sets and deletes made locally while Redis was unreachable"""
+        written = self.local.unsynced()
+        now = time.monotonic()
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, entry in written.items():
+                data, expires = entry or (None, None)
+                if data is None or (expires is not None and expires <= now):
+                    pipe.delete(key)
+                elif expires is None:
+                    pipe.set(key, data)
+                else:
+                    # Only what is left of the original TTL
+                    pipe.set(key, data, px=max(1, int((expires - now) * 1000)))
+            await pipe.execute()
+        self.local.synced(written)
+        self.replayed += len(written)
+        logger.info(f"Wrote {len(written)} keys changed during the Redis outage back to Redis")
+
+    async def ping(self) -> bool:
+        """Whether Redis itself answers (the in-process store does not count)"""
+        if not self.breaker.allow():
+            return False
         try:
-            data = json.dumps(value)
-            return await self.redis.set(key, data, ex=ttl)
-        except Exception as e:
-            logger.error(f"Redis set error: {e}")
+            result = await self.client.ping()
+            self.breaker.record_success()
+            return bool(result)
+        except (RedisError, OSError) as e:
+            self.breaker.record_failure()
+            logger.warning(f"Redis unavailable: {e}")
             return False
 
+    async def get(self, key: str, codec: Optional[str] = None) -> Optional[Any]:
+        data = await self._run("get", lambda: self.client.get(key), lambda: self.local.get(key))
+        return self._decode(data, codec or self.codec)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, codec: Optional[str] = None) -> bool:
+        """
+        Args:
+            ttl: Seconds until expiry; None uses the configured TTL, 0 never expires
+        """
+        data = encode(value, codec or self.codec)
+        ttl = self._ttl(ttl)
+        return bool(await self._run(
+            "set",
+            lambda: self.client.set(key, data, ex=ttl or None),
+            lambda: self.local.set(key, data, ttl)
+        ))
+
+    async def mget(self, keys: List[str], codec: Optional[str] = None) -> List[Optional[Any]]:
+        """Values for `keys` in one round trip, None where missing"""
+        if not keys:
+            return []
+        values = await self._run(
+            "mget",
+            lambda: self.client.mget(keys),
+            lambda: [self.local.get(key) for key in keys]
+        )
+        return [self._decode(data, codec or self.codec) for data in values]
+
+    async def mset(self, mapping: Dict[str, Any], ttl: Optional[int] = None, codec: Optional[str] = None) -> bool:
+        """Set every item in one round trip (pipelined so each gets its TTL)"""
+        batch = self.batch()
+        for key, value in mapping.items():
+            batch.set(key, value, ttl, codec)
+        return all(await batch.execute())
+
+    async def delete(self, *keys: str) -> int:
+        if not keys:
+            return 0
+        return await self._run("delete", lambda: self.client.delete(*keys), lambda: self.local.delete(*keys))
+
+    def batch(self) -> Batch:
+        return Batch(self)
+
     async def get_binary(self, key: str) -> Optional[bytes]:
-        try:
-            return await self.binary_redis.get(key)
-        except Exception as e:
-            logger.error(f"Redis binary get error: {e}")
-            return None
+        return await self.get(key, codec="raw")
 
-    async def set_binary(self, key: str, value: bytes, ttl: int = 3600) -> bool:
-        try:
-            return await self.binary_redis.set(key, value, ex=ttl)
-        except Exception as e:
-            logger.error(f"Redis binary set error: {e}")
-            return False 
\ No newline at end of file
+    async def set_binary(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        return await self.set(key, value, ttl, codec="raw")
+
+    async def mget_binary(self, keys: List[str]) -> List[Optional[bytes]]:
+        return await self.mget(keys, codec="raw")
+
+    async def mset_binary(self, mapping: Dict[str, bytes], ttl: Optional[int] = None) -> bool:
+        return await self.mset(mapping, ttl, codec="raw")
+
+    def get_summary(self) -> Dict:
+        return {
+            "commands": self.commands,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "breaker": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+            "local_entries": len(self.local.entries),
+            "local_bytes": self.local.size,
+            "unsynced": len(self.local.dirty),
+            "replayed": self.replayed
+        }
+
+    async def close(self):
+        # aclose() arrived in redis-py 5.0.1; close() is its deprecated name
+        close = getattr(self.client, "aclose", None) or self.client.close
+        await close()
+        if self.pool is not None:
+            await self.pool.disconnect()
+
+_handler: Optional[RedisHandler] = None
+
+def get_redis_handler(redis_config: RedisConfig = config.redis) -> RedisHandler:
+    """Return the process-wide Redis handler, creating its pool on first use"""
+    global _handler
+    if _handler is None:
+        _handler = RedisHandler(redis_config)
+    return _handler
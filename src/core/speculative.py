@@ -0,0 +1,106 @@
+import asyncio
+import re
+import time
+from threading import Event
+from typing import Optional, Tuple
+
+from loguru import logger
+
+from .cancellation import CancellationToken
+from .metrics import SpeculationMetrics
+
+class SpeculativeCompletion:
+    """
+    Starts the LLM on a partial transcript while VAD is still confirming
+    the end of speech.
+
+    If the final transcript matches the partial, the speculative response is
+    committed to memory and returned. Otherwise generation is stopped and the
+    real completion runs; llama.cpp reuses the shared prompt prefix from its
+    KV cache, so a miss costs little more than the non-speculative path.
+    """
+
+    def __init__(self, llm):
+        self.llm = llm
+        self.metrics = SpeculationMetrics()
+        self._task: Optional[asyncio.Task] = None
+        self._partial: Optional[str] = None
+        self._stop = Event()
+        self._started_at = 0.0
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(re.sub(r"[^\w\s']", "", (text or "").lower()).split())
+
+    def start(self, partial: str):
+        """Begin generating for `partial` (called at a likely endpoint)"""
+        if not partial or (self._task and self._normalize(partial) == self._normalize(self._partial)):
+            return
+        self.cancel()
+
+        self._partial = partial
+        self._stop = Event()
+        self._started_at = time.perf_counter()
+        self.metrics.started += 1
+        self._task = asyncio.create_task(self._generate(partial, self._stop))
+        logger.debug(f"Speculating on: {partial}")
+
+    async def _generate(self, partial: str, stop: Event) -> Tuple[str, float]:
+        formatted_prompt, _ = self.llm.build_prompt(partial)
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            self.llm.executor, self.llm.generate, formatted_prompt, stop.is_set
+        )
+        return response, time.perf_counter()
+
+    def cancel(self):
+        """Abandon the running speculation, e.g. because the user kept talking"""
+        if self._task and not self._task.done():
+            self._stop.set()
+            self.metrics.cancelled += 1
+        self._task = None
+        self._partial = None
+
+    async def resolve(self, final: str, cancel: Optional[CancellationToken] = None) -> str:
+        """
+        Return the response for the final transcript, reusing the
+        speculative one when the transcript did not change
+        """
+        task, partial, stop, started_at = self._task, self._partial, self._stop, self._started_at
+        self._task = None
+        self._partial = None
+
+        if task is not None and self._normalize(final) == self._normalize(partial):
+            resolved_at = time.perf_counter()
+            # Barge-in stops the speculative generation like a regular one
+            unregister = cancel.add_callback(stop.set) if cancel else None
+            try:
+                response, finished_at = await task
+            except Exception as e:
+                # Counted as a miss below; the regular completion still answers
+                logger.debug(f"Speculation failed: {e}")
+                response = None
+            finally:
+                if unregister:
+                    unregister()
+            if cancel and cancel.is_cancelled():
+                # Nothing to say and nothing to remember
+                cancel.acknowledge("llm")
+                return ""
+            if not stop.is_set() and response:
+                # Generation time that overlapped recording instead of following it
+                self.metrics.add_hit(min(finished_at, resolved_at) - started_at)
+                _, is_important = self.llm.build_prompt(final)
+                await self.llm.commit(final, response, is_important)
+                logger.debug(f"Speculation hit ({self.metrics.hit_rate:.0%} hit rate)")
+                return response
+
+        if task is not None:
+            self.metrics.misses += 1
+            stop.set()
+            try:
+                await task
+            except Exception as e:
+                logger.debug(f"Discarded speculation failed: {e}")
+
+        return await self.llm.create_completion(final, cancel)
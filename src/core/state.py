@@ -1,12 +1,14 @@
-import redis.asyncio as redis
 from typing import Any, Optional
+from .redis_handler import RedisHandler, get_redis_handler
 
 class StateManager:
-    def __init__(self, redis_url: str = "redis://localhost"):
-        self.redis = redis.from_url(redis_url)
+    def __init__(self, redis: Optional[RedisHandler] = None):
+        # Shares the process-wide connection pool and circuit breaker
+        self.redis = redis or get_redis_handler()
         
     async def set_state(self, key: str, value: Any):
-        await self.redis.set(key, str(value))
+        await self.redis.set(key, str(value), ttl=0, codec="raw")
         
     async def get_state(self, key: str) -> Optional[str]:
-        return await self.redis.get(key) 
\ No newline at end of file
+        data = await self.redis.get(key, codec="raw")
+        return data.decode() if data is not None else None
@@ -0,0 +1,233 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+from faster_whisper import WhisperModel, decode_audio
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.transcribe import get_ctranslate2_storage
+from loguru import logger
+
+from ..core.metrics import DecodingMetrics
+from .decoding import FallbackPolicy, compression_ratio
+
+SAMPLE_RATE = 16000
+MAX_BATCHED_SECONDS = 30  # One Whisper window
+
+AudioInput = Union[str, Path, np.ndarray]
+
+@dataclass
+class _PendingUtterance:
+    audio: np.ndarray
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+class TranscriptionBatcher:
+    """
+    Collects utterances from concurrent sessions and decodes them together.
+
+    faster-whisper's batched pipeline only batches the chunks of a single
+    file, so the batcher drives the same encode/generate path directly with
+    one 30s window per utterance. Longer utterances fall back to the regular
+    sequential transcribe, as does everything when no language is set:
+    a batch shares one prompt, so it cannot auto-detect per utterance.
+    """
+
+    def __init__(
+        self,
+        model: WhisperModel,
+        batch_size: int = 8,
+        batch_wait_ms: float = 5.0,
+        beam_size: int = 5,
+        language: Optional[str] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        fallback_policy: Optional[FallbackPolicy] = None,
+        metrics: Optional[DecodingMetrics] = None
+    ):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait_ms / 1000.0
+        self.beam_size = beam_size
+        self.language = language
+        self.fallback_policy = fallback_policy
+        self.metrics = metrics or DecodingMetrics()
+
+        self.tokenizer = None
+        self.prompt = None
+        if language:
+            self.tokenizer = Tokenizer(
+                model.hf_tokenizer,
+                model.model.is_multilingual,
+                task="transcribe",
+                language=language
+            )
+            self.prompt = model.get_prompt(self.tokenizer, [], without_timestamps=True)
+
+        # CTranslate2 already parallelises inside a batch; one worker keeps batches ordered
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper-batch")
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker_task: Optional[asyncio.Task] = None
+
+        # Simple counters for monitoring
+        self.batches_run = 0
+        self.utterances_run = 0
+
+    def _ensure_worker(self):
+        """Start the batching loop on the running event loop"""
+        if self.worker_task is None or self.worker_task.done():
+            self.queue = asyncio.Queue()
+            self.worker_task = asyncio.create_task(self._batch_loop())
+
+    async def transcribe(self, audio: AudioInput) -> str:
+        """
+        Queue an utterance and wait for its transcript
+
+        Args:
+            audio: Path to an audio file or 16kHz float32 samples
+
+        Returns:
+            Transcribed text
+        """
+        loop = asyncio.get_running_loop()
+        if not isinstance(audio, np.ndarray):
+            # ffmpeg decoding blocks; keep it off the event loop
+            audio = await loop.run_in_executor(
+                self.executor, lambda: decode_audio(str(audio), sampling_rate=SAMPLE_RATE)
+            )
+
+        if self.prompt is None or len(audio) > MAX_BATCHED_SECONDS * SAMPLE_RATE:
+            return await loop.run_in_executor(self.executor, self._transcribe_long, audio)
+
+        self._ensure_worker()
+        pending = _PendingUtterance(audio=audio, future=loop.create_future())
+        await self.queue.put(pending)
+        return await pending.future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_wait
+
+            # Wait a few milliseconds for other sessions to catch up
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                texts = await loop.run_in_executor(
+                    self.executor,
+                    self._transcribe_batch,
+                    [item.audio for item in batch]
+                )
+                for item, text in zip(batch, texts):
+                    if not item.future.done():
+                        item.future.set_result(text)
+            except Exception as e:
+                logger.error(f"Batched transcription failed: {e}")
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+
+    def _transcribe_batch(self, audios: List[np.ndarray]) -> List[str]:
+        """Encode and decode a batch of utterances in one CTranslate2 call"""
+        n_frames = self.model.feature_extractor.nb_max_frames
+        features = np.stack([
+            self._pad_features(self.model.feature_extractor(audio), n_frames)
+            for audio in audios
+        ])
+
+        self.batches_run += 1
+        self.utterances_run += len(audios)
+
+        if self.fallback_policy is None:
+            return [text for text, _ in self._generate(features, self.beam_size)]
+
+        # Greedy for the whole batch, then beam search only for the doubtful ones
+        start = time.perf_counter()
+        results = self._generate(features, beam_size=1)
+        elapsed = time.perf_counter() - start
+
+        retry = {}
+        for i, (text, (avg_logprob, no_speech_prob)) in enumerate(results):
+            self.metrics.add_greedy(elapsed / len(audios))
+            reason = self.fallback_policy.reason(avg_logprob, no_speech_prob, compression_ratio(text))
+            if reason:
+                retry[i] = reason
+
+        texts = [text for text, _ in results]
+        if retry:
+            indices = list(retry)
+            start = time.perf_counter()
+            beam_results = self._generate(features[indices], self.beam_size)
+            elapsed = time.perf_counter() - start
+            for i, (text, _) in zip(indices, beam_results):
+                texts[i] = text
+                self.metrics.add_fallback(retry[i], elapsed / len(indices))
+        return texts
+
+    def _generate(self, features: np.ndarray, beam_size: int) -> List[Tuple[str, Tuple[float, float]]]:
+        """Decode features, returning text with (avg_logprob, no_speech_prob) per item"""
+        # WhisperModel.encode adds a batch axis itself (faster-whisper 1.0.x),
+        # so hand CTranslate2 the stacked (batch, n_mels, frames) storage directly
+        to_cpu = self.model.model.device == "cuda" and len(self.model.model.device_index) > 1
+        encoder_output = self.model.model.encode(get_ctranslate2_storage(features), to_cpu=to_cpu)
+        results = self.model.model.generate(
+            encoder_output,
+            [self.prompt] * len(features),
+            beam_size=beam_size,
+            max_length=self.model.max_length,
+            suppress_blank=True,
+            return_scores=True,
+            return_no_speech_prob=True
+        )
+
+        outputs = []
+        for result in results:
+            sequence = result.sequences_ids[0]
+            tokens = [t for t in sequence if t < self.tokenizer.eot]
+            # Scores are length-normalised; recover Whisper's avg_logprob
+            avg_logprob = result.scores[0] * len(sequence) / (len(sequence) + 1)
+            outputs.append((self.tokenizer.decode(tokens).strip(), (avg_logprob, result.no_speech_prob)))
+        return outputs
+
+    def _transcribe_long(self, audio: np.ndarray) -> str:
+        segments, _ = self.model.transcribe(
+            audio,
+            beam_size=self.beam_size,
+            language=self.language
+        )
+        return " ".join(segment.text for segment in segments).strip()
+
+    @staticmethod
+    def _pad_features(features: np.ndarray, n_frames: int) -> np.ndarray:
+        """Trim or zero-pad log-mel features to exactly one Whisper window"""
+        features = features[:, :n_frames]
+        if features.shape[-1] < n_frames:
+            features = np.pad(features, [(0, 0), (0, n_frames - features.shape[-1])])
+        return features
+
+    @property
+    def average_batch_size(self) -> float:
+        return self.utterances_run / self.batches_run if self.batches_run else 0.0
+
+    async def close(self):
+        """Stop the batching loop and release the executor"""
+        if self.worker_task:
+            self.worker_task.cancel()
+            try:
+                await self.worker_task
+            except asyncio.CancelledError:
+                pass
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
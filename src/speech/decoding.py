@@ -0,0 +1,38 @@
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from ..core.config import WhisperConfig
+
+@dataclass
+class FallbackPolicy:
+    """Decides when a greedy decode is not trustworthy enough to keep"""
+    logprob_threshold: float = -0.7
+    no_speech_threshold: float = 0.6
+    compression_ratio_threshold: float = 2.4
+
+    @classmethod
+    def from_config(cls, whisper_config: WhisperConfig) -> Optional["FallbackPolicy"]:
+        """Policy for adaptive decoding, or None when always using beam search"""
+        if whisper_config.decode_mode != "adaptive":
+            return None
+        return cls(
+            logprob_threshold=whisper_config.fallback_logprob_threshold,
+            no_speech_threshold=whisper_config.fallback_no_speech_threshold,
+            compression_ratio_threshold=whisper_config.fallback_compression_ratio_threshold
+        )
+
+    def reason(self, avg_logprob: float, no_speech_prob: float, compression_ratio: float) -> Optional[str]:
+        """Name of the first threshold crossed, or None if the greedy result is fine"""
+        if avg_logprob < self.logprob_threshold:
+            return "avg_logprob"
+        if no_speech_prob > self.no_speech_threshold:
+            return "no_speech_prob"
+        if compression_ratio > self.compression_ratio_threshold:
+            return "compression_ratio"
+        return None
+
+def compression_ratio(text: str) -> float:
+    """gzip ratio used by Whisper to spot repetitive hallucinations"""
+    data = text.encode("utf-8")
+    return len(data) / len(zlib.compress(data)) if data else 0.0
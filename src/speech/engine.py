@@ -0,0 +1,168 @@
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from faster_whisper import WhisperModel
+from loguru import logger
+
+from ..core.config import FridayConfig, WhisperConfig
+from ..core.metrics import DecodingMetrics
+from ..core.parallel_processor import processor
+from .batcher import TranscriptionBatcher
+from .decoding import FallbackPolicy
+
+AudioInput = Union[str, Path, np.ndarray]
+
+class WhisperEngine:
+    """
+    The one faster-whisper model shared by every transcription path.
+
+    Decoding options come from WhisperConfig and all blocking work runs on a
+    dedicated executor so transcription never stalls the event loop.
+    """
+
+    def __init__(self, model_path: Union[str, Path], whisper_config: WhisperConfig, device: str = "cpu"):
+        self.config = whisper_config
+        # Convert cuda:0 to cuda for faster-whisper compatibility
+        self.device = "cuda" if "cuda" in device else "cpu"
+        self.executor = processor.executor("stt", workers=max(1, whisper_config.num_workers))
+        # Loaded on the pool so CTranslate2's worker threads inherit its CPU affinity
+        self.model = self.executor.submit(self._load_model, str(model_path)).result()
+
+        # Greedy-first decoding with beam fallback when decode_mode is "adaptive"
+        self.fallback_policy = FallbackPolicy.from_config(whisper_config)
+        self.metrics = DecodingMetrics()
+
+        self.batcher = TranscriptionBatcher(
+            self.model,
+            batch_size=whisper_config.batch_size,
+            batch_wait_ms=whisper_config.batch_wait_ms,
+            beam_size=whisper_config.beam_size,
+            language=whisper_config.language,
+            executor=self.executor,
+            fallback_policy=self.fallback_policy,
+            metrics=self.metrics
+        )
+
+    def _load_model(self, model_path: str) -> WhisperModel:
+        logger.info(
+            f"Initializing Whisper model on {self.device} with compute type {self.config.compute_type}"
+        )
+        options = dict(
+            device=self.device,
+            compute_type=self.config.compute_type,
+            cpu_threads=self.config.cpu_threads,
+            num_workers=max(1, self.config.num_workers)
+        )
+        try:
+            model = WhisperModel(model_size_or_path=model_path, **options)
+            logger.info("Whisper model initialized successfully")
+            return model
+        except Exception as e:
+            logger.error(f"Failed to initialize Whisper model: {e}")
+            # Fallback to medium model if local model fails
+            logger.info("Attempting to fall back to medium model...")
+            return WhisperModel(model_size_or_path="medium", **options)
+
+    @property
+    def batchable(self) -> bool:
+        """
+        Whether the batcher can honour the configured options: it decodes
+        plain transcription in one fixed language, without VAD or word
+        timestamps
+        """
+        return (
+            self.config.batch_size > 1
+            and self.config.language is not None
+            and self.config.task == "transcribe"
+            and not self.config.vad_filter
+            and not self.config.word_timestamps
+        )
+
+    def decode_options(self, **overrides) -> Dict[str, Any]:
+        """faster-whisper transcribe() options from config, with per-call overrides"""
+        options = dict(
+            beam_size=self.config.beam_size,
+            language=self.config.language,
+            task=self.config.task,
+            vad_filter=self.config.vad_filter,
+            word_timestamps=self.config.word_timestamps
+        )
+        options.update(overrides)
+        return options
+
+    def segments_sync(self, audio: AudioInput, **overrides) -> List[Any]:
+        """Blocking transcription returning fully decoded segments"""
+        if not isinstance(audio, np.ndarray):
+            audio = str(audio)
+        if self.fallback_policy is None or "beam_size" in overrides:
+            return self._decode(audio, **overrides)
+
+        # Greedy pass; temperature fallback is disabled so the policy decides instead
+        start = time.perf_counter()
+        segments = self._decode(audio, **{**overrides, "beam_size": 1, "temperature": 0.0})
+        self.metrics.add_greedy(time.perf_counter() - start)
+
+        for segment in segments:
+            reason = self.fallback_policy.reason(
+                segment.avg_logprob,
+                segment.no_speech_prob,
+                segment.compression_ratio
+            )
+            if reason:
+                logger.debug(f"Greedy decode rejected ({reason}), retrying with beam search")
+                start = time.perf_counter()
+                segments = self._decode(audio, **overrides)
+                self.metrics.add_fallback(reason, time.perf_counter() - start)
+                break
+
+        return segments
+
+    def _decode(self, audio: Union[str, np.ndarray], **overrides) -> List[Any]:
+        segments, _ = self.model.transcribe(audio, **self.decode_options(**overrides))
+        return list(segments)
+
+    def transcribe_sync(self, audio: AudioInput, **overrides) -> str:
+        """Blocking transcription to plain text"""
+        segments = self.segments_sync(audio, **overrides)
+        return " ".join(segment.text for segment in segments).strip()
+
+    async def transcribe(self, audio: AudioInput, **overrides) -> str:
+        """
+        Transcribe audio on the engine executor
+
+        Args:
+            audio: Path to an audio file or 16kHz float32 samples
+            **overrides: Per-call faster-whisper options
+
+        Returns:
+            Transcribed text
+        """
+        if not overrides and self.batchable:
+            # Plain requests can share a decoding batch with other sessions
+            return await self.batcher.transcribe(audio)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            lambda: self.transcribe_sync(audio, **overrides)
+        )
+
+    async def close(self):
+        await self.batcher.close()
+        processor.shutdown(["stt"], wait=False)
+
+_engine: Optional[WhisperEngine] = None
+
+def get_whisper_engine(config: FridayConfig) -> WhisperEngine:
+    """Return the process-wide Whisper engine, loading it on first use"""
+    global _engine
+    if _engine is None:
+        _engine = WhisperEngine(
+            config.models.WHISPER_PATH,
+            config.whisper,
+            device=config.system.device
+        )
+    return _engine
@@ -0,0 +1,134 @@
+import re
+import threading
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+from ..voice.audio import PCMBuffer
+from .engine import WhisperEngine
+
+SAMPLE_RATE = 16000
+
+class StreamingTranscriber:
+    """
+    Transcribes an utterance while it is still being recorded.
+
+    A background thread re-decodes the uncommitted tail of the audio every
+    `step_seconds`. Words that two consecutive passes agree on are committed
+    and the audio before them is dropped from the window, so at end-of-speech
+    only a short tail is left to decode regardless of utterance length.
+    """
+
+    def __init__(self, engine: WhisperEngine, step_seconds: float = 1.0):
+        self.engine = engine
+        self.step_samples = int(step_seconds * SAMPLE_RATE)
+
+        self.audio = PCMBuffer(sample_rate=SAMPLE_RATE)
+        self.offset = 0  # First uncommitted sample
+        self.committed: List[str] = []
+        self.tentative: List[Tuple[str, float]] = []  # (word, end sample) from the last pass
+
+        self._lock = threading.Lock()  # Serialises decoding passes
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._decoded_until = 0
+
+    def start(self):
+        """Reset state and start the background decoding thread"""
+        self.audio.clear()
+        self.offset = 0
+        self.committed = []
+        self.tentative = []
+        self._decoded_until = 0
+        self._stopped.clear()
+        self._worker = threading.Thread(target=self._run, name="whisper-stream", daemon=True)
+        self._worker.start()
+
+    def feed(self, chunk: bytes):
+        """Append a chunk of 16-bit PCM from the recorder"""
+        self.audio.append(chunk)
+        if len(self.audio) - self._decoded_until >= self.step_samples:
+            self._wakeup.set()
+
+    @property
+    def hypothesis(self) -> str:
+        """Committed text plus the latest unconfirmed words"""
+        return " ".join(self.committed + [word for word, _ in self.tentative]).strip()
+
+    def peek(self) -> str:
+        """Best current transcript, decoding the tail now without committing it"""
+        with self._lock:
+            words = self._decode_tail()
+            return " ".join(self.committed + [word for word, _ in words]).strip()
+
+    def finalize(self) -> str:
+        """Stop streaming and decode only the remaining tail"""
+        self._stop_worker()
+        with self._lock:
+            words = self._decode_tail()
+            self.committed.extend(word for word, _ in words)
+            self.tentative = []
+        text = " ".join(self.committed).strip()
+        logger.debug(f"Streaming transcript finalized: {text[:100]}")
+        return text
+
+    def cancel(self):
+        """Stop streaming without producing a transcript"""
+        self._stop_worker()
+
+    def _stop_worker(self):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker:
+            self._worker.join()
+            self._worker = None
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                with self._lock:
+                    self._step()
+            except Exception as e:
+                logger.error(f"Streaming transcription step failed: {e}")
+
+    def _step(self):
+        """Decode the current window and commit the prefix both passes agree on"""
+        words = self._decode_tail()
+        agreed = 0
+        for (word, _), (previous, _) in zip(words, self.tentative):
+            if self._normalize(word) != self._normalize(previous):
+                break
+            agreed += 1
+
+        if agreed:
+            self.committed.extend(word for word, _ in words[:agreed])
+            self.offset = int(words[agreed - 1][1])
+        self.tentative = words[agreed:]
+
+    def _decode_tail(self) -> List[Tuple[str, float]]:
+        end = len(self.audio)
+        self._decoded_until = end
+        if end - self.offset < SAMPLE_RATE // 10:
+            return []
+
+        audio = self.audio.view(self.offset, end)
+        segments = self.engine.segments_sync(
+            audio,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=" ".join(self.committed[-30:]) or None
+        )
+        return [
+            (word.word.strip(), self.offset + word.end * SAMPLE_RATE)
+            for segment in segments
+            for word in (segment.words or [])
+        ]
+
+    @staticmethod
+    def _normalize(word: str) -> str:
+        return re.sub(r"[^\w']", "", word.lower())
@@ -1,38 +1,33 @@
-from faster_whisper import WhisperModel
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
+import numpy as np
 from loguru import logger
 from ..core.config import FridayConfig
+from .engine import WhisperEngine, get_whisper_engine
 
 class WhisperHandler:
     def __init__(self, config: FridayConfig):
         self.config = config
+        self.engine: Optional[WhisperEngine] = None
         self.model = None
         self.initialize_model()
 
     def initialize_model(self):
-        """Initialize the Faster Whisper model"""
+        """Attach to the shared Faster Whisper engine"""
         try:
-            # Convert cuda:0 to cuda for faster-whisper compatibility
-            device = "cuda" if "cuda" in self.config.system.device else "cpu"
-            
-            self.model = WhisperModel(
-                model_size_or_path=str(self.config.models.WHISPER_PATH),
-                device=device,
-                compute_type="float16" if device == "cuda" else "int8",
-                num_workers=self.config.system.num_threads
-            )
-            logger.info(f"Faster Whisper model initialized on {device}")
+            self.engine = get_whisper_engine(self.config)
+            self.model = self.engine.model
+            logger.info(f"Faster Whisper model initialized on {self.engine.device}")
         except Exception as e:
             logger.error(f"Failed to initialize Whisper model: {e}")
             raise
 
-    async def transcribe(self, audio_path: Path) -> Optional[str]:
+    async def transcribe(self, audio: Union[Path, np.ndarray]) -> Optional[str]:
         """
-        Transcribe audio file to text using Faster Whisper
+        Transcribe audio to text using Faster Whisper
         
         Args:
-            audio_path: Path to the audio file
+            audio: Path to an audio file or 16kHz float32 samples
             
         Returns:
             Transcribed text or None if failed
@@ -41,15 +36,8 @@ class WhisperHandler:
             if not self.model:
                 raise RuntimeError("Whisper model not initialized")
 
-            # Perform transcription
-            segments, _ = self.model.transcribe(
-                str(audio_path),
-                beam_size=5,
-                word_timestamps=True
-            )
-
-            # Combine all segments
-            text = " ".join([segment.text for segment in segments])
+            # Perform transcription, batched with other concurrent sessions
+            text = await self.engine.transcribe(audio)
             
             # Clean up the text
             text = text.strip()
@@ -0,0 +1,28 @@
+import torch
+
+def expand_by_duration(x: torch.Tensor, durations: torch.Tensor, n_frames: int) -> torch.Tensor:
+    """
+    Repeat each phoneme's features for its predicted number of frames
+
+    Equivalent to `x @ pred_aln_trg` with the dense 0/1 alignment matrix, but
+    built with a gather on x's device and without per-phoneme host syncs.
+
+    Args:
+        x: Phoneme-level features, shape (batch, channels, phonemes)
+        durations: Frames per phoneme, shape (batch, phonemes); 0 for padding
+        n_frames: Output length, at least the largest total duration
+
+    Returns:
+        Frame-level features of shape (batch, channels, n_frames), zero past
+        each item's own total duration
+    """
+    durations = durations.to(device=x.device, dtype=torch.long)
+    ends = durations.cumsum(dim=-1)
+    frames = torch.arange(n_frames, device=x.device).expand(x.shape[0], -1).contiguous()
+
+    # Phoneme whose span covers each frame: first i with ends[i] > frame
+    index = torch.searchsorted(ends, frames, right=True).clamp(max=x.shape[-1] - 1)
+    expanded = torch.gather(x, 2, index.unsqueeze(1).expand(-1, x.shape[1], -1))
+
+    valid = frames < ends[:, -1:]
+    return expanded * valid.unsqueeze(1).to(expanded.dtype)
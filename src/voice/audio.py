@@ -0,0 +1,90 @@
+import io
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+class PCMBuffer:
+    """
+    Preallocated float32 buffer filled from 16-bit PCM chunks.
+
+    Samples are converted once as they arrive so the recording can be handed
+    to Whisper as-is, without writing and re-decoding a WAV file.
+    """
+
+    def __init__(self, seconds: float = 30.0, sample_rate: int = 16000):
+        self.sample_rate = sample_rate
+        self._data = np.zeros(int(seconds * sample_rate), dtype=np.float32)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def duration(self) -> float:
+        return self._length / self.sample_rate
+
+    def append(self, chunk: bytes):
+        """Convert a chunk of 16-bit PCM and append it"""
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        end = self._length + len(samples)
+        if end > len(self._data):
+            # Grow geometrically so long utterances stay amortised O(1)
+            grown = np.zeros(max(end, 2 * len(self._data)), dtype=np.float32)
+            grown[:self._length] = self._data[:self._length]
+            self._data = grown
+        np.multiply(samples, 1.0 / 32768.0, out=self._data[self._length:end], casting="unsafe")
+        self._length = end
+
+    def view(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Samples in [start, end) without copying"""
+        end = self._length if end is None else min(end, self._length)
+        return self._data[start:end]
+
+    def clear(self):
+        """Forget the recorded samples but keep the allocation"""
+        self._length = 0
+
+    def to_wav(self, path: Path):
+        """Dump the buffer as 16-bit WAV (debugging only)"""
+        pcm = (np.clip(self.view(), -1.0, 1.0) * 32767).astype(np.int16)
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(pcm.tobytes())
+
+def float_to_int16(samples: np.ndarray, out: np.ndarray):
+    """Write float PCM in [-1, 1] into an int16 slice of the same length"""
+    np.multiply(np.clip(samples, -1.0, 1.0), 32767, out=out, casting="unsafe")
+
+@dataclass
+class SpeechAudio:
+    """Synthesized speech as 16-bit mono PCM, handed around in memory"""
+    samples: np.ndarray
+    sample_rate: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    def to_float(self) -> np.ndarray:
+        return self.samples.astype(np.float32) / 32767.0
+
+    def to_wav_bytes(self) -> bytes:
+        """WAV container around the samples, e.g. for API responses"""
+        buffer = io.BytesIO()
+        self._write_wav(buffer)
+        return buffer.getvalue()
+
+    def to_wav(self, path: Union[str, Path]):
+        self._write_wav(str(path))
+
+    def _write_wav(self, target):
+        with wave.open(target, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.samples.tobytes())
@@ -1,29 +1,247 @@
-import torch
-from typing import Optional
+import asyncio
 import hashlib
-from ..core.redis_handler import RedisHandler
+import json
+import struct
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from ..core.redis_handler import get_redis_handler
+
+# magic, sample rate, sample count; followed by int16 mono PCM
+HEADER = struct.Struct("<4sII")
+MAGIC = b"FTA1"
+
+def encode_audio(wav: np.ndarray, sample_rate: int) -> bytes:
+    """Float PCM in [-1, 1] to a headered int16 entry"""
+    pcm = (np.clip(wav, -1.0, 1.0) * 32767).astype(np.int16)
+    return HEADER.pack(MAGIC, sample_rate, len(pcm)) + pcm.tobytes()
+
+def decode_audio(data: bytes) -> Tuple[np.ndarray, int]:
+    """Headered int16 entry back to float32 PCM and its sample rate"""
+    magic, sample_rate, n_samples = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a cached audio entry")
+    pcm = np.frombuffer(data, dtype=np.int16, offset=HEADER.size, count=n_samples)
+    return pcm.astype(np.float32) / 32767.0, sample_rate
+
+class DiskStore:
+    """
+    Local stand-in for Redis binary get/set when no server is running.
+
+    Entries expire `ttl` seconds after they were written (0 keeps them) and
+    the directory is held under `max_bytes` by deleting the oldest files.
+    """
+
+    def __init__(self, path: Path, ttl: int = 7 * 24 * 3600, max_bytes: int = 512 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = sum(file.stat().st_size for file in self.path.glob("*.pcm"))
+        self._lock = threading.Lock()  # Reads and writes run on worker threads
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key.replace(':', '_')}.pcm"
+
+    def _read(self, file: Path) -> Optional[bytes]:
+        try:
+            stat = file.stat()
+        except FileNotFoundError:
+            return None
+        if self.ttl and stat.st_mtime + self.ttl <= time.time():
+            with self._lock:
+                self._remove(file, stat.st_size)
+            return None
+        return file.read_bytes()
+
+    def _write(self, file: Path, value: bytes):
+        with self._lock:
+            previous = file.stat().st_size if file.exists() else 0
+            file.write_bytes(value)
+            self.size += len(value) - previous
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, file: Path, size: int):
+        try:
+            file.unlink()
+            self.size -= size
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """Delete the oldest entries until the directory is back to 90% of max_bytes"""
+        files = sorted(
+            ((file.stat().st_mtime, file.stat().st_size, file) for file in self.path.glob("*.pcm")),
+            key=lambda entry: entry[0]
+        )
+        self.size = sum(size for _, size, _ in files)
+        for _, size, file in files:
+            if self.size <= self.max_bytes * 0.9:
+                break
+            self._remove(file, size)
+
+    async def get_binary(self, key: str) -> Optional[bytes]:
+        try:
+            return await asyncio.to_thread(self._read, self._file(key))
+        except Exception as e:
+            logger.error(f"Disk cache read error: {e}")
+            return None
+
+    async def set_binary(self, key: str, value: bytes, ttl: Optional[int] = None) -> bool:
+        """`ttl` is accepted for the Redis interface; the store's own ttl applies"""
+        try:
+            await asyncio.to_thread(self._write, self._file(key), value)
+            return True
+        except Exception as e:
+            logger.error(f"Disk cache write error: {e}")
+            return False
+
+    async def mget_binary(self, keys: List[str]) -> List[Optional[bytes]]:
+        return list(await asyncio.gather(*(self.get_binary(key) for key in keys)))
+
+    async def mset_binary(self, mapping: Dict[str, bytes], ttl: Optional[int] = None) -> bool:
+        results = await asyncio.gather(*(self.set_binary(key, data, ttl) for key, data in mapping.items()))
+        return all(results)
 
 class TTSCache:
-    def __init__(self):
-        self.redis = RedisHandler()
-        
-    def _get_cache_key(self, text: str) -> str:
-        """Generate a consistent cache key for the text"""
-        return f"tts:{hashlib.md5(text.encode()).hexdigest()}"
-    
-    async def get(self, text: str) -> Optional[torch.Tensor]:
+    """
+    Tiered cache of synthesized sentences.
+
+    Entries live in an in-process LRU bounded by `max_bytes`, backed by
+    Redis or, when no Redis server answers, a directory of files. Keys cover
+    the sentence text and every synthesis parameter that changes the audio.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        disk_path: Optional[Path] = None,
+        ttl: int = 7 * 24 * 3600,
+        disk_bytes: int = 512 * 1024 * 1024
+    ):
+        self.max_bytes = max_bytes
+        self.disk_path = disk_path
+        self.ttl = ttl
+        self.disk_bytes = disk_bytes
+        self.memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self.memory_bytes = 0
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+        self._writes = set()
+
+    async def _get_backend(self):
+        """Redis if it answers, else the disk store (None disables the tier)"""
+        if self.backend is None:
+            redis = get_redis_handler()
+            if await redis.ping():
+                self.backend = redis
+            elif self.disk_path:
+                logger.info(f"Redis unavailable, caching TTS audio in {self.disk_path}")
+                self.backend = DiskStore(self.disk_path, self.ttl, self.disk_bytes)
+            else:
+                self.backend = False
+        return self.backend or None
+
+    def _get_cache_key(self, text: str, params: Dict) -> str:
+        """Generate a consistent cache key for the text and synthesis parameters"""
+        payload = json.dumps({"text": " ".join(text.split()), **params}, sort_keys=True)
+        return f"tts:{hashlib.sha1(payload.encode()).hexdigest()}"
+
+    def _remember(self, key: str, data: bytes):
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        if len(data) > self.max_bytes:
+            return
+        self.memory[key] = data
+        self.memory_bytes += len(data)
+        while self.memory_bytes > self.max_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    async def get(self, text: str, params: Dict) -> Optional[np.ndarray]:
         """Retrieve cached audio"""
-        key = self._get_cache_key(text)
-        data = await self.redis.get_binary(key)
-        
-        if data:
-            # Deserialize to torch tensor
-            return torch.frombuffer(data, dtype=torch.float32)
-        return None
-    
-    async def put(self, text: str, audio: torch.Tensor):
+        return (await self.get_many([text], params))[0]
+
+    async def get_many(self, texts: List[str], params: Dict) -> List[Optional[np.ndarray]]:
+        """Cached float32 audio per text, None where it has to be synthesized"""
+        keys = [self._get_cache_key(text, params) for text in texts]
+        entries = [self.memory.get(key) for key in keys]
+        for key, data in zip(keys, entries):
+            if data is not None:
+                self.memory.move_to_end(key)
+
+        missing = [i for i, data in enumerate(entries) if data is None]
+        backend = await self._get_backend() if missing else None
+        if backend:
+            # One round trip for every sentence of the reply
+            found = await backend.mget_binary([keys[i] for i in missing])
+            for i, data in zip(missing, found):
+                if data:
+                    entries[i] = data
+                    self._remember(keys[i], data)
+
+        results = []
+        for data in entries:
+            if data is None:
+                self.misses += 1
+                results.append(None)
+                continue
+            try:
+                results.append(decode_audio(data)[0])
+                self.hits += 1
+            except Exception as e:
+                logger.error(f"Corrupt TTS cache entry: {e}")
+                self.misses += 1
+                results.append(None)
+        return results
+
+    async def put(self, text: str, audio: np.ndarray, params: Dict, sample_rate: int):
         """Cache audio data"""
-        key = self._get_cache_key(text)
-        # Convert tensor to bytes
-        data = audio.cpu().numpy().tobytes()
-        await self.redis.set_binary(key, data) 
\ No newline at end of file
+        await self.put_many([text], [audio], params, sample_rate)
+
+    async def put_many(self, texts: List[str], wavs: List[np.ndarray], params: Dict, sample_rate: int):
+        """
+        Store sentences in memory right away; the backend write runs in the
+        background so playback never waits on it
+        """
+        items = []
+        for text, wav in zip(texts, wavs):
+            key = self._get_cache_key(text, params)
+            data = encode_audio(wav, sample_rate)
+            self._remember(key, data)
+            items.append((key, data))
+
+        backend = await self._get_backend()
+        if backend:
+            task = asyncio.create_task(self._write(backend, items))
+            self._writes.add(task)
+            task.add_done_callback(self._writes.discard)
+
+    async def _write(self, backend, items: List[Tuple[str, bytes]]):
+        await backend.mset_binary(dict(items), ttl=self.ttl)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def get_summary(self) -> Dict:
+        return {
+            "entries": len(self.memory),
+            "memory_bytes": self.memory_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate
+        }
+
+    async def close(self):
+        """Wait for pending backend writes"""
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
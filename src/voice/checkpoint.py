@@ -0,0 +1,111 @@
+"""
+Pre-converted StyleTTS2 weights.
+
+The training checkpoint is a pickle holding the weights of every submodule
+(some saved from DataParallel with a `module.` prefix) next to training
+state. Converting it once to safetensors keeps only the weights, with
+prefixes stripped and an optional dtype, so startup can memory-map them
+instead of unpickling the whole file:
+
+    python -m src.voice.checkpoint models/StyleTTS2/epoch_2nd_00100.pth
+"""
+import argparse
+import hashlib
+import inspect
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import torch
+from loguru import logger
+from safetensors import safe_open
+from safetensors.torch import save_file
+
+FORMAT = "friday-styletts2-v1"
+DTYPES = {"float32": torch.float32, "float16": torch.float16, "bfloat16": torch.bfloat16}
+# load_state_dict(assign=True) arrived in torch 2.1; older versions copy into the parameters
+ASSIGN_SUPPORTED = "assign" in inspect.signature(torch.nn.Module.load_state_dict).parameters
+
+def fingerprint(path: str, sample_bytes: int = 1 << 20) -> str:
+    """Hash of the checkpoint's size, head and tail; cheap enough for every startup"""
+    size = os.path.getsize(path)
+    digest = hashlib.sha1(str(size).encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read(sample_bytes))
+        f.seek(max(0, size - sample_bytes))
+        digest.update(f.read(sample_bytes))
+    return digest.hexdigest()[:16]
+
+def converted_path(weights_path: str) -> Path:
+    return Path(weights_path).with_suffix(".safetensors")
+
+def convert_checkpoint(
+    weights_path: str,
+    output_path: Optional[str] = None,
+    dtype: Optional[torch.dtype] = None
+) -> Path:
+    """
+    Write the `net` weights of a StyleTTS2 checkpoint as safetensors
+
+    Args:
+        weights_path: The .pth training checkpoint
+        output_path: Defaults to the checkpoint path with a .safetensors suffix
+        dtype: Cast floating-point weights to this dtype (None keeps them)
+
+    Returns:
+        Path of the converted file
+    """
+    output_path = Path(output_path) if output_path else converted_path(weights_path)
+    params = torch.load(weights_path, map_location='cpu')['net']
+
+    tensors, seen = {}, set()
+    for module, state_dict in params.items():
+        for name, tensor in state_dict.items():
+            if name.startswith("module."):
+                name = name[len("module."):]
+            if dtype is not None and tensor.is_floating_point():
+                tensor = tensor.to(dtype)
+            # safetensors refuses tensors that share storage
+            if tensor.data_ptr() in seen:
+                tensor = tensor.clone()
+            seen.add(tensor.data_ptr())
+            tensors[f"{module}.{name}"] = tensor.contiguous()
+
+    metadata = {
+        "format": FORMAT,
+        "source": os.path.basename(weights_path),
+        "source_fingerprint": fingerprint(weights_path),
+        "dtype": str(dtype).replace("torch.", "") if dtype else "original",
+    }
+    save_file(tensors, str(output_path), metadata=metadata)
+    logger.info(f"Converted {len(tensors)} tensors to {output_path}")
+    return output_path
+
+def load_converted(path: Path, device: str = 'cpu') -> Tuple[Dict[str, Dict[str, torch.Tensor]], Dict[str, str]]:
+    """
+    Memory-map converted weights
+
+    Returns:
+        State dicts per StyleTTS2 submodule, and the file's metadata
+    """
+    state_dicts = defaultdict(dict)
+    with safe_open(str(path), framework="pt", device=device) as f:
+        metadata = f.metadata() or {}
+        if metadata.get("format") != FORMAT:
+            raise ValueError(f"{path} is not a converted StyleTTS2 checkpoint")
+        for key in f.keys():
+            module, name = key.split(".", 1)
+            state_dicts[module][name] = f.get_tensor(key)
+    return dict(state_dicts), metadata
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a StyleTTS2 checkpoint to safetensors")
+    parser.add_argument("weights", help="Training checkpoint (.pth)")
+    parser.add_argument("--output", help="Output path (default: next to the checkpoint)")
+    parser.add_argument("--dtype", choices=list(DTYPES), help="Store floating-point weights in this dtype")
+    args = parser.parse_args()
+    convert_checkpoint(args.weights, args.output, DTYPES.get(args.dtype))
+
+if __name__ == "__main__":
+    main()
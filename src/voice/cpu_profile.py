@@ -0,0 +1,102 @@
+import contextlib
+import os
+
+import torch
+import torch.nn as nn
+from loguru import logger
+
+from ..core.config import TTSConfig
+
+def bf16_supported() -> bool:
+    """Native bfloat16 matmuls (AVX512-BF16 or AMX); elsewhere bf16 is emulated and slow"""
+    try:
+        return torch.cpu._is_avx512_bf16_supported() or torch.cpu._is_amx_tile_supported()
+    except AttributeError:
+        return False
+
+def resolve_dtype(tts_config: TTSConfig) -> torch.dtype:
+    """
+    Compute dtype on CPU. float16 is never used: most CPUs run it emulated.
+    Dynamically quantized layers take float32 activations, so quantization
+    forces float32.
+    """
+    if tts_config.cpu_dtype == "bfloat16" and not tts_config.cpu_quantize:
+        return torch.bfloat16
+    if tts_config.cpu_dtype == "auto" and not tts_config.cpu_quantize and bf16_supported():
+        return torch.bfloat16
+    return torch.float32
+
+def cpu_autocast(dtype: torch.dtype):
+    """bfloat16 autocast, or plain float32 execution"""
+    if dtype == torch.bfloat16:
+        return torch.amp.autocast('cpu', dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
+def _set_threads(tts_config: TTSConfig):
+    threads = tts_config.cpu_threads or max(1, (os.cpu_count() or 2) // 2)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_interop_threads(tts_config.cpu_interop_threads)
+    except RuntimeError:
+        # Only allowed before the first inter-op parallel work in the process
+        logger.debug("Inter-op threads already fixed for this process")
+    return threads
+
+def _channels_last(module: nn.Module):
+    """Only 4-D convolution weights have a channels-last layout"""
+    for sub in module.modules():
+        if isinstance(sub, nn.Conv2d):
+            sub.to(memory_format=torch.channels_last)
+
+def _quantize(module: nn.Module) -> nn.Module:
+    """Dynamic int8 weights for LSTM and Linear layers"""
+    quantized = torch.ao.quantization.quantize_dynamic(module, {nn.LSTM, nn.Linear}, dtype=torch.qint8)
+    for sub in quantized.modules():
+        if isinstance(sub, torch.ao.nn.quantized.dynamic.LSTM):
+            # StyleTTS2 calls this cuDNN-only method unconditionally
+            sub.flatten_parameters = lambda: None
+    return quantized
+
+def apply_cpu_profile(tts):
+    """
+    Configure a TTSHandler running on CPU
+
+    Sets thread counts, optionally quantizes the LSTM and Linear layers of
+    the prosody predictor and text encoder to dynamic int8, converts 2-D
+    convolutions to channels-last, compiles the decoder, and warms up.
+
+    Returns:
+        The compute dtype the handler should autocast to
+    """
+    tts_config = tts.config.tts
+    threads = _set_threads(tts_config)
+    dtype = resolve_dtype(tts_config)
+
+    if tts_config.cpu_quantize:
+        for name in ("predictor", "text_encoder"):
+            tts.model[name] = _quantize(tts.model[name])
+
+    if tts_config.cpu_channels_last:
+        for key in tts.model:
+            _channels_last(tts.model[key])
+
+    if tts_config.cpu_compile:
+        try:
+            tts.model.decoder = torch.compile(tts.model.decoder, dynamic=True)
+        except Exception as e:
+            logger.warning(f"torch.compile unavailable, running the decoder eagerly: {e}")
+
+    logger.info(
+        f"TTS CPU profile: {threads} threads, {str(dtype).replace('torch.', '')}"
+        f"{', int8 predictor/text encoder' if tts_config.cpu_quantize else ''}"
+        f"{', compiled decoder' if tts_config.cpu_compile else ''}"
+    )
+    return dtype
+
+def warm_up(tts, sentences=("Hello there.", "This is a warm up sentence for the speech model.")):
+    """
+    Run the model once at two lengths so one-time costs (allocator growth,
+    oneDNN primitive creation, compilation) do not land on the first reply
+    """
+    with torch.inference_mode(), tts._autocast():
+        tts._inference_batch(list(sentences), None, diffusion_steps=tts.step_policy.max_steps)
@@ -0,0 +1,148 @@
+import json
+import re
+from collections import OrderedDict
+from importlib.metadata import PackageNotFoundError, version as package_version
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+from nltk.tokenize import word_tokenize
+
+class PhonemeCache:
+    """
+    Bounded LRU cache from normalized sentence text to StyleTTS2 token IDs.
+
+    Skips espeak, NLTK tokenization and TextCleaner for sentences FRIDAY says
+    repeatedly. Misses from one request are phonemized in a single backend
+    call, and the cache can be persisted to JSON between runs. The file
+    records the phonemizer's version (see backend_version) and is discarded
+    when it no longer matches, since another espeak release can phonemize
+    the same text differently.
+    """
+
+    def __init__(
+        self,
+        phonemizer,
+        textcleaner,
+        max_entries: int = 2048,
+        persist_path: Optional[Path] = None
+    ):
+        self.phonemizer = phonemizer
+        self.textcleaner = textcleaner
+        self.max_entries = max_entries
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.version = backend_version(phonemizer)
+        self.entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._load()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Cache key: the text as phonemized, with whitespace collapsed"""
+        return re.sub(r"\s+", " ", text.strip().replace('"', ''))
+
+    def get(self, text: str) -> np.ndarray:
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[np.ndarray]:
+        """Token IDs for each text, phonemizing all misses in one call"""
+        keys = [self.normalize(text) for text in texts]
+        results: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    results[key] = self.entries[key]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+
+        missing = list(dict.fromkeys(key for key in keys if key not in results))
+        if missing:
+            phonemes = self.phonemizer.phonemize(missing)
+            with self._lock:
+                for key, ps in zip(missing, phonemes):
+                    tokens = self._to_tokens(ps)
+                    results[key] = tokens
+                    self.entries[key] = tokens
+                self._evict()
+
+        return [results[key] for key in keys]
+
+    def _to_tokens(self, ps: str) -> np.ndarray:
+        ps = ' '.join(word_tokenize(ps))
+        tokens = self.textcleaner(ps)
+        tokens.insert(0, 0)
+        return np.asarray(tokens, dtype=np.int64)
+
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(self.hits + self.misses, 1)
+
+    def get_summary(self) -> Dict:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate
+        }
+
+    def _load(self):
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or data.get("version") != self.version:
+                logger.info(f"Phoneme cache was built by another phonemizer ({self.version}), starting empty")
+                return
+            for key, tokens in data["entries"].items():
+                self.entries[key] = np.asarray(tokens, dtype=np.int64)
+            self._evict()
+            logger.info(f"Loaded {len(self.entries)} cached phonemizations")
+        except Exception as e:
+            logger.error(f"Error loading phoneme cache: {e}")
+
+    def save(self):
+        """Persist the cache, most recently used entries last"""
+        if not self.persist_path:
+            return
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                entries = {key: tokens.tolist() for key, tokens in self.entries.items()}
+            data = {"version": self.version, "entries": entries}
+            with open(self.persist_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+        except Exception as e:
+            logger.error(f"Error saving phoneme cache: {e}")
+
+def backend_version(phonemizer) -> str:
+    """
+    Everything besides the text that decides the phonemes: the phonemizer
+    package, the backend and its espeak library version, and the language
+    """
+    try:
+        parts = [f"phonemizer {package_version('phonemizer')}"]
+    except PackageNotFoundError:
+        parts = []
+    name = type(phonemizer).__name__
+    try:
+        # EspeakBackend.version() reports the loaded espeak library
+        name += " " + ".".join(str(v) for v in phonemizer.version())
+    except Exception:
+        pass
+    parts.append(name)
+    language = getattr(phonemizer, "language", None)
+    if language:
+        parts.append(str(language))
+    return ", ".join(parts)
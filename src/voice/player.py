@@ -1,82 +1,342 @@
 import wave
+import queue
+import asyncio
+import numpy as np
 import pyaudio
-from threading import Event
+from typing import AsyncIterator, Dict, Optional
+from threading import Event, Thread
 from pathlib import Path
 from loguru import logger
 from rhasspysilence import WebRtcVadRecorder, VoiceCommandResult
 
+from ..core.cancellation import CancellationToken
+from .audio import SpeechAudio
+from .sources import AudioSource
+
 class AudioPlayer:
-    def __init__(self):
+    """
+    Plays PCM through persistent callback-mode output streams.
+
+    Chunks are queued and PortAudio's thread pulls them as the device needs
+    them, so playback starts with the first chunk while later ones are
+    still being synthesized, and the event loop never blocks on a write.
+    Barge-in detection runs on its own thread and cancels playback, and the
+    turn's cancellation token, when the user talks over it. It takes its
+    frames from the recorder's audio source when that source can share them,
+    since many devices (e.g. ALSA hw:) cannot be opened twice; otherwise it
+    opens its own input stream.
+    """
+
+    def __init__(self, source: Optional[AudioSource] = None):
+        """
+        Args:
+            source: The recorder's microphone, to share with barge-in detection
+        """
         self.playback_buffer = 2048
         self.input_buffer = 512
-        self.chunk_size = 1536
         self.vad_mode = 2
         self.silence_seconds = 0.25
         self.stop_event = Event()
         self.pa = pyaudio.PyAudio()
 
-    async def play(self, file_path: Path, interruptible: bool = True) -> bool:
-        """
-        Plays audio file with optional interrupt capability
-        Returns True if played completely, False if interrupted
-        """
-        try:
-            with wave.open(str(file_path), 'rb') as wf:
-                playback_stream = self.pa.open(
-                    format=self.pa.get_format_from_width(wf.getsampwidth()),
-                    channels=wf.getnchannels(),
-                    rate=wf.getframerate(),
-                    output=True,
-                    frames_per_buffer=self.playback_buffer
-                )
-                
-                input_stream = None
-                recorder = None
-                
-                if interruptible:
-                    input_stream = self.pa.open(
+        # Output side: one stream per sample rate, fed from the chunk queue
+        self._outputs: Dict[int, pyaudio.Stream] = {}
+        self._chunks: "queue.Queue[bytes]" = queue.Queue()
+        self._pending = memoryview(b"")
+        self._feeding = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._done: Optional[asyncio.Event] = None
+
+        # Capture side: barge-in detection while `_listen` is set
+        self.interrupted = Event()
+        self._listen = Event()
+        self._closed = Event()
+        self._input = None
+        self._capture_thread: Optional[Thread] = None
+        self._token: Optional[CancellationToken] = None
+        self._frames: "queue.Queue[bytes]" = queue.Queue(maxsize=64)
+        self._remove_tap = source.add_tap(self._on_frames) if source is not None else None
+
+    def _on_frames(self, data: bytes):
+        """Source tap (capture thread): keep frames only while listening"""
+        if self._listen.is_set():
+            try:
+                self._frames.put_nowait(data)
+            except queue.Full:
+                pass  # Detection fell behind; dropping audio beats blocking capture
+
+    def _output(self, sample_rate: int):
+        stream = self._outputs.get(sample_rate)
+        if stream is None:
+            stream = self.pa.open(
+                format=pyaudio.paInt16,
+                channels=1,
+                rate=sample_rate,
+                output=True,
+                frames_per_buffer=self.playback_buffer,
+                stream_callback=self._callback,
+                start=False
+            )
+            self._outputs[sample_rate] = stream
+        return stream
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        """PortAudio thread: fill the device buffer from the chunk queue"""
+        needed = frame_count * 2
+        out = bytearray()
+        while len(out) < needed:
+            if not len(self._pending):
+                try:
+                    self._pending = memoryview(self._chunks.get_nowait())
+                except queue.Empty:
+                    break
+            take = self._pending[:needed - len(out)]
+            out += take
+            self._pending = self._pending[len(take):]
+
+        if len(out) < needed:
+            if not self._feeding:
+                # Everything queued has been handed to the device
+                self._signal_done()
+            out += bytes(needed - len(out))  # Underrun or tail: silence
+        return bytes(out), pyaudio.paContinue
+
+    def _signal_done(self):
+        if self._loop is not None and self._done is not None:
+            self._loop.call_soon_threadsafe(self._done.set)
+
+    def _clear_queue(self):
+        self._pending = memoryview(b"")
+        while True:
+            try:
+                self._chunks.get_nowait()
+            except queue.Empty:
+                break
+
+    def _start_capture(self):
+        if self._capture_thread is None:
+            self._capture_thread = Thread(target=self._capture_loop, name="barge-in", daemon=True)
+            self._capture_thread.start()
+        self._listen.set()
+
+    def _capture_loop(self):
+        """Capture thread: VAD on the microphone while audio is playing"""
+        while not self._closed.is_set():
+            if not self._listen.wait(timeout=0.5):
+                continue
+            if self._remove_tap is not None:
+                self._detect(self._next_shared_chunk)
+                continue
+            try:
+                if self._input is None:
+                    self._input = self.pa.open(
                         rate=16000,
                         format=pyaudio.paInt16,
                         channels=1,
                         input=True,
-                        frames_per_buffer=self.input_buffer
-                    )
-                    recorder = WebRtcVadRecorder(
-                        vad_mode=self.vad_mode,
-                        silence_seconds=self.silence_seconds
+                        frames_per_buffer=self.input_buffer,
+                        start=False
                     )
-                    recorder.start()
-                
-                data = wf.readframes(self.chunk_size)
-                while data and not self.stop_event.is_set():
-                    if interruptible and input_stream:
-                        try:
-                            input_chunk = input_stream.read(
-                                self.input_buffer, 
-                                exception_on_overflow=False
-                            )
-                            voice_command = recorder.process_chunk(input_chunk)
-                            if voice_command and voice_command.result == VoiceCommandResult.SUCCESS:
-                                logger.info("Playback interrupted by voice")
-                                return False
-                        except OSError:
-                            pass
-                            
-                    playback_stream.write(data)
-                    data = wf.readframes(self.chunk_size)
-                
-                return True
+                self._input.start_stream()
+                try:
+                    self._detect(lambda: self._input.read(self.input_buffer, exception_on_overflow=False))
+                finally:
+                    self._input.stop_stream()
+            except OSError as e:
+                logger.warning(f"Barge-in capture unavailable: {e}")
+                self._listen.clear()
+
+    def _next_shared_chunk(self) -> Optional[bytes]:
+        try:
+            return self._frames.get(timeout=0.1)
+        except queue.Empty:
+            return None
+
+    def _detect(self, read):
+        """Run VAD over chunks from `read` until speech, or listening stops"""
+        # Frames from before this listening period are not barge-in
+        while not self._frames.empty():
+            self._frames.get_nowait()
+        recorder = WebRtcVadRecorder(
+            vad_mode=self.vad_mode,
+            silence_seconds=self.silence_seconds
+        )
+        recorder.start()
+        try:
+            while self._listen.is_set() and not self._closed.is_set():
+                chunk = read()
+                if chunk is None:
+                    continue
+                voice_command = recorder.process_chunk(chunk)
+                if voice_command and voice_command.result == VoiceCommandResult.SUCCESS:
+                    self._barge_in()
+                    break
+        finally:
+            recorder.stop()
+
+    def _barge_in(self):
+        logger.info("Interrupted by voice")
+        token = self._token
+        self.interrupt()
+        if token is not None:
+            token.cancel("barge-in")
+
+    def listen(self, token: CancellationToken):
+        """Watch for barge-in outside playback (e.g. while the LLM runs), cancelling `token`"""
+        self._token = token
+        self._start_capture()
+
+    def stop_listening(self):
+        self._listen.clear()
+        self._token = None
+
+    def interrupt(self):
+        """Stop the current playback (thread-safe)"""
+        self.interrupted.set()
+        self._listen.clear()
+        self._clear_queue()
+        self._signal_done()
+
+    async def play_stream(
+        self,
+        chunks: AsyncIterator[np.ndarray],
+        sample_rate: int = 24000,
+        interruptible: bool = True,
+        cancel: Optional[CancellationToken] = None
+    ) -> bool:
+        """
+        Plays PCM chunks as they arrive, e.g. from TTSHandler.stream_speech
+        (float32 in [-1, 1] or int16). Barge-in cancels `cancel`, and
+        cancelling it from elsewhere stops playback.
+        Returns True if played completely, False if interrupted
+        """
+        self._loop = asyncio.get_running_loop()
+        self._done = asyncio.Event()
+        self.interrupted.clear()
+        self._clear_queue()
+        self._feeding = True
+        stream = None
+        iterator = chunks.__aiter__()
+        finished = None
+        unregister = None
+        if cancel is not None:
+            self._token = cancel
+            unregister = cancel.add_callback(self.interrupt)
+
+        try:
+            stream = self._output(sample_rate)
+            stream.start_stream()
+            if interruptible:
+                self._start_capture()
+
+            # Set on barge-in, or once the queue has drained after feeding ends
+            finished = asyncio.ensure_future(self._done.wait())
+            while not self._stopped():
+                # Wait for the next chunk, but wake up on barge-in
+                next_chunk = asyncio.ensure_future(iterator.__anext__())
+                await asyncio.wait({next_chunk, finished}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_chunk.done():
+                    next_chunk.cancel()
+                    await asyncio.gather(next_chunk, return_exceptions=True)
+                    break
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+                if chunk.dtype != np.int16:
+                    chunk = (np.clip(chunk, -1.0, 1.0) * 32767).astype(np.int16)
+                self._chunks.put(chunk.tobytes())
+
+            # Let the callback drain the queue
+            self._feeding = False
+            await finished
+            return not self._stopped()
 
         except Exception as e:
-            logger.error(f"Error playing audio: {e}")
+            logger.error(f"Error playing audio stream: {e}")
             return False
 
         finally:
-            if 'playback_stream' in locals():
-                playback_stream.stop_stream()
-                playback_stream.close()
-            if 'input_stream' in locals() and input_stream:
-                input_stream.stop_stream()
-                input_stream.close()
-            if 'recorder' in locals() and recorder:
-                recorder.stop() 
\ No newline at end of file
+            self._feeding = False
+            self._listen.clear()
+            if finished is not None:
+                finished.cancel()
+            if self._stopped():
+                self._clear_queue()
+            if hasattr(iterator, 'aclose'):
+                await iterator.aclose()
+            if stream is not None and stream.is_active():
+                # Returns once the device has played what it was given
+                await self._loop.run_in_executor(None, stream.stop_stream)
+            if unregister is not None:
+                unregister()
+                if cancel.is_cancelled():
+                    cancel.acknowledge("playback")
+
+    def _stopped(self) -> bool:
+        return self.interrupted.is_set() or self.stop_event.is_set()
+
+    async def play_audio(
+        self,
+        audio: SpeechAudio,
+        interruptible: bool = True,
+        cancel: Optional[CancellationToken] = None
+    ) -> bool:
+        """
+        Plays in-memory audio, e.g. from TTSHandler.generate_speech
+        Returns True if played completely, False if interrupted
+        """
+        async def single():
+            yield audio.samples
+        return await self.play_stream(single(), audio.sample_rate, interruptible, cancel)
+
+    @staticmethod
+    def _read_wav(file_path: Path) -> SpeechAudio:
+        """PCM WAV of 8 to 32 bits and any channel count, as int16 mono"""
+        with wave.open(str(file_path), 'rb') as wf:
+            width, channels = wf.getsampwidth(), wf.getnchannels()
+            data = wf.readframes(wf.getnframes())
+            sample_rate = wf.getframerate()
+
+        if width == 1:  # Unsigned 8-bit
+            samples = (np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128) << 8
+        elif width == 2:
+            samples = np.frombuffer(data, dtype=np.int16)
+        elif width == 3:  # Packed little-endian 24-bit: keep the top two bytes
+            samples = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)[:, 1:].copy().view(np.int16).ravel()
+        elif width == 4:
+            samples = (np.frombuffer(data, dtype=np.int32) >> 16).astype(np.int16)
+        else:
+            raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        return SpeechAudio(samples, sample_rate)
+
+    async def play(self, file_path: Path, interruptible: bool = True) -> bool:
+        """
+        Plays a PCM WAV file (mixed down to mono) with optional interrupt capability
+        Returns True if played completely, False if interrupted
+        """
+        try:
+            audio = self._read_wav(file_path)
+        except Exception as e:
+            logger.error(f"Error playing audio {file_path}: {e}")
+            return False
+        return await self.play_audio(audio, interruptible)
+
+    def close(self):
+        """Release the streams and the capture thread"""
+        if self._remove_tap is not None:
+            self._remove_tap()
+        self._closed.set()
+        self._listen.clear()
+        if self._capture_thread is not None:
+            self._capture_thread.join(timeout=1.0)
+        for stream in self._outputs.values():
+            stream.close()
+        self._outputs.clear()
+        if self._input is not None:
+            self._input.close()
+            self._input = None
+        self.pa.terminate()
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from loguru import logger
+
+class PhraseBank:
+    """
+    Synthesizes stock phrases into the TTS audio cache after startup.
+
+    Submits one sentence at a time to the TTS handler's own single-worker
+    executor, so it never runs the model alongside a live reply, stays on
+    the TTS cores of the core plan, and records to the step policy from the
+    same thread as everything else; a request that arrives meanwhile waits
+    for at most one sentence. It only starts once the handler has been idle
+    for `idle_seconds` and `is_busy` (if given) reports nothing else going
+    on. Sentences already in the cache, e.g. from a previous run, are
+    skipped, so after the first run this costs only the cache lookups.
+    """
+
+    def __init__(
+        self,
+        tts,
+        phrases: List[str],
+        idle_seconds: float = 3.0,
+        is_busy: Optional[Callable[[], bool]] = None
+    ):
+        self.tts = tts
+        self.phrases = phrases
+        self.idle_seconds = idle_seconds
+        self.is_busy = is_busy or (lambda: False)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.tts.audio_cache is None or self._task is not None:
+            return
+        self._task = asyncio.create_task(self.run())
+
+    def _sentences(self) -> List[str]:
+        # Same splitting as playback so the cache keys match
+        sentences = []
+        for phrase in self.phrases:
+            sentences.extend(self.tts.split_sentences(phrase))
+        return list(dict.fromkeys(sentences))
+
+    async def _wait_until_idle(self):
+        poll = max(self.idle_seconds / 4, 0.1)
+        while self.tts.idle_seconds < self.idle_seconds or self.is_busy():
+            await asyncio.sleep(poll)
+
+    async def run(self):
+        sentences = self._sentences()
+        cached = await self.tts.get_cached(sentences)
+        todo = [s for s, wav in zip(sentences, cached) if wav is None]
+        if not todo:
+            logger.debug(f"Phrase bank: all {len(sentences)} sentences already cached")
+            return
+
+        loop = asyncio.get_running_loop()
+        for sentence in todo:
+            await self._wait_until_idle()
+            wavs = await loop.run_in_executor(
+                self.tts.executor, self.tts._synthesize, [sentence], False, self.tts.step_policy.max_steps
+            )
+            await self.tts.store_cached([sentence], wavs)
+
+        logger.info(f"Phrase bank: synthesized {len(todo)} of {len(sentences)} stock sentences")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.error(f"Phrase bank prewarm failed: {e}")
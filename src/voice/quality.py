@@ -0,0 +1,102 @@
+from collections import Counter
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+from ..core.config import TTSConfig
+
+class DiffusionStepPolicy:
+    """
+    Picks StyleTTS2 diffusion steps per synthesis call.
+
+    In "fixed" mode this is always `diffusion_steps`. In "adaptive" mode the
+    real-time factor of every tier is measured online (EMA of synthesis time
+    over audio time) and each call gets the largest tier expected to finish
+    within its latency budget. The first sentence of a reply has a short
+    fixed budget; later ones have the playback time of the audio queued
+    ahead of them, since that is how long the listener will not notice.
+    """
+
+    def __init__(self, tts_config: TTSConfig):
+        self.config = tts_config
+        self.adaptive = tts_config.step_policy == "adaptive"
+        self.tiers = sorted(set(tts_config.diffusion_tiers)) or [tts_config.diffusion_steps]
+        self.rtf: Dict[int, float] = {}
+        self.seconds_per_char = 0.07  # Refined from every synthesized sentence
+        self.chosen = Counter()
+
+    @property
+    def max_steps(self) -> int:
+        """Steps for background work where latency does not matter"""
+        return self.tiers[-1] if self.adaptive else self.config.diffusion_steps
+
+    @property
+    def cache_tag(self):
+        """Cache key component: audio from any tier of the same policy is interchangeable"""
+        return self.tiers if self.adaptive else self.config.diffusion_steps
+
+    def estimate_seconds(self, sentences: List[str]) -> float:
+        """Expected audio duration before synthesis"""
+        return self.seconds_per_char * sum(len(s) for s in sentences)
+
+    def _expected_rtf(self, steps: int) -> Optional[float]:
+        if steps in self.rtf:
+            return self.rtf[steps]
+        if not self.rtf:
+            return None
+        # Scale the nearest measured tier by the step ratio; pessimistic,
+        # since only the sampler's share of the time grows with steps
+        nearest = min(self.rtf, key=lambda s: abs(s - steps))
+        return self.rtf[nearest] * max(steps / nearest, 1.0)
+
+    def choose(self, sentences: List[str], budget: Optional[float] = None) -> int:
+        """
+        Args:
+            sentences: The sentences about to be synthesized together
+            budget: Seconds the synthesis may take; None for the whole
+                reply at once, which only has to keep up with real time
+
+        Returns:
+            Diffusion steps for this call
+        """
+        if not self.adaptive:
+            return self.config.diffusion_steps
+
+        audio_seconds = self.estimate_seconds(sentences)
+        if budget is None:
+            budget = audio_seconds * self.config.playback_budget_ratio
+
+        steps = self.tiers[0]
+        for tier in self.tiers:
+            rtf = self._expected_rtf(tier)
+            if rtf is not None and rtf * audio_seconds <= budget:
+                steps = tier
+
+        self.chosen[steps] += 1
+        expected = self._expected_rtf(steps)
+        logger.debug(
+            f"Diffusion tier {steps} steps for {len(sentences)} sentence(s): "
+            f"budget {budget:.2f}s, expected "
+            + (f"{expected * audio_seconds:.2f}s" if expected is not None else "unknown")
+        )
+        return steps
+
+    def record(self, steps: int, sentences: List[str], synthesis_time: float, audio_seconds: float):
+        """Update the RTF of the tier used and the duration estimate"""
+        if audio_seconds <= 0:
+            return
+        rate = self.config.rtf_smoothing
+        rtf = synthesis_time / audio_seconds
+        self.rtf[steps] = rtf if steps not in self.rtf else (1 - rate) * self.rtf[steps] + rate * rtf
+
+        chars = sum(len(s) for s in sentences)
+        if chars:
+            self.seconds_per_char = (1 - rate) * self.seconds_per_char + rate * audio_seconds / chars
+
+    def get_summary(self) -> Dict:
+        return {
+            "policy": self.config.step_policy,
+            "rtf_by_steps": dict(sorted(self.rtf.items())),
+            "chosen_steps": dict(sorted(self.chosen.items())),
+            "seconds_per_char": self.seconds_per_char
+        }
@@ -1,75 +1,242 @@
-import io
-import wave
+import asyncio
+import time
+from dataclasses import dataclass
 from pathlib import Path
-import keyboard
 from threading import Event
-import pyaudio
+from typing import Callable, Optional
+import numpy as np
 from rhasspysilence import WebRtcVadRecorder, VoiceCommand, VoiceCommandResult
 from loguru import logger
+from ..core.config import config
+from ..speech.streaming import StreamingTranscriber
+from .audio import PCMBuffer
+from .sources import AudioSource, PyAudioSource
+from .vad import VADGate
+
+try:
+    import keyboard
+except ImportError:  # Headless machines without keyboard access
+    keyboard = None
+
+@dataclass
+class Utterance:
+    """One captured utterance, waiting to be transcribed"""
+    audio: Optional[np.ndarray]  # 16 kHz float32; None when streamed
+    duration: float
+    streamed: bool = False  # The streaming transcriber already holds it
 
 class InterruptibleRecorder:
-    def __init__(self, whisper_handler):
+    def __init__(
+        self,
+        whisper_handler,
+        source: Optional[AudioSource] = None,
+        streaming: bool = config.whisper.streaming,
+        always_listening: bool = config.vad.always_listening,
+        save_debug_audio: bool = config.system.save_debug_audio
+    ):
         """
         Initialize recorder with WhisperHandler for transcription
+
+        Args:
+            whisper_handler: Handler used for transcription
+            source: Where audio comes from; defaults to the microphone
+            streaming: Transcribe in the background while the user is speaking
+            always_listening: Keep the mic open and only transcribe VAD-gated speech
+            save_debug_audio: Also dump every recording to temp/audio as WAV
         """
         self.stop_recording = Event()
         self.vad_mode = 3  # More aggressive voice detection
         self.silence_seconds = 0.5
         self.whisper_handler = whisper_handler
-        self.pa = pyaudio.PyAudio()
+        self.chunk_frames = 960
+        # Kept open across turns instead of reopening a stream per recording
+        self.source = source or PyAudioSource(sample_rate=16000, frames_per_buffer=self.chunk_frames)
+        self.buffer = PCMBuffer(sample_rate=16000)
+
+        self.save_debug_audio = save_debug_audio
         self.temp_dir = Path("temp/audio")
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        if save_debug_audio:
+            self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+        # Low-CPU gate so only likely speech ever reaches Whisper
+        self.gate = VADGate(config.vad, sample_rate=16000) if always_listening else None
+
+        # Tracks trailing silence so callers can act on a likely endpoint
+        self.endpoint_gate = VADGate(config.vad, sample_rate=16000)
+
+        self.streamer = None
+        if streaming:
+            self.streamer = StreamingTranscriber(
+                whisper_handler.engine,
+                step_seconds=config.whisper.stream_step_seconds
+            )
+
+        # Register the ESC hotkey once rather than polling the keyboard per chunk
+        if keyboard is not None:
+            try:
+                keyboard.add_hotkey('esc', self.stop_recording.set)
+            except Exception as e:
+                logger.warning(f"ESC hotkey unavailable: {e}")
 
     def check_interrupt(self):
-        return keyboard.is_pressed('esc')
+        return self.stop_recording.is_set()
 
-    async def record(self) -> str:
+    async def record(
+        self,
+        on_endpoint: Optional[Callable[[str], None]] = None,
+        on_resume: Optional[Callable[[], None]] = None
+    ) -> str:
         """
         Records audio until silence is detected or interrupted.
         Returns transcribed text using faster-whisper.
+
+        Args:
+            on_endpoint: Called with the partial transcript once the user has
+                been silent for `endpoint_ms` (streaming mode only)
+            on_resume: Called if the user starts talking again after that
+        """
+        while True:
+            utterance = await self.capture(on_endpoint, on_resume)
+            if utterance is None:
+                return "interrupted"
+            text = await self.transcribe(utterance)
+            # A gated segment that decodes to nothing was noise; keep listening
+            if text or not self.gate:
+                return text
+
+    async def capture(
+        self,
+        on_endpoint: Optional[Callable[[str], None]] = None,
+        on_resume: Optional[Callable[[], None]] = None
+    ) -> Optional[Utterance]:
+        """
+        Records one utterance without transcribing it, so the conversation
+        pipeline can hand it to the STT stage and keep listening.
+        Returns None if interrupted or the source is exhausted.
         """
+        if self.gate:
+            return await self._capture_gated()
+
         recorder = WebRtcVadRecorder(
             vad_mode=self.vad_mode,
             silence_seconds=self.silence_seconds,
         )
         recorder.start()
         
-        audio_source = self.pa.open(
-            rate=16000,
-            format=pyaudio.paInt16,
-            channels=1,
-            input=True,
-            frames_per_buffer=960,
-        )
-        audio_source.start_stream()
+        self.source.start()
+        self.source.flush()
+        self.stop_recording.clear()
+
+        self.buffer.clear()
+        if self.streamer:
+            self.streamer.start()
 
-        frames = []
+        track_endpoint = on_endpoint is not None and self.streamer is not None
+        self.endpoint_gate.reset()
+        endpoint_task = None
         
         try:
             while True:
                 if self.check_interrupt():
                     logger.info("Recording interrupted by user")
-                    return "interrupted"
+                    return None
+
+                chunk = await self.source.read(self.chunk_frames)
+                if chunk is None:
+                    if not len(self.buffer):
+                        logger.info("Audio source exhausted")
+                        return None
+                    break
 
-                chunk = audio_source.read(960)
                 voice_command = recorder.process_chunk(chunk)
-                frames.append(chunk)
+                self.buffer.append(chunk)
+                if self.streamer:
+                    self.streamer.feed(chunk)
+
+                if track_endpoint:
+                    self.endpoint_gate.process(chunk)
+                    speaking = self.endpoint_gate.in_speech and self.endpoint_gate.trailing_silence_ms == 0
+                    if endpoint_task is None and self.endpoint_gate.trailing_silence_ms >= config.vad.endpoint_ms:
+                        endpoint_task = asyncio.create_task(self._signal_endpoint(on_endpoint))
+                    elif endpoint_task is not None and speaking:
+                        # False alarm: the user kept talking
+                        endpoint_task.cancel()
+                        endpoint_task = None
+                        if on_resume:
+                            on_resume()
 
                 if voice_command and voice_command.result == VoiceCommandResult.SUCCESS:
                     logger.info("Voice command complete")
                     break
 
-            wav_path = self.temp_dir / "recording.wav"
-            with wave.open(str(wav_path), "wb") as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(self.pa.get_sample_size(pyaudio.paInt16))
-                wf.setframerate(16000)
-                wf.writeframes(b''.join(frames))
+            if self.save_debug_audio:
+                wav_path = self.temp_dir / f"recording-{time.time_ns()}.wav"
+                self.buffer.to_wav(wav_path)
+                logger.debug(f"Saved debug recording to {wav_path}")
 
-            # Transcribe using faster-whisper
-            return await self.whisper_handler.transcribe(wav_path)
+            if self.streamer:
+                # Most of the utterance is already committed; only the tail is left
+                return Utterance(None, len(self.buffer) / 16000, streamed=True)
+            # Copied, the buffer is reused as soon as the next capture starts
+            return Utterance(self.buffer.view().copy(), len(self.buffer) / 16000)
 
         finally:
-            audio_source.stop_stream()
-            audio_source.close()
-            recorder.stop() 
\ No newline at end of file
+            if endpoint_task is not None and not endpoint_task.done():
+                endpoint_task.cancel()
+            if self.streamer:
+                # Stops the background decoder; `transcribe` decodes the tail
+                self.streamer.cancel()
+            recorder.stop()
+
+    async def transcribe(self, utterance: Utterance) -> Optional[str]:
+        """Transcript of a captured utterance"""
+        if utterance.streamed:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.streamer.engine.executor, self.streamer.finalize
+            )
+        # Hand the samples straight to faster-whisper, no file round trip
+        return await self.whisper_handler.transcribe(utterance.audio)
+
+    async def _signal_endpoint(self, on_endpoint: Callable[[str], None]):
+        """Decode the current tail and hand the partial transcript to the caller"""
+        partial = await asyncio.get_running_loop().run_in_executor(
+            self.streamer.engine.executor, self.streamer.peek
+        )
+        on_endpoint(partial)
+
+    async def _capture_gated(self) -> Optional[Utterance]:
+        """
+        Always-on listening: wait on the VAD gate until a speech segment ends.
+        Only that trimmed segment is transcribed.
+        """
+        self.source.start()
+        # Drop what the mic picked up during the reply, FRIDAY's own voice included
+        self.source.flush()
+        self.stop_recording.clear()
+        self.gate.reset()
+
+        while True:
+            if self.check_interrupt():
+                logger.info("Listening interrupted by user")
+                return None
+
+            chunk = await self.source.read(self.chunk_frames)
+            if chunk is None:
+                logger.info("Audio source exhausted")
+                return None
+
+            segment = self.gate.process(chunk)
+            if segment is None:
+                continue
+
+            logger.info(f"Speech segment detected ({len(segment) / 16000:.2f}s)")
+            if self.save_debug_audio:
+                self.buffer.clear()
+                self.buffer.append((segment * 32767).astype("int16").tobytes())
+                self.buffer.to_wav(self.temp_dir / f"segment-{time.time_ns()}.wav")
+
+            return Utterance(segment, len(segment) / 16000)
+
+    def close(self):
+        """Release the audio source"""
+        self.source.close() 
\ No newline at end of file
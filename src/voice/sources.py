@@ -0,0 +1,214 @@
+import asyncio
+import time
+import wave
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+from loguru import logger
+
+class RingBuffer:
+    """
+    Single-producer, single-consumer byte ring.
+
+    The capture callback only advances `write_pos` and the reader only
+    advances `read_pos`, so neither side needs a lock. When the reader falls
+    behind, new audio is dropped and counted as an overrun.
+    """
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(capacity, dtype=np.uint8)
+        self.capacity = capacity
+        self.write_pos = 0
+        self.read_pos = 0
+        self.overruns = 0
+
+    def available(self) -> int:
+        return self.write_pos - self.read_pos
+
+    def write(self, data: bytes) -> bool:
+        """Called from the producer thread only"""
+        size = len(data)
+        if size > self.capacity - self.available():
+            self.overruns += 1
+            return False
+        start = self.write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        chunk = np.frombuffer(data, dtype=np.uint8)
+        self._data[start:start + first] = chunk[:first]
+        self._data[:size - first] = chunk[first:]
+        self.write_pos += size
+        return True
+
+    def read(self, size: int) -> bytes:
+        """Called from the consumer only; returns at most `size` bytes"""
+        size = min(size, self.available())
+        start = self.read_pos % self.capacity
+        first = min(size, self.capacity - start)
+        data = self._data[start:start + first].tobytes() + self._data[:size - first].tobytes()
+        self.read_pos += size
+        return data
+
+    def clear(self):
+        """Discard everything written so far (consumer side)"""
+        self.read_pos = self.write_pos
+
+class AudioSource(ABC):
+    """Base class for 16-bit mono PCM sources read from asyncio code"""
+    sample_rate: int = 16000
+
+    def start(self):
+        """Open the underlying stream; safe to call more than once"""
+
+    @abstractmethod
+    async def read(self, frames: int) -> Optional[bytes]:
+        """Next `frames` samples as 16-bit PCM, or None once the source is exhausted"""
+
+    def flush(self):
+        """Drop audio captured before the caller started listening"""
+
+    def add_tap(self, callback: Callable[[bytes], None]) -> Optional[Callable[[], None]]:
+        """
+        Also hand every captured block to `callback`, e.g. for barge-in
+        detection, without taking frames from the reader
+
+        Returns:
+            A function that removes the tap, or None if the source cannot share its frames
+        """
+        return None
+
+    def close(self):
+        """Release the underlying stream"""
+
+class PyAudioSource(AudioSource):
+    """
+    Microphone capture in PyAudio callback mode.
+
+    The stream stays open across turns; PortAudio's thread pushes into a
+    ring buffer and readers wait on an asyncio event instead of blocking.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frames_per_buffer: int = 960, buffer_seconds: float = 10.0):
+        self.sample_rate = sample_rate
+        self.frames_per_buffer = frames_per_buffer
+        self.ring = RingBuffer(int(buffer_seconds * sample_rate) * 2)
+        self.pa = None
+        self.stream = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._data_ready: Optional[asyncio.Event] = None
+        self._taps: List[Callable[[bytes], None]] = []
+
+    def start(self):
+        if self.stream is not None:
+            return
+        import pyaudio
+
+        self._loop = asyncio.get_running_loop()
+        self._data_ready = asyncio.Event()
+        self.pa = pyaudio.PyAudio()
+        self.stream = self.pa.open(
+            rate=self.sample_rate,
+            format=pyaudio.paInt16,
+            channels=1,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback
+        )
+        self.stream.start_stream()
+        logger.info("Microphone stream opened")
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        import pyaudio
+
+        self.ring.write(in_data)
+        self._loop.call_soon_threadsafe(self._data_ready.set)
+        for tap in self._taps:
+            tap(in_data)
+        return None, pyaudio.paContinue
+
+    def add_tap(self, callback: Callable[[bytes], None]) -> Callable[[], None]:
+        """Taps run on PortAudio's thread and must not block"""
+        # Replaced rather than mutated so the callback can iterate without a lock
+        self._taps = self._taps + [callback]
+        return lambda: setattr(self, "_taps", [tap for tap in self._taps if tap is not callback])
+
+    async def read(self, frames: int) -> Optional[bytes]:
+        self.start()
+        size = frames * 2
+        while self.ring.available() < size:
+            self._data_ready.clear()
+            if self.ring.available() >= size:
+                break
+            await self._data_ready.wait()
+        return self.ring.read(size)
+
+    def flush(self):
+        self.ring.clear()
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.stop_stream()
+            self.stream.close()
+            self.stream = None
+        if self.pa is not None:
+            self.pa.terminate()
+            self.pa = None
+        if self.ring.overruns:
+            logger.warning(f"Microphone ring buffer overran {self.ring.overruns} times")
+
+class FileSource(AudioSource):
+    """
+    Replays a WAV file or NumPy array as if it were a microphone.
+
+    Used for headless runs and benchmarks. With `realtime` the reads are
+    paced to wall-clock time; otherwise audio is delivered as fast as it is
+    consumed.
+    """
+
+    def __init__(self, audio: Union[str, Path, np.ndarray], sample_rate: int = 16000, realtime: bool = False):
+        self.sample_rate = sample_rate
+        self.realtime = realtime
+        self.pcm = self._load(audio, sample_rate)
+        self.position = 0
+        self._started_at: Optional[float] = None
+
+    @staticmethod
+    def _load(audio: Union[str, Path, np.ndarray], sample_rate: int) -> bytes:
+        if isinstance(audio, np.ndarray):
+            if audio.dtype != np.int16:
+                audio = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+            return audio.tobytes()
+
+        with wave.open(str(audio), "rb") as wf:
+            if (wf.getframerate(), wf.getnchannels(), wf.getsampwidth()) == (sample_rate, 1, 2):
+                return wf.readframes(wf.getnframes())
+
+        # Anything else goes through faster-whisper's resampling decoder
+        from faster_whisper import decode_audio
+        return FileSource._load(decode_audio(str(audio), sampling_rate=sample_rate), sample_rate)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.position >= len(self.pcm)
+
+    async def read(self, frames: int) -> Optional[bytes]:
+        if self.exhausted:
+            return None
+
+        if self.realtime:
+            if self._started_at is None:
+                self._started_at = time.perf_counter() - self.position / 2 / self.sample_rate
+            due = self._started_at + (self.position / 2 + frames) / self.sample_rate
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        else:
+            await asyncio.sleep(0)  # Let other tasks run between chunks
+
+        chunk = self.pcm[self.position:self.position + frames * 2]
+        self.position += frames * 2
+        # Pad the final chunk so VAD always sees full frames
+        return chunk.ljust(frames * 2, b"\0")
+
+    def rewind(self):
+        self.position = 0
+        self._started_at = None
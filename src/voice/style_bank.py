@@ -0,0 +1,157 @@
+"""
+Precomputed StyleTTS2 styles, built once per voice from a corpus of
+"emotion|sentence" lines:
+
+    python -m src.voice.style_bank benchmarks/samples/style_corpus.txt --voice friday
+"""
+import argparse
+import hashlib
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import torch
+import torch.nn.functional as F
+from loguru import logger
+
+class StyleBank:
+    """
+    Precomputed StyleTTS2 style vectors for one voice.
+
+    Built offline by running the diffusion sampler over a corpus of
+    sentences per emotion. At inference the sentence's pooled PL-BERT
+    embedding is matched against the bank and the style is a softmax-weighted
+    blend of the `k` most similar entries, so the sampler never runs.
+    """
+
+    def __init__(
+        self,
+        keys: torch.Tensor,
+        styles: torch.Tensor,
+        emotions: List[str],
+        voice: str = "default"
+    ):
+        self.keys = F.normalize(keys.float(), dim=-1)
+        self.styles = styles.float()
+        self.emotions = emotions
+        self.voice = voice
+        self.digest = self._digest()
+
+    def _digest(self) -> str:
+        """Content hash, so caches keyed on the bank notice when it is rebuilt"""
+        digest = hashlib.sha1(self.voice.encode())
+        digest.update("\n".join(self.emotions).encode())
+        for tensor in (self.keys, self.styles):
+            digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+        return digest.hexdigest()[:16]
+
+    def __len__(self) -> int:
+        return len(self.emotions)
+
+    @staticmethod
+    def pool(bert_dur: torch.Tensor, text_mask: torch.Tensor) -> torch.Tensor:
+        """Mean PL-BERT embedding over each sentence's real tokens"""
+        valid = (~text_mask).unsqueeze(-1).to(bert_dur.dtype)
+        return (bert_dur * valid).sum(dim=1) / valid.sum(dim=1).clamp(min=1)
+
+    def to(self, device: Union[str, torch.device]) -> "StyleBank":
+        self.keys = self.keys.to(device)
+        self.styles = self.styles.to(device)
+        return self
+
+    def lookup(
+        self,
+        embeddings: torch.Tensor,
+        emotion: Optional[str] = None,
+        k: int = 4,
+        temperature: float = 0.05
+    ) -> torch.Tensor:
+        """
+        Args:
+            embeddings: Pooled sentence embeddings, shape (batch, dim)
+            emotion: Restrict to entries of this emotion if the bank has any
+            k: Number of nearest entries to blend
+            temperature: Softmax temperature over cosine similarity
+
+        Returns:
+            Style vectors of shape (batch, style_dim)
+        """
+        sims = F.normalize(embeddings.float(), dim=-1) @ self.keys.T
+        if emotion is not None and emotion in self.emotions:
+            allowed = torch.tensor([e == emotion for e in self.emotions], device=sims.device)
+            sims = sims.masked_fill(~allowed, float('-inf'))
+
+        top, index = sims.topk(min(k, len(self)), dim=-1)
+        weights = torch.softmax(top / temperature, dim=-1)
+        return (weights.unsqueeze(-1) * self.styles[index]).sum(dim=1)
+
+    @classmethod
+    def build(
+        cls,
+        tts,
+        corpus: Dict[str, List[str]],
+        samples: int = 4,
+        voice: str = "default"
+    ) -> "StyleBank":
+        """
+        Sample styles for every corpus sentence with the full diffusion sampler
+
+        Args:
+            tts: A loaded TTSHandler
+            corpus: Sentences per emotion
+            samples: Sampler runs per sentence (each is its own entry)
+        """
+        keys, styles, emotions = [], [], []
+        for emotion, sentences in corpus.items():
+            for _ in range(samples):
+                embeddings, sampled = tts._sample_styles(sentences)
+                keys.append(embeddings.float().cpu())
+                styles.append(sampled.float().cpu())
+                emotions.extend([emotion] * len(sentences))
+            logger.info(f"Style bank: {len(sentences)} {emotion} sentences x {samples}")
+        return cls(torch.cat(keys), torch.cat(styles), emotions, voice)
+
+    def save(self, path: Union[str, Path]):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        torch.save({
+            "voice": self.voice,
+            "keys": self.keys.cpu(),
+            "styles": self.styles.cpu(),
+            "emotions": self.emotions
+        }, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "StyleBank":
+        data = torch.load(path, map_location='cpu')
+        return cls(data["keys"], data["styles"], data["emotions"], data["voice"])
+
+def load_corpus(path: Union[str, Path]) -> Dict[str, List[str]]:
+    """Sentences per emotion from "emotion|sentence" lines ("#" starts a comment)"""
+    corpus = defaultdict(list)
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.strip() and not line.startswith("#"):
+            emotion, text = line.split("|", 1)
+            corpus[emotion.strip()].append(text.strip())
+    return dict(corpus)
+
+def main():
+    from ..core.config import config
+    from .tts import TTSHandler
+
+    parser = argparse.ArgumentParser(description="Build a style bank with the diffusion sampler")
+    parser.add_argument("corpus", help="File of emotion|sentence lines")
+    parser.add_argument("--output", default=config.tts.style_bank_path)
+    parser.add_argument("--voice", default="default")
+    parser.add_argument("--samples", type=int, default=4, help="Sampler runs per corpus sentence")
+    args = parser.parse_args()
+
+    config.verify_models()
+    # Sample with diffusion even if config.tts.style_mode is "bank"
+    config.tts.style_mode = "diffusion"
+    bank = StyleBank.build(TTSHandler(config), load_corpus(args.corpus), samples=args.samples, voice=args.voice)
+    bank.save(args.output)
+    logger.info(f"Saved {len(bank)} styles to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 import os
+import asyncio
+import time
 import yaml
 import torch
-import soundfile as sf
+import torch.nn as nn
+import numpy as np
 from pathlib import Path
 from munch import Munch
-from typing import Optional
-from nltk.tokenize import word_tokenize
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from loguru import logger
 import sys
 
 # Add the project root to Python path
@@ -26,11 +29,26 @@ from models.StyleTTS2.text_utils import TextCleaner
 from models.StyleTTS2.testen import CustomEspeakBackend
 from models.StyleTTS2.utils import recursive_munch
 
+from ..core.cancellation import CancellationToken, OperationCancelled
+from ..core.parallel_processor import processor
+from .alignment import expand_by_duration
+from .audio import SpeechAudio, float_to_int16
+from .checkpoint import ASSIGN_SUPPORTED, converted_path, fingerprint, load_converted
+from .cache import TTSCache
+from .cpu_profile import apply_cpu_profile, cpu_autocast, warm_up
+from .phonemes import PhonemeCache
+from .quality import DiffusionStepPolicy
+from .style_bank import StyleBank
+
+SAMPLE_RATE = 24000
+
 class TTSHandler:
     def __init__(self, config):
         self.config = config
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         self.s_prev = None  # Store previous style vector
+        self.active_requests = 0
+        self.last_request_at = time.monotonic()
         
         # Load StyleTTS2 config
         styletts_config_path = os.path.join(config.models.STYLETTS2_PATH, "config.yml")
@@ -39,8 +57,34 @@ class TTSHandler:
         # Initialize models
         self._initialize_models()
         
+        self.step_policy = DiffusionStepPolicy(config.tts)
+        self.style_bank = self._load_style_bank()
         self.textcleaner = TextCleaner()
         self.phonemizer = CustomEspeakBackend(language='en-us')
+        self.phoneme_cache = PhonemeCache(
+            self.phonemizer,
+            self.textcleaner,
+            max_entries=config.tts.phoneme_cache_size,
+            persist_path=config.tts.phoneme_cache_path
+        )
+        
+        self.audio_cache = TTSCache(
+            max_bytes=config.tts.audio_cache_bytes,
+            disk_path=config.tts.audio_cache_dir,
+            ttl=config.tts.audio_cache_ttl,
+            disk_bytes=config.tts.audio_cache_disk_bytes
+        ) if config.tts.audio_cache else None
+        
+        # Synthesis runs here so playback can proceed on the event loop
+        self.executor = processor.executor("tts", workers=1)
+        
+        # float16 autocast is slow or unsupported on CPU; use bf16/fp32 there
+        self.cpu_dtype = None
+        if self.device == 'cpu' and config.tts.cpu_profile:
+            self.cpu_dtype = apply_cpu_profile(self)
+            if config.tts.cpu_warmup:
+                # On the synthesis thread, whose OpenMP team is the one replies use
+                self.executor.submit(warm_up, self).result()
         
     def _initialize_models(self):
         """Initialize all required StyleTTS2 models"""
@@ -60,8 +104,47 @@ class TTSHandler:
             self.plbert
         )
         
-        # Load weights
-        weights_path = os.path.join(self.config.models.STYLETTS2_PATH, "epoch_2nd_00100.pth")
+        # Load weights, preferring the pre-converted safetensors file
+        self.weights_path = os.path.join(self.config.models.STYLETTS2_PATH, "epoch_2nd_00100.pth")
+        converted = converted_path(self.weights_path)
+        if not (self.config.tts.converted_weights and converted.exists() and self._load_converted(converted)):
+            logger.info(
+                f"Loading {self.weights_path}; run `python -m src.voice.checkpoint "
+                f"{self.weights_path}` once for faster startup"
+            )
+            self._load_checkpoint(self.weights_path)
+        
+        # Move models to device and set to eval mode
+        _ = [self.model[key].eval() for key in self.model]
+        _ = [self.model[key].to(self.device) for key in self.model]
+        
+        # Initialize sampler
+        self.sampler = DiffusionSampler(
+            self.model.diffusion.diffusion,
+            sampler=ADPM2Sampler(),
+            sigma_schedule=KarrasSchedule(
+                sigma_min=0.0001, 
+                sigma_max=3.0, 
+                rho=9.0
+            ),
+            clamp=False
+        )
+
+    def _load_style_bank(self) -> Optional[StyleBank]:
+        """Bank of precomputed styles, when tts.style_mode is "bank" and one exists"""
+        tts = self.config.tts
+        if tts.style_mode != "bank":
+            return None
+        if not tts.style_bank_path or not os.path.exists(tts.style_bank_path):
+            logger.warning(f"Style bank {tts.style_bank_path} not found, sampling styles instead")
+            return None
+        bank = StyleBank.load(tts.style_bank_path).to(self.device)
+        logger.info(f"Loaded style bank for voice '{bank.voice}' with {len(bank)} entries")
+        return bank
+
+    def _load_checkpoint(self, weights_path: str):
+        """Load the original training checkpoint"""
+        self.weights_hash = fingerprint(weights_path)
         params_whole = torch.load(weights_path, map_location='cpu')
         params = params_whole['net']
         
@@ -77,139 +160,503 @@ class TTSHandler:
                         name = k[7:]  # remove `module.`
                         new_state_dict[name] = v
                     self.model[key].load_state_dict(new_state_dict, strict=False)
+
+    def _load_converted(self, path: Path) -> bool:
+        """
+        Memory-map converted weights straight onto the model device
+
+        Returns:
+            False, leaving the model untouched, when the file is stale or
+            incomplete and the original checkpoint should be loaded instead
+        """
+        state_dicts, metadata = load_converted(path, self.device)
+        source = metadata.get("source_fingerprint")
+        if os.path.exists(self.weights_path) and source != fingerprint(self.weights_path):
+            logger.warning(f"{path} was converted from a different checkpoint; loading {self.weights_path}")
+            return False
+
+        for key in self.model:
+            if key in state_dicts:
+                missing = set(self.model[key].state_dict()) - set(state_dicts[key])
+                if missing:
+                    logger.warning(
+                        f"{path} is missing {len(missing)} {key} weights; loading {self.weights_path}"
+                    )
+                    return False
+
+        # Same cache keys as the checkpoint the file was converted from
+        self.weights_hash = source or fingerprint(str(path))
+        # Stored in the model's own dtype: adopt the mapped tensors instead of copying
+        options = {"assign": True} if ASSIGN_SUPPORTED and metadata.get("dtype") in ("original", "float32") else {}
+        for key in self.model:
+            if key in state_dicts:
+                result = self.model[key].load_state_dict(state_dicts[key], strict=False, **options)
+                if result.unexpected_keys:
+                    logger.debug(f"{key}: {len(result.unexpected_keys)} unexpected weights")
+        logger.info(f"Loaded converted StyleTTS2 weights from {path}")
+        return True
+
+    @property
+    def idle_seconds(self) -> float:
+        """Time since the last speech request finished, 0 while one is running"""
+        if self.active_requests:
+            return 0.0
+        return time.monotonic() - self.last_request_at
+
+    def _request_done(self):
+        self.active_requests -= 1
+        self.last_request_at = time.monotonic()
+
+    @staticmethod
+    def split_sentences(text: str) -> List[str]:
+        """Split reply text into sentences for per-sentence synthesis"""
+        return [s.strip() + '.' for s in text.split('.') if s.strip()]
+
+    def _cache_params(self) -> Dict:
+        """Everything besides the text that changes the synthesized audio"""
+        tts = self.config.tts
+        return {
+            "weights": self.weights_hash,
+            "sample_rate": SAMPLE_RATE,
+            "alpha": tts.alpha,
+            "diffusion_steps": self.step_policy.cache_tag,
+            "embedding_scale": tts.embedding_scale,
+            "style": (
+                f"bank:{self.style_bank.digest}:{tts.style_emotion}"
+                if self.style_bank is not None else "diffusion"
+            )
+        }
+
+    async def get_cached(self, sentences: List[str]) -> List[Optional[np.ndarray]]:
+        """Padded sentence audio from the cache, None for sentences to synthesize"""
+        if self.audio_cache is None:
+            return [None] * len(sentences)
+        return await self.audio_cache.get_many(sentences, self._cache_params())
+
+    async def store_cached(self, sentences: List[str], wavs: List[np.ndarray]):
+        """Add padded sentence audio to the cache"""
+        if self.audio_cache is not None:
+            await self.audio_cache.put_many(sentences, wavs, self._cache_params(), SAMPLE_RATE)
+
+    async def stream_speech(
+        self,
+        text: str,
+        cancel: Optional[CancellationToken] = None
+    ) -> AsyncIterator[np.ndarray]:
+        """
+        Synthesize speech sentence by sentence
         
-        # Move models to device and set to eval mode
-        _ = [self.model[key].eval() for key in self.model]
-        _ = [self.model[key].to(self.device) for key in self.model]
+        Yields float32 PCM at SAMPLE_RATE per sentence, with inter-sentence
+        padding already applied and the fade-out applied to the last one.
+        Cached sentences are yielded without touching the model. Of the rest,
+        the first is synthesized on its own so time to first audio only
+        depends on it; the others follow in batches, each synthesized while
+        the caller is still consuming the previous one.
         
-        # Initialize sampler
-        self.sampler = DiffusionSampler(
-            self.model.diffusion.diffusion,
-            sampler=ADPM2Sampler(),
-            sigma_schedule=KarrasSchedule(
-                sigma_min=0.0001, 
-                sigma_max=3.0, 
-                rho=9.0
-            ),
-            clamp=False
-        )
+        On cancellation no further sentences are started and the running
+        batch stops at its next model stage.
+        """
+        sentences = self.split_sentences(text)
+        if not sentences:
+            return
+        
+        self.active_requests += 1
+        try:
+            async for wav in self._stream_sentences(sentences, cancel):
+                yield wav
+        finally:
+            self._request_done()
 
-    @torch.inference_mode()
-    async def generate_speech(self, text: str) -> str:
-        """Generate speech from text using StyleTTS2"""
-        BATCH_SIZE = 4  # Process 4 sentences at a time
-        
-        # Split text into sentences
-        sentences = [s.strip() + '.' for s in text.split('.') if s.strip()]
-        wavs = []
-        
-        # Process sentences in batches
-        for i in range(0, len(sentences), BATCH_SIZE):
-            batch = sentences[i:i + BATCH_SIZE]
-            batch_wavs = []
-            
-            with torch.amp.autocast(self.device, dtype=torch.float16):
-                noise = torch.randn(
-                    len(batch), 1, 256,
-                    device=self.device,
-                    dtype=torch.float16
-                )
+    async def _stream_sentences(
+        self,
+        sentences: List[str],
+        cancel: Optional[CancellationToken]
+    ) -> AsyncIterator[np.ndarray]:
+        wavs = await self.get_cached(sentences)
+        missing = [i for i, wav in enumerate(wavs) if wav is None]
+        batch_size = max(1, self.config.tts.batch_size)
+        groups = iter([missing[:1]] + [
+            missing[i:i + batch_size] for i in range(1, len(missing), batch_size)
+        ] if missing else [])
+        
+        loop = asyncio.get_running_loop()
+        def submit(budget: float):
+            group = next(groups, None)
+            if group is None or (cancel and cancel.is_cancelled()):
+                return None
+            texts = [sentences[i] for i in group]
+            steps = self.step_policy.choose(texts, budget)
+            return group, loop.run_in_executor(
+                self.executor, self._synthesize, texts, True, steps, cancel
+            )
+        
+        pending = submit(self.config.tts.first_sentence_budget)
+        try:
+            for i in range(len(sentences)):
+                if cancel and cancel.is_cancelled():
+                    return
+                if wavs[i] is None:
+                    group, future = pending
+                    try:
+                        synthesized = await future
+                    except OperationCancelled:
+                        return
+                    for j, wav in zip(group, synthesized):
+                        wavs[j] = wav
+                    # Start on the next group before handing this one out; it
+                    # has until the audio ready up to its first sentence has played
+                    ready = next((j for j in range(i, len(sentences)) if wavs[j] is None), len(sentences))
+                    queued = sum(len(wavs[j]) for j in range(i, ready)) / SAMPLE_RATE
+                    pending = submit(queued * self.config.tts.playback_budget_ratio)
+                    await self.store_cached([sentences[j] for j in group], [wavs[j] for j in group])
                 
-                for j, (text, noise_j) in enumerate(zip(batch, noise)):
-                    wav, self.s_prev = self._inference(
-                        text,
-                        self.s_prev,
-                        noise_j.unsqueeze(0),
-                        alpha=0.7,
-                        diffusion_steps=5,
-                        embedding_scale=1.2
+                wav = wavs[i]
+                if i == len(sentences) - 1:
+                    wav = self._finish_reply(wav)
+                yield wav
+        finally:
+            if cancel and cancel.is_cancelled():
+                self._acknowledge_when_done(pending, cancel)
+
+    def _acknowledge_when_done(self, pending, cancel: CancellationToken):
+        """Report the TTS stage stopped once no batch is running any more"""
+        future = pending[1] if pending else None
+        if future is None or future.done():
+            cancel.acknowledge("tts")
+            return
+        def done(f):
+            if not f.cancelled():
+                f.exception()  # Retrieve OperationCancelled so it is not logged as unhandled
+            cancel.acknowledge("tts")
+        future.add_done_callback(done)
+
+    async def generate_speech(
+        self,
+        text: str,
+        output_path: Optional[Union[str, Path]] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> Optional[SpeechAudio]:
+        """
+        Generate speech from text using StyleTTS2
+        
+        Args:
+            text: Reply text
+            output_path: Also write the audio there as WAV
+            cancel: Abandons synthesis at the next model stage
+        
+        Returns:
+            The whole reply as int16 PCM, or None for empty text or when cancelled
+        """
+        sentences = self.split_sentences(text)
+        if not sentences:
+            return None
+        
+        self.active_requests += 1
+        try:
+            wavs = await self.get_cached(sentences)
+            missing = [i for i, wav in enumerate(wavs) if wav is None]
+            if missing:
+                # All uncached sentences at once, bucketed into real batches
+                loop = asyncio.get_running_loop()
+                texts = [sentences[i] for i in missing]
+                try:
+                    synthesized = await loop.run_in_executor(
+                        self.executor, self._synthesize, texts, True,
+                        self.step_policy.choose(texts), cancel
                     )
-                    # Add small padding between sentences
-                    padding = torch.zeros(int(24000 * 0.05))
-                    wav = torch.cat([wav, padding])
-                    batch_wavs.append(wav)
-            
-            wavs.extend(batch_wavs)
+                except OperationCancelled:
+                    cancel.acknowledge("tts")
+                    return None
+                for i, wav in zip(missing, synthesized):
+                    wavs[i] = wav
+                await self.store_cached([sentences[i] for i in missing], synthesized)
+        finally:
+            self._request_done()
         
-        combined_wav = torch.cat(wavs)
+        audio = self._assemble(wavs)
+        if output_path is not None:
+            audio.to_wav(output_path)
+        return audio
+
+    @classmethod
+    def _assemble(cls, wavs: List[np.ndarray]) -> SpeechAudio:
+        """
+        Copy padded sentences into one preallocated int16 buffer, ending
+        like a streamed reply (see _finish_reply)
+        """
+        wavs = wavs[:-1] + [cls._finish_reply(wavs[-1])]
+        samples = np.empty(sum(len(wav) for wav in wavs), dtype=np.int16)
         
-        # Add fade out
-        fade_length = int(24000 * 0.3)  # 300ms fade
-        fade_out = torch.linspace(1.0, 0.0, fade_length)
-        combined_wav[-fade_length:] *= fade_out
+        position = 0
+        for wav in wavs:
+            float_to_int16(wav, samples[position:position + len(wav)])
+            position += len(wav)
         
-        # Add final padding
-        final_padding = torch.zeros(int(24000 * 0.1))
-        combined_wav = torch.cat([combined_wav, final_padding])
+        return SpeechAudio(samples, SAMPLE_RATE)
+
+    def _synthesize(
+        self,
+        sentences: List[str],
+        continue_style: bool = True,
+        diffusion_steps: Optional[int] = None,
+        cancel: Optional[CancellationToken] = None
+    ) -> List[np.ndarray]:
+        """
+        Blocking batched synthesis of sentences
         
-        # Save to temporary file
-        output_path = Path("temp_speech.wav")
-        sf.write(output_path, combined_wav.cpu().numpy(), 24000)
+        With continue_style the first sentence blends with the previous
+        reply's style and the last one's style is kept for the next call;
+        without it (stock phrases) the conversation's style is left alone.
+        The measured real-time factor is reported to the step policy.
+        Raises OperationCancelled if `cancel` is set between model stages.
+        """
+        tts = self.config.tts
+        steps = diffusion_steps or tts.diffusion_steps
+        started = time.perf_counter()
+        with torch.inference_mode(), self._autocast():
+            wavs, s_last = self._inference_batch(
+                sentences,
+                self.s_prev if continue_style else None,
+                alpha=tts.alpha,
+                diffusion_steps=steps,
+                embedding_scale=tts.embedding_scale,
+                cancel=cancel
+            )
+        audio_seconds = sum(len(wav) for wav in wavs) / SAMPLE_RATE
+        self.step_policy.record(steps, sentences, time.perf_counter() - started, audio_seconds)
+        if continue_style:
+            self.s_prev = s_last
         
-        return str(output_path)
+        # Add small padding between sentences
+        padding = np.zeros(int(SAMPLE_RATE * 0.05), dtype=np.float32)
+        return [np.concatenate([wav.astype(np.float32), padding]) for wav in wavs]
+
+    def _autocast(self):
+        """Mixed precision context for inference on this device"""
+        if self.cpu_dtype is not None:
+            return cpu_autocast(self.cpu_dtype)
+        return torch.amp.autocast(self.device, dtype=torch.float16)
 
-    def _inference(
+    @staticmethod
+    def _finish_reply(wav: np.ndarray) -> np.ndarray:
+        """Fade out the last sentence and add the final padding"""
+        fade_length = min(int(SAMPLE_RATE * 0.3), len(wav))  # 300ms fade
+        wav = wav.copy()
+        wav[-fade_length:] *= np.linspace(1.0, 0.0, fade_length, dtype=np.float32)
+        
+        final_padding = np.zeros(int(SAMPLE_RATE * 0.1), dtype=np.float32)
+        return np.concatenate([wav, final_padding])
+
+    def _tokenize(self, texts: List[str]) -> List[torch.LongTensor]:
+        """Phonemize texts into StyleTTS2 token IDs through the phoneme cache"""
+        return [torch.from_numpy(ids) for ids in self.phoneme_cache.get_many(texts)]
+
+    def _buckets(self, lengths: List[int]) -> List[List[int]]:
+        """Group sentence indices of similar token length to limit padding"""
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        size = max(1, self.config.tts.batch_size)
+        return [order[i:i + size] for i in range(0, len(order), size)]
+
+    def _inference_batch(
         self,
-        text: str,
+        texts: List[str],
         s_prev: Optional[torch.Tensor],
-        noise: torch.Tensor,
         alpha: float = 0.7,
         diffusion_steps: int = 5,
-        embedding_scale: float = 1.0
-    ):
-        """Internal inference method"""
-        text = text.strip()
-        text = text.replace('"', '')
-        ps = self.phonemizer.phonemize([text])
-        ps = word_tokenize(ps[0])
-        ps = ' '.join(ps)
-
-        tokens = self.textcleaner(ps)
-        tokens.insert(0, 0)
-        tokens = torch.LongTensor(tokens).to(self.device).unsqueeze(0)
+        embedding_scale: float = 1.0,
+        cancel: Optional[CancellationToken] = None
+    ) -> Tuple[List[np.ndarray], Optional[torch.Tensor]]:
+        """
+        Batched inference over several sentences
+        
+        Sentences are bucketed by length. The token-level stages (text
+        encoders, style, durations, shared prosody LSTM) run once per bucket
+        on padded, masked inputs. The F0/N blocks and the decoder normalise
+        over time, so padding would change their output; they run on each
+        sentence's own frames, batched only where frame counts match (see
+        _render). The style blend with s_prev is sequential, in original
+        sentence order, as in sentence-by-sentence synthesis.
+        
+        Returns:
+            Waveforms in input order and the style vector of the last sentence
+        """
+        tokens = self._tokenize(texts)
+        buckets = self._buckets([len(t) for t in tokens])
         
         with torch.no_grad():
-            input_lengths = torch.LongTensor([tokens.shape[-1]]).to(tokens.device)
-            text_mask = self.length_to_mask(input_lengths).to(tokens.device)
-
-            t_en = self.model.text_encoder(tokens, input_lengths, text_mask)
-            bert_dur = self.model.bert(tokens, attention_mask=(~text_mask).int())
-            d_en = self.model.bert_encoder(bert_dur).transpose(-1, -2) 
-
-            s_pred = self.sampler(noise, 
-                  embedding=bert_dur[0].unsqueeze(0), 
-                  num_steps=diffusion_steps,
-                  embedding_scale=embedding_scale).squeeze(0)
-            
-            if s_prev is not None:
-                # convex combination of previous and current style
-                s_pred = alpha * s_prev + (1 - alpha) * s_pred
-            
-            s = s_pred[:, 128:]
-            ref = s_pred[:, :128]
-
-            d = self.model.predictor.text_encoder(d_en, s, input_lengths, text_mask)
-
-            x, _ = self.model.predictor.lstm(d)
-            duration = self.model.predictor.duration_proj(x)
-            duration = torch.sigmoid(duration).sum(axis=-1)
-            pred_dur = torch.round(duration.squeeze()).clamp(min=1)
-
-            pred_aln_trg = torch.zeros(input_lengths, int(pred_dur.sum().data))
-            c_frame = 0
-            for i in range(pred_aln_trg.size(0)):
-                pred_aln_trg[i, c_frame:c_frame + int(pred_dur[i].data)] = 1
-                c_frame += int(pred_dur[i].data)
-
-            # encode prosody
-            en = (d.transpose(-1, -2) @ pred_aln_trg.unsqueeze(0).to(self.device))
-            F0_pred, N_pred = self.model.predictor.F0Ntrain(en, s)
-            out = self.model.decoder(
-                (t_en @ pred_aln_trg.unsqueeze(0).to(self.device)), 
-                F0_pred, N_pred, ref.squeeze().unsqueeze(0)
+            # Stage 1: text encoders and style per bucket (sampled or from the bank)
+            encoded = {}
+            s_raw = [None] * len(texts)
+            for bucket in buckets:
+                if cancel:
+                    cancel.raise_if_cancelled()
+                t_en, d_en, bert_dur, input_lengths, text_mask = self._encode([tokens[i] for i in bucket])
+
+                if self.style_bank is not None:
+                    s_pred = self._bank_style(bert_dur, text_mask)
+                else:
+                    s_pred = self._diffusion_style(bert_dur, diffusion_steps, embedding_scale)
+                for j, i in enumerate(bucket):
+                    s_raw[i] = s_pred[j:j + 1]
+                encoded[tuple(bucket)] = (t_en, d_en, input_lengths, text_mask)
+
+            # Stage 2: convex combination with the previous style, in sentence order
+            styles = []
+            for s_pred in s_raw:
+                if s_prev is not None:
+                    s_pred = alpha * s_prev + (1 - alpha) * s_pred
+                styles.append(s_pred)
+                s_prev = s_pred
+
+            # Stage 3: alignment per bucket, then prosody and decoding per frame length
+            wavs = [None] * len(texts)
+            for bucket in buckets:
+                if cancel:
+                    cancel.raise_if_cancelled()
+                t_en, d_en, input_lengths, text_mask = encoded[tuple(bucket)]
+                s_pred = torch.cat([styles[i] for i in bucket])
+                asr, x, frame_counts = self._align(t_en, d_en, input_lengths, text_mask, s_pred[:, 128:])
+                if cancel:
+                    cancel.raise_if_cancelled()  # Before the most expensive stage
+                for i, wav in zip(bucket, self._render(asr, x, frame_counts, s_pred)):
+                    wavs[i] = wav
+
+        return wavs, s_prev
+
+    def _align(
+        self,
+        t_en: torch.Tensor,
+        d_en: torch.Tensor,
+        input_lengths: torch.Tensor,
+        text_mask: torch.Tensor,
+        s: torch.Tensor
+    ) -> Tuple[torch.Tensor, torch.Tensor, List[int]]:
+        """
+        Predict durations and expand a padded bucket to frames
+        
+        Returns:
+            Aligned text encodings (B, C, frames), the prosody predictor's
+            shared LSTM output (B, frames, C) and each sentence's frame count
+        """
+        predictor = self.model.predictor
+        d = predictor.text_encoder(d_en, s, input_lengths, text_mask)
+
+        x = self._packed_lstm(predictor.lstm, d, input_lengths)
+        duration = predictor.duration_proj(x)
+        duration = torch.sigmoid(duration).sum(axis=-1)
+        pred_dur = torch.round(duration).clamp(min=1).masked_fill(text_mask, 0)
+
+        frame_lengths = pred_dur.sum(axis=-1).long()
+        # Single host sync for all lengths in the bucket
+        frame_counts = frame_lengths.tolist()
+        n_frames = max(frame_counts)
+
+        # Gather-based expansion instead of a dense alignment matmul
+        en = expand_by_duration(d.transpose(-1, -2), pred_dur, n_frames)
+        x = self._packed_lstm(predictor.shared, en.transpose(-1, -2), frame_lengths)
+        return expand_by_duration(t_en, pred_dur, n_frames), x, frame_counts
+
+    def _render(
+        self,
+        asr: torch.Tensor,
+        x: torch.Tensor,
+        frame_counts: List[int],
+        s_pred: torch.Tensor
+    ) -> List[np.ndarray]:
+        """
+        F0/N prediction and decoding on each sentence's own frames
+        
+        Their instance norms take statistics over the whole time axis, so
+        sentences are trimmed to their frame count first and only batched
+        with others of exactly the same length.
+        """
+        groups: Dict[int, List[int]] = {}
+        for b, n in enumerate(frame_counts):
+            groups.setdefault(n, []).append(b)
+
+        wavs = [None] * len(frame_counts)
+        for n, items in groups.items():
+            index = torch.tensor(items, device=asr.device)
+            s = s_pred[index]
+            F0_pred, N_pred = self._f0n(x[index, :n], s[:, 128:])
+            out = self.model.decoder(asr[index, :, :n], F0_pred, N_pred, s[:, :128])
+            for j, b in enumerate(items):
+                wavs[b] = out[j].squeeze().float().cpu().numpy()
+        return wavs
+
+    def _encode(self, tokens: List[torch.LongTensor]):
+        """Text and PL-BERT encodings of a padded bucket, with its lengths and mask"""
+        batch, input_lengths, text_mask = self._pad_tokens(tokens)
+        t_en = self.model.text_encoder(batch, input_lengths, text_mask)
+        bert_dur = self.model.bert(batch, attention_mask=(~text_mask).int())
+        d_en = self.model.bert_encoder(bert_dur).transpose(-1, -2)
+        return t_en, d_en, bert_dur, input_lengths, text_mask
+
+    def _pad_tokens(self, tokens: List[torch.LongTensor]):
+        """Padded batch, lengths and padding mask on the model device"""
+        batch = nn.utils.rnn.pad_sequence(tokens, batch_first=True).to(self.device)
+        input_lengths = torch.LongTensor([len(t) for t in tokens]).to(self.device)
+        text_mask = self.length_to_mask(input_lengths).to(self.device)
+        return batch, input_lengths, text_mask
+
+    def _diffusion_style(self, bert_dur: torch.Tensor, diffusion_steps: int, embedding_scale: float) -> torch.Tensor:
+        noise = torch.randn(bert_dur.shape[0], 1, 256, device=self.device, dtype=bert_dur.dtype)
+        return self.sampler(noise,
+              embedding=bert_dur,
+              num_steps=diffusion_steps,
+              embedding_scale=embedding_scale).squeeze(1)
+
+    def _bank_style(self, bert_dur: torch.Tensor, text_mask: torch.Tensor) -> torch.Tensor:
+        tts = self.config.tts
+        s_pred = self.style_bank.lookup(
+            StyleBank.pool(bert_dur, text_mask),
+            emotion=tts.style_emotion,
+            k=tts.style_bank_k,
+            temperature=tts.style_bank_temperature
+        )
+        return s_pred.to(bert_dur.dtype)
+
+    def _sample_styles(
+        self,
+        texts: List[str],
+        diffusion_steps: Optional[int] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Pooled PL-BERT embeddings and diffusion-sampled styles, ignoring the
+        bank; used to build and evaluate style banks
+        """
+        tts = self.config.tts
+        with torch.inference_mode():
+            batch, _, text_mask = self._pad_tokens(self._tokenize(texts))
+            bert_dur = self.model.bert(batch, attention_mask=(~text_mask).int())
+            styles = self._diffusion_style(
+                bert_dur, diffusion_steps or self.step_policy.max_steps, tts.embedding_scale
             )
-            
-        return out.squeeze().cpu().numpy(), s_pred
+        return StyleBank.pool(bert_dur, text_mask), styles
+
+    @staticmethod
+    def _packed_lstm(lstm: nn.LSTM, x: torch.Tensor, lengths: torch.Tensor) -> torch.Tensor:
+        """Run a batch-first LSTM so padding never leaks into the backward direction"""
+        packed = nn.utils.rnn.pack_padded_sequence(
+            x, lengths.cpu(), batch_first=True, enforce_sorted=False
+        )
+        out, _ = lstm(packed)
+        out, _ = nn.utils.rnn.pad_packed_sequence(out, batch_first=True, total_length=x.shape[1])
+        return out
+
+    def _f0n(self, x: torch.Tensor, s: torch.Tensor):
+        """The F0/N half of ProsodyPredictor.F0Ntrain, after the shared LSTM"""
+        predictor = self.model.predictor
+        F0 = x.transpose(-1, -2)
+        for block in predictor.F0:
+            F0 = block(F0, s)
+        F0 = predictor.F0_proj(F0)
+
+        N = x.transpose(-1, -2)
+        for block in predictor.N:
+            N = block(N, s)
+        N = predictor.N_proj(N)
+        return F0.squeeze(1), N.squeeze(1)
 
     def length_to_mask(self, lengths):
         """Convert lengths to mask"""
@@ -219,6 +666,14 @@ class TTSHandler:
 
     async def close(self):
         """Cleanup resources"""
+        self.phoneme_cache.save()
+        logger.info(f"Phoneme cache: {self.phoneme_cache.get_summary()}")
+        if self.audio_cache is not None:
+            await self.audio_cache.close()
+            logger.info(f"Audio cache: {self.audio_cache.get_summary()}")
+        logger.info(f"Diffusion steps: {self.step_policy.get_summary()}")
+        logger.info(f"Executor pools: {processor.get_summary()}")
+        
         # Clear CUDA cache
         if torch.cuda.is_available():
             torch.cuda.empty_cache() 
@@ -0,0 +1,124 @@
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+import webrtcvad
+from loguru import logger
+
+from ..core.config import VADConfig
+
+class VADGate:
+    """
+    Cheap speech gate in front of Whisper for always-on listening.
+
+    Frame energies are computed for a whole chunk at once and only frames
+    clearly above the adaptive noise floor are passed to WebRTC VAD. Speech
+    runs shorter than `min_speech_ms` are dropped, and emitted segments are
+    trimmed to the speech plus `padding_ms` on each side.
+    """
+
+    def __init__(self, vad_config: VADConfig, sample_rate: int = 16000):
+        self.config = vad_config
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * vad_config.frame_ms // 1000
+        self.vad = webrtcvad.Vad(vad_config.webrtc_mode)
+
+        self.padding_frames = vad_config.padding_ms // vad_config.frame_ms
+        self.hangover_frames = vad_config.hangover_ms // vad_config.frame_ms
+        self.min_speech_frames = vad_config.min_speech_ms // vad_config.frame_ms
+        self.max_frames = int(vad_config.max_segment_seconds * 1000) // vad_config.frame_ms
+
+        self.noise_floor_db = vad_config.noise_floor_db
+        self.reset()
+
+    def reset(self):
+        """Forget any partial segment (the noise floor is kept)"""
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._preroll = deque(maxlen=self.padding_frames)
+        self._segment: List[np.ndarray] = []
+        self._speech_frames = 0
+        self._trailing_silence = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._segment)
+
+    @property
+    def trailing_silence_ms(self) -> int:
+        """Silence since the last speech frame of the current segment"""
+        return self._trailing_silence * self.config.frame_ms
+
+    def _frames(self, chunk: bytes) -> np.ndarray:
+        samples = np.concatenate([self._remainder, np.frombuffer(chunk, dtype=np.int16)])
+        n_frames = len(samples) // self.frame_len
+        self._remainder = samples[n_frames * self.frame_len:]
+        return samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+
+    def _energy_db(self, frames: np.ndarray) -> np.ndarray:
+        power = np.mean(np.square(frames, dtype=np.float32), axis=-1) / (32768.0 ** 2)
+        return 10.0 * np.log10(power + 1e-10)
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Speech flag per frame, adapting the noise floor on the rest"""
+        energy = self._energy_db(frames)
+        speech = energy > self.noise_floor_db + self.config.energy_margin_db
+
+        # WebRTC VAD only runs on frames the energy gate let through
+        for i in np.flatnonzero(speech):
+            speech[i] = self.vad.is_speech(frames[i].tobytes(), self.sample_rate)
+
+        quiet = energy[~speech]
+        if len(quiet):
+            rate = self.config.noise_adapt_rate
+            # Closed form of applying the EMA once per quiet frame
+            decay = (1.0 - rate) ** len(quiet)
+            self.noise_floor_db = decay * self.noise_floor_db + (1.0 - decay) * float(np.mean(quiet))
+        return speech
+
+    def process(self, chunk: bytes) -> Optional[np.ndarray]:
+        """
+        Feed a chunk of 16-bit PCM
+
+        Returns:
+            A trimmed float32 speech segment when one has just ended, else None
+        """
+        frames = self._frames(chunk)
+        if not len(frames):
+            return None
+
+        finished = None
+        for frame, is_speech in zip(frames, self.classify(frames)):
+            if not self._segment:
+                if is_speech:
+                    self._segment = list(self._preroll) + [frame]
+                    self._speech_frames = 1
+                    self._trailing_silence = 0
+                else:
+                    self._preroll.append(frame)
+                continue
+
+            self._segment.append(frame)
+            if is_speech:
+                self._speech_frames += 1
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += 1
+
+            if self._trailing_silence >= self.hangover_frames or len(self._segment) >= self.max_frames:
+                finished = self._finish()
+        return finished
+
+    def _finish(self) -> Optional[np.ndarray]:
+        segment, speech_frames, trailing = self._segment, self._speech_frames, self._trailing_silence
+        self._segment = []
+        self._preroll.clear()
+        self._speech_frames = 0
+        self._trailing_silence = 0
+
+        if speech_frames < self.min_speech_frames:
+            logger.debug(f"Dropped {speech_frames * self.config.frame_ms}ms noise burst")
+            return None
+
+        # Keep only `padding_ms` of the trailing silence
+        keep = len(segment) - max(0, trailing - self.padding_frames)
+        return np.concatenate(segment[:keep]).astype(np.float32) / 32768.0
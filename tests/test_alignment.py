@@ -0,0 +1,26 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.voice.alignment import expand_by_duration
+
+def dense_expand(x: torch.Tensor, durations: torch.Tensor, n_frames: int) -> torch.Tensor:
+    """The original StyleTTS2 expansion: x @ a 0/1 phoneme-to-frame alignment"""
+    alignment = torch.zeros(x.shape[0], x.shape[-1], n_frames)
+    for b in range(x.shape[0]):
+        frame = 0
+        for i, duration in enumerate(durations[b].tolist()):
+            alignment[b, i, frame:frame + duration] = 1
+            frame += duration
+    return x @ alignment
+
+def test_matches_dense_alignment_with_padding():
+    torch.manual_seed(0)
+    x = torch.randn(2, 3, 5)
+    durations = torch.tensor([[2, 1, 3, 0, 1], [1, 4, 0, 0, 0]])
+
+    expanded = expand_by_duration(x, durations, 9)
+
+    assert torch.allclose(expanded, dense_expand(x, durations, 9))
+    # Frames past each item's own duration are zero
+    assert expanded[1, :, 5:].abs().sum() == 0
@@ -0,0 +1,19 @@
+import numpy as np
+
+from src.voice.audio import PCMBuffer
+
+def test_pcm_buffer_converts_and_grows():
+    buffer = PCMBuffer(seconds=0.001, sample_rate=1000)  # Room for one sample
+    buffer.append(np.array([16384, -32768], dtype=np.int16).tobytes())
+    buffer.append(np.array([0, 32767], dtype=np.int16).tobytes())
+
+    assert len(buffer) == 4
+    assert buffer.duration == 0.004
+    assert np.allclose(buffer.view(), [0.5, -1.0, 0.0, 32767 / 32768])
+    assert np.allclose(buffer.view(1, 3), [-1.0, 0.0])
+
+    data = buffer.view().base
+    buffer.clear()
+    buffer.append(np.array([8192], dtype=np.int16).tobytes())
+    assert np.allclose(buffer.view(), [0.25])
+    assert buffer.view().base is data  # The allocation is reused
@@ -0,0 +1,57 @@
+import pytest
+
+# src.core.config builds its defaults with torch
+pytest.importorskip("torch")
+
+from src.core.config import FridayConfig
+from src.core.cpu_plan import Topology, _split, apply_core_plan, plan_cores
+
+def smt_topology(cores: int) -> Topology:
+    """`cores` physical cores with two hyperthreads each (cpu n and n + cores)"""
+    return Topology([[core, core + cores] for core in range(cores)])
+
+@pytest.mark.parametrize("count, weights, expected", [
+    (6, {"stt": 1.0, "llm": 1.0, "tts": 1.0}, {"stt": 2, "llm": 2, "tts": 2}),
+    (7, {"stt": 1.0, "llm": 2.0, "tts": 1.5}, {"stt": 2, "llm": 3, "tts": 2}),
+    (3, {"stt": 1.0, "llm": 10.0, "tts": 1.0}, {"stt": 1, "llm": 1, "tts": 1}),
+])
+def test_split_uses_every_core_and_gives_each_engine_one(count, weights, expected):
+    sizes = _split(count, weights)
+    assert sizes == expected
+    assert sum(sizes.values()) == count
+
+def test_off_and_small_hosts_are_not_partitioned():
+    assert plan_cores(smt_topology(8), "off") is None
+    assert plan_cores(smt_topology(3), "balanced") is None
+    with pytest.raises(ValueError):
+        plan_cores(smt_topology(8), "fastest")
+
+def test_balanced_gives_disjoint_cores_with_siblings():
+    plan = plan_cores(smt_topology(8), "balanced", {"stt": 1.0, "llm": 2.0, "tts": 1.0}, background_cores=1)
+
+    assert plan["background"].cpus == [0, 8]
+    assert [plan[name].threads for name in ("stt", "llm", "tts")] == [2, 3, 2]
+    cpus = [cpu for core_set in plan.values() for cpu in core_set.cpus]
+    assert sorted(cpus) == list(range(16))  # Every CPU used once, hyperthreads with their core
+
+def test_interactive_shares_cores_between_llm_and_tts():
+    plan = plan_cores(smt_topology(6), "interactive", background_cores=1)
+
+    assert plan["llm"].cpus == plan["tts"].cpus
+    assert plan["llm"].cpus is not plan["tts"].cpus
+    assert not set(plan["stt"].cpus) & set(plan["llm"].cpus)
+    assert plan["stt"].threads + plan["llm"].threads == 5
+
+def test_apply_writes_pools_and_thread_counts_without_pinning_the_caller(monkeypatch):
+    config = FridayConfig()
+    plan = plan_cores(smt_topology(8), "balanced", background_cores=1)
+    pinned = []
+    monkeypatch.setattr("os.sched_setaffinity", lambda *args: pinned.append(args), raising=False)
+
+    apply_core_plan(plan, config)
+
+    assert config.scheduler.pools["llm"].cores == plan["llm"].cpus
+    assert config.scheduler.pools["io"].cores == plan["background"].cpus
+    assert config.system.llm_threads == plan["llm"].threads
+    assert config.whisper.cpu_threads == plan["stt"].threads
+    assert pinned == []
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import wait
+
+import pytest
+
+# src.core.config builds its defaults with torch
+pytest.importorskip("torch")
+
+from src.core.config import PoolConfig
+from src.core.metrics import PoolMetrics
+from src.core.parallel_processor import ParallelProcessor
+
+def fail(message: str):
+    time.sleep(0.02)
+    raise ValueError(message)
+
+@pytest.fixture
+def processor():
+    processor = ParallelProcessor({"work": PoolConfig(workers=1)})
+    yield processor
+    processor.shutdown()
+
+def test_results_and_errors_pass_through_and_are_counted(processor):
+    pool = processor.executor("work")
+    ok = pool.submit(lambda x, y=1: x + y, 1, y=2)
+    bad = pool.submit(fail, "boom")
+
+    assert ok.result() == 3
+    with pytest.raises(ValueError, match="boom"):
+        bad.result()
+    wait([ok, bad])
+
+    metrics = processor.metrics["work"]
+    assert (metrics.submitted, metrics.completed, metrics.failed, metrics.pending) == (2, 1, 1, 0)
+
+def test_failed_calls_count_their_run_time_not_their_queue_wait(processor):
+    pool = processor.executor("work")
+    # The failing call waits ~0.2s behind the sleep before running ~0.02s
+    blocker = pool.submit(time.sleep, 0.2)
+    bad = pool.submit(fail, "late")
+    wait([blocker, bad])
+
+    metrics = processor.metrics["work"]
+    assert metrics.failed == 1
+    assert metrics.busy_time == pytest.approx(0.22, abs=0.05)
+
+def test_cancelling_a_queued_call_drops_it(processor):
+    pool = processor.executor("work")
+    blocker = pool.submit(time.sleep, 0.1)
+    queued = pool.submit(time.sleep, 10)
+    assert queued.cancel()
+    blocker.result()
+    processor.shutdown(wait=True)
+    assert processor.metrics["work"].failed == 1
+
+def test_run_on_named_pool(processor):
+    async def check():
+        return await processor.run("work", threading.current_thread)
+
+    assert asyncio.run(check()).name.startswith("work")
+    assert processor.get_summary()["work"]["completed"] == 1
+
+def test_pool_metrics_are_consistent_under_concurrent_updates():
+    metrics = PoolMetrics(workers=4)
+
+    def record():
+        for _ in range(1000):
+            metrics.add_submit()
+            metrics.add_done(0.001, 0.001)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert metrics.submitted == metrics.completed == len(metrics.run_times) == 8000
+    assert metrics.pending == 0
+    assert metrics.busy_time == pytest.approx(8.0)
@@ -0,0 +1,148 @@
+import asyncio
+from threading import Event
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# src.core.config builds its defaults with torch
+pytest.importorskip("torch")
+
+from src.core.config import config
+from src.core.metrics import CancellationMetrics
+from src.core.pipeline import ConversationPipeline
+
+class StubRecorder:
+    """Hands out scripted utterances; the utterance doubles as its transcript"""
+
+    def __init__(self, utterances):
+        self.utterances = list(utterances)
+
+    async def capture(self, on_endpoint=None, on_resume=None):
+        await asyncio.sleep(0)
+        return self.utterances.pop(0) if self.utterances else None
+
+    async def transcribe(self, utterance):
+        if utterance == "garbled":
+            raise RuntimeError("decoder error")
+        return utterance
+
+class StubLLM:
+    def __init__(self):
+        self.prompts = []
+
+    async def create_completion(self, text, cancel=None):
+        self.prompts.append(text)
+        return f"Reply to {text}."
+
+class StubTTS:
+    def __init__(self, chunks: int = 2):
+        self.chunks = chunks
+        self.texts = []
+
+    async def stream_speech(self, text, cancel=None):
+        self.texts.append(text)
+        for _ in range(self.chunks):
+            if cancel is not None and cancel.is_cancelled():
+                return
+            yield np.zeros(240, dtype=np.float32)
+
+class StubPlayer:
+    """Records what was played; `hold` keeps the first reply playing until cancelled"""
+
+    def __init__(self, hold: bool = False, fail: bool = False):
+        self.hold = hold
+        self.fail = fail
+        self.listening = []
+        self.played = []
+
+    def listen(self, token):
+        self.listening.append(token)
+
+    def stop_listening(self):
+        pass
+
+    async def play_stream(self, chunks, cancel=None):
+        if self.fail:
+            raise OSError("device unavailable")
+        if self.hold:
+            self.hold = False
+            while not cancel.is_cancelled():
+                await asyncio.sleep(0.01)
+            return False
+        self.played.append([chunk async for chunk in chunks])
+        return True
+
+class StubMemory:
+    def __init__(self):
+        self.saved = []
+
+    async def save(self, text, response):
+        self.saved.append((text, response))
+
+def make_handler(utterances, player=None, tts=None):
+    return SimpleNamespace(
+        recorder=StubRecorder(utterances),
+        llm=StubLLM(),
+        tts=tts or StubTTS(),
+        player=player or StubPlayer(),
+        memory=StubMemory(),
+        speculation=None,
+        stop_event=Event(),
+        busy=False,
+        cancellation_metrics=CancellationMetrics()
+    )
+
+def run(pipeline: ConversationPipeline):
+    return asyncio.run(asyncio.wait_for(pipeline.run(), timeout=5))
+
+def test_turn_flows_through_every_stage():
+    handler = make_handler(["hello", "exit"])
+    pipeline = ConversationPipeline(handler, listen_during_playback=False)
+
+    assert run(pipeline) == "exit"
+    assert handler.llm.prompts == ["hello"]
+    assert handler.tts.texts == ["Reply to hello."]
+    assert len(handler.player.played) == 1 and len(handler.player.played[0]) == 2
+    assert handler.memory.saved == [("hello", "Reply to hello.")]
+    assert pipeline.metrics.turns == 2
+    assert pipeline.in_flight == 0 and not handler.busy
+
+def test_exit_and_interruption_stop_the_pipeline():
+    handler = make_handler(["exit", "never heard"])
+    assert run(ConversationPipeline(handler)) == "exit"
+    assert handler.llm.prompts == []
+
+    handler = make_handler([])
+    assert run(ConversationPipeline(handler)) == "interrupted"
+
+def test_new_utterance_supersedes_audible_reply():
+    handler = make_handler(["first", "second", "exit"], player=StubPlayer(hold=True))
+    pipeline = ConversationPipeline(handler, listen_during_playback=True)
+
+    assert run(pipeline) == "exit"
+    first, second = handler.player.listening
+    assert first.is_cancelled() and first.reason == "superseded"
+    assert not second.is_cancelled()
+    assert handler.llm.prompts == ["first", "second"]
+    assert len(handler.player.played) == 1
+
+def test_playback_failure_cancels_turn_and_continues():
+    # More sentences than the audio queue holds, so synthesis must be unblocked
+    handler = make_handler(["hello", "again", "exit"], player=StubPlayer(fail=True), tts=StubTTS(chunks=10))
+    pipeline = ConversationPipeline(handler, audio_queue_size=1)
+
+    assert run(pipeline) == "exit"
+    assert handler.llm.prompts == ["hello", "again"]
+    assert [token.reason for token in handler.player.listening] == ["playback", "playback"]
+    assert pipeline.metrics.turns == 3
+
+def test_transcription_failure_is_answered_with_barge_in():
+    handler = make_handler(["garbled", "exit"])
+    pipeline = ConversationPipeline(handler)
+
+    assert run(pipeline) == "exit"
+    assert handler.llm.prompts == []
+    assert len(handler.player.listening) == 1
+    assert handler.tts.texts == [config.tts.error_phrase]
+    assert handler.memory.saved == []
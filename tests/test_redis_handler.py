@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+# src.core.config builds its defaults with torch
+pytest.importorskip("torch")
+
+from src.core.config import RedisConfig
+from src.core.redis_handler import LocalStore, RedisHandler, encode, msgpack
+from src.core.state import StateManager
+
+def make_handler(server=None, **settings):
+    server = server or fakeredis.FakeServer()
+    return RedisHandler(RedisConfig(**settings), client=fakeredis.FakeAsyncRedis(server=server))
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+@pytest.mark.parametrize("codec, value", [
+    ("json", {"turn": 1, "text": "hello", "tags": ["a", "b"]}),
+    pytest.param("msgpack", {"turn": 1, "audio": b"\x00\x01"},
+                 marks=pytest.mark.skipif(msgpack is None, reason="msgpack not installed")),
+    ("raw", b"\x00\xffpcm"),
+])
+def test_codec_round_trip(codec, value):
+    async def check():
+        handler = make_handler()
+        assert await handler.set("key", value, codec=codec)
+        assert await handler.get("key", codec=codec) == value
+
+    run(check())
+
+def test_raw_codec_rejects_non_bytes():
+    assert encode("text", "raw") == b"text"
+    assert encode(bytearray(b"ab"), "raw") == b"ab"
+    with pytest.raises(TypeError):
+        encode(3, "raw")
+
+def test_ttl_defaults_to_config_and_zero_never_expires():
+    async def check():
+        handler = make_handler(ttl=120)
+        await handler.set("default", 1)
+        await handler.set("short", 1, ttl=5)
+        await handler.set("forever", 1, ttl=0)
+        assert 0 < await handler.client.ttl("default") <= 120
+        assert 0 < await handler.client.ttl("short") <= 5
+        assert await handler.client.ttl("forever") == -1
+
+    run(check())
+
+def test_mget_mset_and_batch_keep_order():
+    async def check():
+        handler = make_handler()
+        assert await handler.mset({"b": 2, "a": 1, "c": 3})
+        assert await handler.mget(["c", "missing", "a", "b"]) == [3, None, 1, 2]
+
+        results = await handler.batch().get("a").set("d", "new").delete("b").get("d").get("b").execute()
+        assert results == [1, True, 1, "new", None]
+
+    run(check())
+
+def test_state_manager_round_trips_strings():
+    async def check():
+        state = StateManager(make_handler(ttl=60))
+        await state.set_state("mode", "listening")
+        await state.set_state("turns", 3)
+        assert await state.get_state("mode") == "listening"
+        assert await state.get_state("turns") == "3"
+        assert await state.get_state("missing") is None
+        assert await state.redis.client.ttl("mode") == -1
+
+    run(check())
+
+def test_breaker_falls_back_and_recovers():
+    async def check():
+        server = fakeredis.FakeServer()
+        handler = make_handler(server, failure_threshold=2, reset_timeout=0.05)
+        await handler.set("kept", "before")
+
+        server.connected = False
+        await handler.set("a", 1)
+        await handler.set("b", 2)
+        assert handler.breaker.state == "open"
+        assert handler.breaker.trips == 1
+        # Served locally without trying Redis
+        errors = handler.errors
+        assert await handler.get("b") == 2
+        assert handler.errors == errors
+
+        await asyncio.sleep(0.06)
+        assert handler.breaker.state == "half-open"
+        server.connected = True
+        assert await handler.get("kept") == "before"
+        assert handler.breaker.state == "closed"
+
+    run(check())
+
+def test_outage_writes_survive_recovery():
+    async def check():
+        server = fakeredis.FakeServer()
+        handler = make_handler(server, failure_threshold=1, reset_timeout=0.05)
+        state = StateManager(handler)
+        await state.set_state("mode", "idle")
+        await handler.set("stale", "old")
+
+        server.connected = False
+        await state.set_state("mode", "speaking")
+        await handler.set("expiring", "soon", ttl=30)
+        await handler.delete("stale")
+        assert handler.breaker.state == "open"
+
+        await asyncio.sleep(0.06)
+        server.connected = True
+        assert await state.get_state("mode") == "speaking"
+        assert await handler.get("stale") is None
+        assert 0 < await handler.client.ttl("expiring") <= 30
+        assert handler.get_summary()["unsynced"] == 0
+
+    run(check())
+
+def test_local_store_is_bounded_by_bytes_and_dirty_keys():
+    store = LocalStore(max_entries=3, max_bytes=100)
+    store.set("a", b"x" * 40)
+    store.set("b", b"x" * 40)
+    store.set("c", b"x" * 40)
+    assert list(store.entries) == ["b", "c"] and store.size == 80
+    assert not store.set("huge", b"x" * 101)
+    assert store.get("huge") is None
+
+    store.delete("d", "e")
+    assert list(store.dirty) == ["huge", "d", "e"]